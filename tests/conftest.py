@@ -1,5 +1,7 @@
 import os
 
+import pytest
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 root_dir_content = os.listdir(BASE_DIR)
 PROJECT_DIR_NAME = 'yatube'
@@ -37,3 +39,17 @@ pytest_plugins = [
     'tests.fixtures.fixture_user',
     'tests.fixtures.fixture_data',
 ]
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(request):
+    """Кеш не откатывается вместе с базой теста: тест с базой
+    начинается с пустого кеша."""
+    marker = request.node.get_closest_marker('django_db')
+    if marker is None:
+        return
+    request.getfixturevalue(
+        'transactional_db' if marker.kwargs.get('transaction') else 'db'
+    )
+    from core.testing import clear_caches
+    clear_caches()
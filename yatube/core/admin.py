@@ -0,0 +1,69 @@
+"""Помощники для админки больших таблиц и админка очереди задач."""
+from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.core.exceptions import ValidationError
+
+from .models import Task
+from .paginator import EstimatedCountPaginator
+
+
+class InputFilter(admin.SimpleListFilter):
+    """Фильтр списка с полем ввода значения.
+
+    В отличие от фильтра по ForeignKey не перечисляет все объекты
+    связанной таблицы: значение (например, имя пользователя) вводится
+    вручную и ищется по parameter_name.
+    """
+    template = "admin/input_filter.html"
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        try:
+            return queryset.filter(**{self.parameter_name: self.value()})
+        except (ValueError, ValidationError) as error:
+            raise IncorrectLookupParameters(error)
+
+    def choices(self, changelist):
+        yield {
+            "name": self.parameter_name,
+            "value": self.value() or "",
+            "hidden": [
+                (name, value) for name, value in changelist.params.items()
+                if name not in (self.parameter_name, "p")
+            ],
+            "clear_url": changelist.get_query_string(
+                remove=[self.parameter_name]
+            ),
+        }
+
+
+def input_filter(field_path: str, title: str):
+    """Класс InputFilter для списка list_filter."""
+    return type(
+        "InputFilter",
+        (InputFilter,),
+        {"parameter_name": field_path, "title": title}
+    )
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'name',
+        'status',
+        'attempts',
+        'run_at',
+        'finished'
+    )
+    list_filter = ('status', 'name')
+    readonly_fields = ('created', 'started', 'finished', 'locked_by')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,25 @@
+"""SQLite с транзакциями BEGIN IMMEDIATE по запросу.
+
+Транзакция встроенного бэкенда начинается с BEGIN (DEFERRED)
+и берёт блокировку записи только на первой записи. Если к этому
+моменту другое соединение успело записать, SQLite не ждёт
+timeout, а сразу возвращает "database is locked": иначе
+транзакция записала бы поверх устаревших прочитанных данных.
+BEGIN IMMEDIATE берёт блокировку записи в начале транзакции
+и ждёт её не дольше timeout, но и читающие транзакции
+выстраивает в очередь за одной блокировкой. Поэтому IMMEDIATE
+начинаются только блоки core.db.immediate_atomic - те, что
+читают и затем пишут; остальные транзакции - с обычного BEGIN.
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    # Начать следующую транзакцию с BEGIN IMMEDIATE
+    # (выставляет core.db.immediate_atomic).
+    begin_immediate = False
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(
+            "BEGIN IMMEDIATE" if self.begin_immediate else "BEGIN"
+        )
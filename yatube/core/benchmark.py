@@ -0,0 +1,30 @@
+"""Помощники команд замеров производительности."""
+import math
+import subprocess
+
+
+def percentile(values, q: float) -> float:
+    """q-й процентиль (0-100) методом ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(timings_ms) -> dict:
+    """p50, p95 и среднее по замерам в миллисекундах."""
+    return {
+        "p50_ms": round(percentile(timings_ms, 50), 2),
+        "p95_ms": round(percentile(timings_ms, 95), 2),
+        "mean_ms": round(sum(timings_ms) / len(timings_ms), 2),
+    }
+
+
+def git_revision() -> str:
+    """Текущий коммит, чтобы сравнивать замеры между коммитами."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
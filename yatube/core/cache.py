@@ -0,0 +1,28 @@
+"""Поколение (generation) контента сайта.
+
+Значение поколения входит в ключи кеша страниц: при любом изменении
+контента оно меняется, и все ранее закешированные фрагменты
+становятся недостижимыми без явного удаления. Значение строится
+из текущего времени, поэтому не повторяется между перезапусками
+даже при долгоживущем общем кеше.
+"""
+import time
+
+from django.core.cache import cache
+
+GENERATION_KEY = "core:generation"
+
+
+def bump_generation() -> str:
+    """Начинает новое поколение контента."""
+    generation = format(time.time_ns(), "x")
+    cache.set(GENERATION_KEY, generation, None)
+    return generation
+
+
+def get_generation() -> str:
+    """Текущее поколение контента."""
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = bump_generation()
+    return generation
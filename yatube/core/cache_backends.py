@@ -0,0 +1,263 @@
+"""Двухуровневый кеш: локальный L1 в памяти процесса
+перед общим для всех воркеров L2.
+
+L1 - небольшой LocMemCache с коротким временем жизни, L2 - любой
+бэкенд из settings.CACHES (локально DatabaseCache на SQLite,
+в продакшене Memcached). Запись ключей с префиксами из
+BROADCAST_PREFIXES увеличивает в L2 номер эпохи и записывает под
+этим номером изменённые ключи; в начале каждого запроса процесс
+сверяет номер и удаляет из своего L1 ключи пропущенных эпох, так
+инвалидация из одного воркера доходит до остальных. Если записей
+не хватает (пропущено больше BROADCAST_LOG_MAX эпох или запись
+ещё не сделана), L1 очищается целиком.
+"""
+import base64
+import pickle
+import threading
+
+from django.core.cache import caches
+from django.core.cache.backends import db
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.signals import request_started
+from django.db import connections, router
+from django.utils import timezone
+
+from .db import immediate_atomic
+
+EPOCH_KEY = "two-tier:epoch"
+BROADCAST_LOG_MAX = 100
+_MISSING = object()
+
+# Номер текущего запроса в потоке и последняя увиденная эпоха
+# для каждого L1 процесса.
+_request = threading.local()
+_epochs = {}
+
+
+def _log_key(epoch: int) -> str:
+    """Ключ L2 со списком ключей, изменённых в эпоху epoch."""
+    return f"two-tier:changed:{epoch}"
+
+
+def _count_request(**kwargs):
+    _request.serial = getattr(_request, "serial", 0) + 1
+
+
+request_started.connect(_count_request)
+
+
+class TwoTierCache(BaseCache):
+    """Кеш-бэкенд L1 (память процесса) + L2 (общий кеш).
+    --------
+        OPTIONS:
+            SHARED_ALIAS: str
+                имя общего кеша в settings.CACHES.
+            LOCAL_LOCATION: str
+                имя хранилища L1 в памяти процесса.
+            LOCAL_TIMEOUT: int
+                время жизни записей L1, секунд.
+            LOCAL_MAX_ENTRIES: int
+                максимальное кол-во записей L1.
+            BROADCAST_PREFIXES: tuple
+                префиксы ключей, изменение которых
+                удаляет их из L1 всех процессов.
+    """
+
+    def __init__(self, location, params):
+        params = dict(params)
+        options = params.pop("OPTIONS", {})
+        super().__init__(params)
+        self.shared_alias = options.get("SHARED_ALIAS", "shared")
+        self.local_location = options.get("LOCAL_LOCATION", "two-tier")
+        self.local_timeout = options.get("LOCAL_TIMEOUT", 5)
+        self.broadcast_prefixes = tuple(
+            options.get("BROADCAST_PREFIXES", ())
+        )
+        self.local = LocMemCache(self.local_location, {
+            "TIMEOUT": self.local_timeout,
+            "OPTIONS": {
+                "MAX_ENTRIES": options.get("LOCAL_MAX_ENTRIES", 1000)
+            },
+        })
+        self._synced_request = None
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def _local_timeout(self, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return self.local_timeout
+        return min(timeout, self.local_timeout)
+
+    def _sync(self):
+        """Сверяет эпоху с L2 не чаще раза за запрос и удаляет
+        из L1 ключи, изменённые в пропущенных эпохах."""
+        serial = getattr(_request, "serial", 0)
+        if self._synced_request == serial:
+            return
+        self._synced_request = serial
+        epoch = self.shared.get(EPOCH_KEY)
+        seen = _epochs.get(self.local_location)
+        _epochs[self.local_location] = epoch
+        if epoch == seen:
+            return
+        missed = range(seen + 1, epoch + 1) if (
+            seen is not None and epoch is not None
+        ) else range(0)
+        changes = {}
+        if 0 < len(missed) <= BROADCAST_LOG_MAX:
+            changes = self.shared.get_many([_log_key(n) for n in missed])
+        if not missed or len(changes) < len(missed):
+            self.local.clear()
+            return
+        for keys in changes.values():
+            for key, version in keys:
+                self.local.delete(key, version=version)
+
+    def _broadcast(self, *keys, version=None):
+        changed = [
+            (key, version) for key in keys
+            if str(key).startswith(self.broadcast_prefixes)
+        ]
+        if not changed:
+            return
+        try:
+            epoch = self.shared.incr(EPOCH_KEY)
+        except ValueError:
+            self.shared.add(EPOCH_KEY, 0, None)
+            epoch = self.shared.incr(EPOCH_KEY)
+        # Запись живёт дольше записей L1: к её истечению
+        # изменённые ключи истекли бы и сами.
+        self.shared.set(_log_key(epoch), changed, self.local_timeout * 2)
+
+    def get(self, key, default=None, version=None):
+        self._sync()
+        value = self.local.get(key, _MISSING, version=version)
+        if value is not _MISSING:
+            return value
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+        self.local.set(key, value, self.local_timeout, version=version)
+        return value
+
+    def get_many(self, keys, version=None):
+        self._sync()
+        found = self.local.get_many(keys, version=version)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            shared = self.shared.get_many(missing, version=version)
+            self.local.set_many(shared, self.local_timeout, version=version)
+            found.update(shared)
+        return found
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            self.local.set(
+                key, value, self._local_timeout(timeout), version=version
+            )
+        return added
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version=version)
+        self.local.set(
+            key, value, self._local_timeout(timeout), version=version
+        )
+        self._broadcast(key, version=version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout, version=version)
+        self.local.set_many(
+            data, self._local_timeout(timeout), version=version
+        )
+        self._broadcast(*data, version=version)
+        return failed
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self.local.touch(key, self._local_timeout(timeout), version=version)
+        return self.shared.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self.shared.delete(key, version=version)
+        self.local.delete(key, version=version)
+        self._broadcast(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        self.shared.delete_many(keys, version=version)
+        self.local.delete_many(keys, version=version)
+        self._broadcast(*keys, version=version)
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version=version) is not _MISSING
+
+    def incr(self, key, delta=1, version=None):
+        value = self.shared.incr(key, delta, version=version)
+        self.local.set(key, value, self.local_timeout, version=version)
+        self._broadcast(key, version=version)
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version=version)
+
+    def clear(self):
+        self.shared.clear()
+        self.local.clear()
+        _epochs.pop(self.local_location, None)
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+
+
+class DatabaseCache(db.DatabaseCache):
+    """DatabaseCache, записывающий в транзакции BEGIN IMMEDIATE:
+    set() сначала читает число строк и срок ключа, и параллельная
+    запись между чтением и записью иначе сразу давала бы
+    "database is locked" (core.backends.sqlite3)."""
+
+    def _base_set(self, mode, key, value, timeout=DEFAULT_TIMEOUT):
+        with immediate_atomic(router.db_for_write(self.cache_model_class)):
+            return super()._base_set(mode, key, value, timeout)
+
+    def incr(self, key, delta=1, version=None):
+        """Атомарный incr: значение меняется одним UPDATE, а не
+        чтением и записью, между которыми может вклиниться другой
+        процесс. В SQLite значение (pickle в base64) разбирает
+        функция _incr_pickled, в прочих СУБД - incr в транзакции."""
+        connection = connections[router.db_for_write(self.cache_model_class)]
+        if connection.vendor != "sqlite":
+            with immediate_atomic(connection.alias):
+                return super().incr(key, delta, version=version)
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        table = connection.ops.quote_name(self._table)
+        now = timezone.now().replace(microsecond=0)
+        with connection.cursor() as cursor:
+            connection.connection.create_function(
+                "cache_incr", 2, self._incr_pickled
+            )
+            cursor.execute(
+                f"UPDATE {table} SET value = cache_incr(value, %s) "
+                "WHERE cache_key = %s AND expires >= %s RETURNING value",
+                [delta, key, connection.ops.adapt_datetimefield_value(now)]
+            )
+            row = cursor.fetchone()
+        if row is None:
+            raise ValueError("Key '%s' not found" % key)
+        return pickle.loads(base64.b64decode(row[0].encode()))
+
+    def _incr_pickled(self, value, delta):
+        number = pickle.loads(base64.b64decode(value.encode())) + delta
+        return base64.b64encode(
+            pickle.dumps(number, self.pickle_protocol)
+        ).decode("latin1")
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        # Все ключи - одна пишущая транзакция, а не по транзакции
+        # на ключ (posts.cards кладёт так карточки страницы).
+        with immediate_atomic(router.db_for_write(self.cache_model_class)):
+            return super().set_many(data, timeout, version=version)
@@ -0,0 +1,74 @@
+"""Параллельное выполнение независимых запросов чтения.
+
+Django 2.2 не поддерживает ASGI и асинхронные представления, поэтому
+независимые запросы представления (строки страницы, статус подписки,
+объект страницы) выполняются в общем пуле из READ_WORKERS потоков:
+время ответа - самый долгий из запросов, а не их сумма. У каждого
+потока пула своё соединение с БД, обёртки execute_wrapper
+вызывающего потока (учёт запросов) и его contextvars (маршрутизация
+на реплики) переносятся в поток пула.
+
+Запросы выполняются по очереди в вызывающем потоке, если пул
+отключён (READ_WORKERS = 0) или открыта транзакция: другие
+соединения не видят её незафиксированных изменений.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from contextvars import copy_context
+
+from django.conf import settings
+from django.db import close_old_connections, connection, connections
+
+_executor = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.READ_WORKERS,
+            thread_name_prefix="reads"
+        )
+    return _executor
+
+
+def is_concurrent() -> bool:
+    return bool(settings.READ_WORKERS) and not connection.in_atomic_block
+
+
+def _run(func, wrappers):
+    # Соединения потоков пула живут дольше запроса: как и в начале
+    # запроса, закрываем устаревшие (CONN_MAX_AGE) и сломанные.
+    close_old_connections()
+    with ExitStack() as stack:
+        for alias, alias_wrappers in wrappers.items():
+            for wrapper in alias_wrappers:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(wrapper)
+                )
+        return func()
+
+
+def gather(*funcs) -> list:
+    """Выполняет функции без аргументов параллельно и возвращает
+    их результаты в том же порядке; исключение первой упавшей
+    функции пробрасывается.
+    --------
+        Параметры:
+            funcs: callable
+                независимые друг от друга чтения из БД.
+    """
+    if len(funcs) < 2 or not is_concurrent():
+        return [func() for func in funcs]
+    wrappers = {
+        alias: list(connections[alias].execute_wrappers)
+        for alias in connections
+    }
+    # Первая функция выполняется в вызывающем потоке, пока
+    # остальные ждут ответа СУБД в пуле.
+    futures = [
+        _get_executor().submit(copy_context().run, _run, func, wrappers)
+        for func in funcs[1:]
+    ]
+    first = funcs[0]()
+    return [first, *(future.result() for future in futures)]
@@ -0,0 +1,54 @@
+"""Условные GET-запросы (ETag и Last-Modified) по поколению контента.
+
+Поколение (core.cache) меняется при любом изменении постов,
+комментариев, лайков, подписок и групп, и строится из времени
+смены, поэтому служит и версией, и датой изменения страниц без
+запросов к БД. ETag дополнительно зависит от пользователя и токена
+CSRF: в страницах есть формы и отметки текущего пользователя.
+Пока поколение не сменилось, представление отвечает 304 Not Modified,
+не выполняя запросов и не собирая шаблон.
+"""
+import datetime as dt
+import hashlib
+
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_cookie
+
+from .cache import get_generation
+
+
+def _generation(request) -> str:
+    # Одно чтение из кеша на запрос для обоих валидаторов.
+    if not hasattr(request, "_content_generation"):
+        request._content_generation = get_generation()
+    return request._content_generation
+
+
+def content_etag(request, *args, **kwargs) -> str:
+    user = request.user.pk if request.user.is_authenticated else ""
+    csrf = request.META.get("CSRF_COOKIE", "")
+    raw = f"{_generation(request)}:{user}:{csrf}"
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def content_last_modified(request, *args, **kwargs) -> dt.datetime:
+    nanoseconds = int(_generation(request), 16)
+    return dt.datetime.fromtimestamp(nanoseconds / 10 ** 9, tz=timezone.utc)
+
+
+def conditional_page(view):
+    """Декоратор представления страницы: ETag и Last-Modified
+    по поколению контента, Vary: Cookie и Cache-Control, требующий
+    от браузера проверять страницу при каждом показе.
+    --------
+        Параметры:
+            view: callable
+                представление, отвечающее на GET-запросы.
+    """
+    view = condition(
+        etag_func=content_etag,
+        last_modified_func=content_last_modified
+    )(view)
+    return cache_control(private=True, no_cache=True)(vary_on_cookie(view))
@@ -0,0 +1,17 @@
+from typing import Dict
+
+from django.conf import settings
+from django.http import HttpRequest
+from django.utils.functional import SimpleLazyObject
+
+from core.cache import get_generation
+
+
+def page_cache(request: HttpRequest) -> Dict[str, object]:
+    """Добавляет переменные для тега {% cache %}: время жизни
+    фрагмента и текущее поколение контента (читается из кеша
+    только если шаблон его использует)."""
+    return {
+        'cache_timeout': settings.PAGE_CACHE_TIMEOUT,
+        'cache_generation': SimpleLazyObject(get_generation),
+    }
@@ -0,0 +1,45 @@
+"""Настройка новых соединений с БД и пишущие транзакции."""
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Обработчик connection_created: выполняет SQLITE_PRAGMAS.
+
+    PRAGMA выполняются напрямую в соединении sqlite3, мимо обёрток
+    execute_wrapper, и не попадают в учёт запросов представлений.
+    """
+    if connection.vendor != "sqlite":
+        return
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f"PRAGMA {name} = {value}")
+
+
+@contextmanager
+def immediate_atomic(using=None):
+    """transaction.atomic, который в SQLite (core.backends.sqlite3)
+    начинается с BEGIN IMMEDIATE: блокировка записи берётся сразу
+    и ожидается до timeout, а не отказывает на первой записи после
+    чтения. Для блоков, которые читают и затем пишут; вложенный
+    блок и другие СУБД - обычный atomic.
+    --------
+        Параметры:
+            using: str
+                алиас БД, по умолчанию - default.
+    """
+    connection = transaction.get_connection(using)
+    if connection.in_atomic_block or not hasattr(
+        connection, "begin_immediate"
+    ):
+        with transaction.atomic(using=using):
+            yield
+        return
+    connection.begin_immediate = True
+    try:
+        with transaction.atomic(using=using):
+            connection.begin_immediate = False
+            yield
+    finally:
+        connection.begin_immediate = False
@@ -0,0 +1,115 @@
+import multiprocessing
+import os
+import socket
+import time
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from core import tasks
+
+# Как часто удалять старые выполненные задачи и возвращать
+# в очередь потерянные, с.
+MAINTENANCE_INTERVAL = 60
+
+
+def _execute(task):
+    """Выполняется в потоке или дочернем процессе пула: соединение
+    с БД у каждого своё и живёт между задачами."""
+    close_old_connections()
+    return tasks.execute(task)
+
+
+def _start():
+    """Пустое задание: запускает процессы пула до открытия
+    соединений в родителе."""
+
+
+class Command(BaseCommand):
+    help = ("Выполняет фоновые задачи из очереди в БД "
+            "в пуле потоков или процессов.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Кол-во задач, выполняемых одновременно."
+        )
+        parser.add_argument(
+            "--processes",
+            action="store_true",
+            help="Пул процессов вместо пула потоков "
+                 "(для задач, нагружающих процессор)."
+        )
+        parser.add_argument(
+            "--poll",
+            type=float,
+            default=1.0,
+            help="Пауза между проверками пустой очереди, с."
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Выполнить задачи, срок которых наступил, и выйти."
+        )
+
+    def handle(self, *args, **options):
+        workers = max(options["workers"], 1)
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"
+        if options["processes"]:
+            # Дочерние процессы не должны делить сокеты и файлы БД
+            # с родителем: закрываем соединения и запускаем процессы
+            # до первого запроса.
+            connections.close_all()
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("fork")
+            )
+            pool.submit(_start).result()
+        else:
+            pool = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="tasks"
+            )
+        with pool:
+            done, failed = self.run(pool, workers, options)
+        self.stdout.write(
+            self.style.SUCCESS(f"Выполнено задач: {done}, ошибок: {failed}")
+        )
+
+    def run(self, pool, workers, options):
+        done = failed = 0
+        running = set()
+        maintained = 0
+        try:
+            while True:
+                if time.monotonic() - maintained > MAINTENANCE_INTERVAL:
+                    tasks.requeue_lost()
+                    tasks.purge_done()
+                    maintained = time.monotonic()
+                free = workers - len(running)
+                if free:
+                    running.update(
+                        pool.submit(_execute, task)
+                        for task in tasks.claim(self.worker, free)
+                    )
+                if not running:
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll"])
+                    continue
+                finished, running = wait(
+                    running, timeout=options["poll"],
+                    return_when=FIRST_COMPLETED
+                )
+                for future in finished:
+                    if future.result():
+                        done += 1
+                    else:
+                        failed += 1
+        except KeyboardInterrupt:
+            # Забранные задачи дорабатывают при выходе из пула.
+            pass
+        return done, failed
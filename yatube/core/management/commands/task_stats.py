@@ -0,0 +1,25 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from core.tasks import queue_stats
+
+
+class Command(BaseCommand):
+    help = ("Выводит метрики очереди фоновых задач в JSON: число задач "
+            "по состояниям, возраст самой старой ждущей задачи, "
+            "задержку и длительность выполнения.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--window",
+            type=int,
+            default=1000,
+            help="По скольким последним выполненным задачам "
+                 "считать задержку и длительность."
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            json.dumps(queue_stats(options["window"]), indent=2)
+        )
@@ -0,0 +1,94 @@
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .queries import QueryBudgetExceeded, QueryRecorder, get_budget
+from .routers import STICKY_COOKIE, choose_replica, routing
+
+logger = logging.getLogger("core.queries")
+
+
+class QueryInspectorMiddleware:
+    """Считает SQL-запросы выборки запросов (QUERY_SAMPLE_RATE),
+    сообщает о превышении бюджета представления и о N+1.
+    Запросы к таблицам кеша в БД выводятся отдельным заголовком
+    X-Cache-Query-Count и в бюджет не входят.
+
+    При QUERY_SAMPLE_RATE = 0 стоит одно сравнение на запрос.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = settings.QUERY_SAMPLE_RATE
+        if not rate or random.random() >= rate:
+            return self.get_response(request)
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        response["X-Query-Count"] = len(recorder)
+        response["X-Cache-Query-Count"] = len(recorder.cache_queries)
+        self.report(request, recorder)
+        return response
+
+    def report(self, request, recorder):
+        for shape, count in recorder.duplicates().items():
+            logger.warning(
+                "N+1 на %s: %d повторов запроса %s",
+                request.path, count, shape
+            )
+        match = request.resolver_match
+        budget = get_budget(match.func) if match else None
+        if budget is None or len(recorder) <= budget:
+            return
+        message = (
+            f"{match.view_name}: {len(recorder)} SQL-запросов "
+            f"при бюджете {budget}"
+        )
+        if settings.QUERY_BUDGET_RAISE:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class ReplicaMiddleware:
+    """Включает чтение с реплик (core.routers) в представлениях
+    REPLICA_VIEWS, кроме клиентов, недавно писавших в БД."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with routing() as state:
+            request.replica_routing = state
+            response = self.get_response(request)
+        if state.wrote:
+            seconds = settings.REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                STICKY_COOKIE,
+                str(int(time.time()) + seconds),
+                max_age=seconds,
+                httponly=True,
+                samesite="Lax"
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            request.resolver_match.view_name in settings.REPLICA_VIEWS
+            and not self.is_sticky(request)
+        ):
+            request.replica_routing.replica = choose_replica()
+
+    def is_sticky(self, request) -> bool:
+        try:
+            until = int(request.COOKIES.get(STICKY_COOKIE, 0))
+        except ValueError:
+            return False
+        return until > time.time()
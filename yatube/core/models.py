@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class CreatedModel(models.Model):
@@ -7,3 +8,44 @@ class CreatedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class Task(models.Model):
+    """Задача фоновой очереди (core.tasks)."""
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUSES = (
+        (PENDING, "В очереди"),
+        (RUNNING, "Выполняется"),
+        (DONE, "Выполнена"),
+        (FAILED, "Ошибка"),
+    )
+
+    name = models.CharField("Функция", max_length=200)
+    args = models.TextField("Аргументы", default="[]", help_text="JSON")
+    status = models.CharField(
+        "Состояние", max_length=10, choices=STATUSES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField("Попыток", default=0)
+    max_attempts = models.PositiveSmallIntegerField("Наибольшее число попыток")
+    run_at = models.DateTimeField("Выполнить не раньше", default=timezone.now)
+    created = models.DateTimeField("Поставлена", auto_now_add=True)
+    started = models.DateTimeField("Начата", null=True, blank=True)
+    finished = models.DateTimeField("Завершена", null=True, blank=True)
+    locked_by = models.CharField("Обработчик", max_length=64, blank=True)
+    last_error = models.TextField("Последняя ошибка", blank=True)
+
+    class Meta:
+        verbose_name = "Задача"
+        verbose_name_plural = "Задачи"
+        indexes = [
+            models.Index(
+                fields=["status", "run_at"],
+                name="task_status_run_at_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
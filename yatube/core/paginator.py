@@ -0,0 +1,106 @@
+"""Пажинаторы без точного COUNT(*) по большим таблицам."""
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, QuerySet
+from django.utils.functional import cached_property
+
+
+def estimate_count(queryset) -> int:
+    """Оценка числа строк таблицы модели без полного прохода:
+    статистика планировщика в PostgreSQL, наибольший pk - в SQLite
+    и остальных СУБД (с учётом удалённых строк - оценка сверху)."""
+    model = queryset.model
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                [model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        if row and row[0] > 0:
+            return row[0]
+    return model._default_manager.using(queryset.db).aggregate(
+        last=Max("pk")
+    )["last"] or 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator, считающий строки точно только до предела
+    COUNT_LIMIT (настройка ESTIMATED_COUNT_LIMIT).
+
+    Больше предела: для всей таблицы число строк оценивается
+    (estimate_count), для отфильтрованного списка - ограничивается
+    пределом, и дальние страницы недоступны.
+    """
+
+    @cached_property
+    def count(self):
+        limit = settings.ESTIMATED_COUNT_LIMIT
+        queryset = self.object_list
+        count = queryset.order_by()[:limit + 1].count()
+        if count <= limit:
+            return count
+        if not queryset.query.where:
+            return max(estimate_count(queryset), count)
+        return limit
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, берущий число строк из кеша по ключу count_key.
+
+    Значение в кеше поддерживает вызывающий код (например, сигналы
+    сохранения). Пока его нет, строки считаются только до предела
+    ESTIMATED_COUNT_LIMIT: меньше предела - результат точный
+    и кладётся в кеш на PAGE_COUNT_TIMEOUT секунд, больше - число
+    ограничивается пределом (is_capped), дальние страницы недоступны,
+    а точное значение должен посчитать on_miss (например, фоновой
+    задачей). Без count_key работает как обычный Paginator.
+    object_list - QuerySet или последовательность с __len__ и срезами;
+    если у неё есть live_count(), эта часть строк не кешируется,
+    а считается при каждом запросе (её не поддерживают сигналы).
+    --------
+        Параметры:
+            count_key: str
+                ключ кеша с числом строк object_list.
+            on_miss: callable
+                вызывается без аргументов, если строк больше предела.
+    """
+    is_capped = False
+
+    def __init__(self, object_list, per_page, count_key=None,
+                 on_miss=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_key = count_key
+        self.on_miss = on_miss
+
+    @cached_property
+    def count(self):
+        if self.count_key is None:
+            return super().count
+        live = 0
+        if hasattr(self.object_list, "live_count"):
+            live = self.object_list.live_count()
+        count = cache.get(self.count_key)
+        if count is not None:
+            return count + live
+        limit = settings.ESTIMATED_COUNT_LIMIT
+        if isinstance(self.object_list, QuerySet):
+            count = self.object_list.order_by()[:limit + 1].count()
+        else:
+            # Списки, собираемые из нескольких запросов (posts.feed.Feed),
+            # считают себя сами.
+            count = len(self.object_list)
+        if count <= limit:
+            # add, а не set: значение, посчитанное параллельно
+            # и уже изменённое сигналами, не затирается.
+            cache.add(
+                self.count_key, count - live, settings.PAGE_COUNT_TIMEOUT
+            )
+            return count
+        self.is_capped = True
+        if self.on_miss is not None:
+            self.on_miss()
+        return limit
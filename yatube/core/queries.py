@@ -0,0 +1,94 @@
+"""Учёт SQL-запросов: бюджеты запросов представлений
+и поиск N+1 по повторяющимся "формам" запросов."""
+import re
+import time
+from collections import Counter
+from functools import wraps
+
+from django.conf import settings
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN \((?:\s*(?:%s|\?)\s*,?)+\)", re.IGNORECASE)
+_SPACES = re.compile(r"\s+")
+# Управление транзакциями (в том числе BEGIN IMMEDIATE
+# core.db.immediate_atomic) - не запросы к данным.
+_TRANSACTION = re.compile(
+    r"^\s*(BEGIN|COMMIT|END|SAVEPOINT|RELEASE|ROLLBACK)\b", re.IGNORECASE
+)
+
+
+def _cache_tables():
+    """Таблицы DatabaseCache: обращения к кешу считаются отдельно
+    от запросов к данным."""
+    return tuple(
+        f'"{params["LOCATION"]}"' for params in settings.CACHES.values()
+        if params["BACKEND"].endswith(".DatabaseCache")
+    )
+
+
+def query_budget(view, max_queries: int):
+    """Объявляет бюджет SQL-запросов представления.
+
+    Используется в urls.py:
+        path("", query_budget(views.index, 5), name="index")
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        return view(*args, **kwargs)
+
+    wrapper.query_budget = max_queries
+    return wrapper
+
+
+def get_budget(view):
+    return getattr(view, "query_budget", None)
+
+
+def normalize(sql: str) -> str:
+    """Форма запроса: SQL без значений параметров."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+class QueryRecorder:
+    """Обёртка для connection.execute_wrapper,
+    запоминающая выполненные запросы: к данным - в queries
+    (по ним считаются бюджеты и N+1), к таблицам DatabaseCache -
+    в cache_queries."""
+
+    def __init__(self):
+        self.queries = []
+        self.cache_queries = []
+        self.cache_tables = _cache_tables()
+
+    def __call__(self, execute, sql, params, many, context):
+        if _TRANSACTION.match(sql):
+            return execute(sql, params, many, context)
+        queries = self.queries
+        if any(table in sql for table in self.cache_tables):
+            queries = self.cache_queries
+        start = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            queries.append((sql, time.monotonic() - start))
+
+    def __len__(self):
+        return len(self.queries)
+
+    def duplicates(self, threshold=None):
+        """Формы запросов, повторившиеся threshold раз и более."""
+        if threshold is None:
+            threshold = settings.QUERY_N_PLUS_ONE_THRESHOLD
+        shapes = Counter(normalize(sql) for sql, _ in self.queries)
+        return {
+            shape: count for shape, count in shapes.items()
+            if count >= threshold
+        }
+
+
+class QueryBudgetExceeded(Exception):
+    """Представление выполнило больше запросов, чем объявлено."""
@@ -0,0 +1,85 @@
+"""Чтение с реплик БД.
+
+Модели приложений REPLICA_APPS читаются с реплик DATABASE_REPLICAS
+(реплика выбирается случайно с учётом весов, одна на весь
+запрос) только в представлениях REPLICA_VIEWS; все записи
+и остальные чтения идут в default. После записи в модели
+REPLICA_APPS ответ ставит cookie, и следующие
+REPLICA_STICKY_SECONDS секунд запросы этого клиента читают
+с default: реплика может ещё не получить его изменения.
+
+Состояние запроса хранится в contextvars и переносится в потоки
+core.concurrency.gather.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+
+STICKY_COOKIE = "primary_reads"
+
+
+@dataclass
+class RoutingState:
+    # Реплика, с которой читает текущее представление, или None -
+    # чтение из default. Выбирается один раз на запрос: все чтения
+    # запроса видят одно состояние данных, а не смесь реплик
+    # с разным отставанием.
+    replica: Optional[str] = None
+    # Была ли в запросе запись в модели REPLICA_APPS.
+    wrote: bool = False
+
+
+_state = ContextVar("routing_state", default=None)
+
+
+@contextmanager
+def routing():
+    """Состояние маршрутизации на время запроса."""
+    state = RoutingState()
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+def choose_replica():
+    """Алиас реплики с учётом весов или None, если реплик нет."""
+    replicas = settings.DATABASE_REPLICAS
+    if not replicas:
+        return None
+    aliases = list(replicas)
+    return random.choices(
+        aliases, weights=[replicas[alias] for alias in aliases]
+    )[0]
+
+
+class ReplicaRouter:
+    def _routed(self, model) -> bool:
+        return model._meta.app_label in settings.REPLICA_APPS
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not self._routed(model):
+            return None
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None and self._routed(model):
+            state.wrote = True
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # На репликах те же данные, что в default: объекты,
+        # прочитанные из разных баз, можно связывать.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,211 @@
+"""Очередь фоновых задач в таблице БД.
+
+Побочные действия записи (рассылка по лентам, поисковый индекс,
+миниатюры) не нужны для ответа на запрос, поэтому представления
+ставят их в очередь, а выполняет команда run_tasks - без брокера,
+в той же БД. Задача - функция модуля, отмеченная декоратором task;
+в таблицу core.Task пишутся её путь и аргументы (JSON), строка
+появляется только после коммита транзакции запроса.
+
+Упавшая задача повторяется с экспоненциально растущей задержкой
+(TASK_RETRY_DELAY, не больше TASK_RETRY_MAX_DELAY), после
+max_attempts попыток остаётся в состоянии failed. Задача, которая
+"выполняется" дольше TASK_TIMEOUT (обработчик умер), возвращается
+в очередь, поэтому задачи должны быть идемпотентны.
+
+При TASKS_EAGER задача выполняется сразу при постановке, без
+обработчика очереди; по умолчанию настройка выключена и в тестах,
+тесты включают её через override_settings там, где им нужен
+результат задачи.
+"""
+import datetime as dt
+import json
+import logging
+import random
+import traceback
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .benchmark import summarize
+from .models import Task
+
+logger = logging.getLogger("core.tasks")
+
+
+def task(func=None, *, max_attempts=None):
+    """Декоратор функции фоновой задачи: добавляет ей метод
+    enqueue(*args), ставящий вызов в очередь.
+    --------
+        Параметры:
+            max_attempts: int
+                число попыток, по умолчанию TASK_MAX_ATTEMPTS.
+    """
+    def register(func):
+        func.task_name = f"{func.__module__}.{func.__qualname__}"
+        func.max_attempts = max_attempts
+        func.enqueue = lambda *args, **options: enqueue(
+            func, *args, **options
+        )
+        return func
+
+    return register(func) if func is not None else register
+
+
+def enqueue(func, *args, delay: int = 0) -> None:
+    """Ставит вызов задачи в очередь после коммита текущей транзакции.
+    --------
+        Параметры:
+            func: callable
+                функция, отмеченная декоратором task;
+            args:
+                аргументы, сериализуемые в JSON;
+            delay: int
+                через сколько секунд выполнить.
+    """
+    if settings.TASKS_EAGER:
+        func(*args)
+        return
+    fields = {
+        "name": func.task_name,
+        "args": json.dumps(args),
+        "max_attempts": func.max_attempts or settings.TASK_MAX_ATTEMPTS,
+    }
+    transaction.on_commit(lambda: Task.objects.create(
+        run_at=timezone.now() + dt.timedelta(seconds=delay), **fields
+    ))
+
+
+def resolve(name: str):
+    """Функция задачи по её пути; только функции с декоратором task."""
+    func = import_string(name)
+    if getattr(func, "task_name", None) != name:
+        raise ImportError(f"{name} не является задачей")
+    return func
+
+
+def retry_delay(attempts: int) -> dt.timedelta:
+    """Задержка перед следующей попыткой: удваивается с каждой
+    попыткой, случайный разброс не даёт задачам повторяться разом."""
+    seconds = min(
+        settings.TASK_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.TASK_RETRY_MAX_DELAY
+    )
+    return dt.timedelta(seconds=seconds * random.uniform(0.5, 1))
+
+
+def requeue_lost() -> int:
+    """Возвращает в очередь задачи, выполняющиеся дольше TASK_TIMEOUT."""
+    deadline = timezone.now() - dt.timedelta(seconds=settings.TASK_TIMEOUT)
+    return Task.objects.filter(
+        status=Task.RUNNING, started__lt=deadline
+    ).update(status=Task.PENDING, locked_by="")
+
+
+def claim(worker: str, limit: int) -> list:
+    """Забирает до limit задач, срок которых наступил, и возвращает их.
+
+    Задачи помечаются обработчиком worker одним UPDATE с условием
+    на состояние, поэтому одну задачу не заберут два обработчика.
+    """
+    now = timezone.now()
+    ids = list(
+        Task.objects.filter(status=Task.PENDING, run_at__lte=now)
+        .order_by("run_at", "pk")
+        .values_list("pk", flat=True)[:limit]
+    )
+    if not ids:
+        return []
+    Task.objects.filter(pk__in=ids, status=Task.PENDING).update(
+        status=Task.RUNNING, locked_by=worker, started=now
+    )
+    return list(
+        Task.objects.filter(
+            pk__in=ids, status=Task.RUNNING, locked_by=worker
+        ).order_by("run_at", "pk")
+    )
+
+
+def execute(task: Task) -> bool:
+    """Выполняет забранную задачу и сохраняет результат;
+    возвращает False, если задача упала."""
+    task.attempts += 1
+    try:
+        resolve(task.name)(*json.loads(task.args))
+    except Exception:
+        task.last_error = traceback.format_exc()
+        if task.attempts >= task.max_attempts:
+            task.status = Task.FAILED
+            task.finished = timezone.now()
+            logger.exception(
+                "Задача %s (%s) не выполнена за %s попыток",
+                task.pk, task.name, task.attempts
+            )
+        else:
+            task.status = Task.PENDING
+            task.run_at = timezone.now() + retry_delay(task.attempts)
+            logger.warning(
+                "Задача %s (%s) упала, попытка %s в %s",
+                task.pk, task.name, task.attempts + 1, task.run_at,
+                exc_info=True
+            )
+        task.locked_by = ""
+        task.save()
+        return False
+    task.status = Task.DONE
+    task.finished = timezone.now()
+    task.save()
+    logger.info(
+        "Задача %s (%s) выполнена: ожидание %.0f мс, выполнение %.0f мс",
+        task.pk, task.name,
+        (task.started - task.run_at).total_seconds() * 1000,
+        (task.finished - task.started).total_seconds() * 1000
+    )
+    return True
+
+
+def purge_done() -> int:
+    """Удаляет выполненные задачи старше TASK_RETENTION."""
+    deadline = timezone.now() - dt.timedelta(
+        seconds=settings.TASK_RETENTION
+    )
+    deleted, _ = Task.objects.filter(
+        status=Task.DONE, finished__lt=deadline
+    ).delete()
+    return deleted
+
+
+def queue_stats(window: int = 1000) -> dict:
+    """Метрики очереди: число задач по состояниям, возраст самой
+    старой ждущей задачи и задержка/длительность последних window
+    выполненных задач (p50, p95, среднее, мс)."""
+    now = timezone.now()
+    depth = dict.fromkeys(status for status, _ in Task.STATUSES)
+    depth.update(
+        Task.objects.order_by().values_list("status")
+        .annotate(Count("pk"))
+    )
+    oldest = (
+        Task.objects.filter(status=Task.PENDING, run_at__lte=now)
+        .order_by("run_at").values_list("run_at", flat=True).first()
+    )
+    recent = (
+        Task.objects.filter(status=Task.DONE)
+        .order_by("-finished")
+        .values_list("run_at", "started", "finished")[:window]
+    )
+    waits, durations = [], []
+    for run_at, started, finished in recent:
+        waits.append((started - run_at).total_seconds() * 1000)
+        durations.append((finished - started).total_seconds() * 1000)
+    return {
+        "depth": {status: count or 0 for status, count in depth.items()},
+        "oldest_pending_seconds": (
+            round((now - oldest).total_seconds(), 3) if oldest else 0
+        ),
+        "wait": summarize(waits) if waits else None,
+        "run": summarize(durations) if durations else None,
+    }
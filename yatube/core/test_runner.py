@@ -0,0 +1,29 @@
+"""Запуск тестов manage.py test (settings.TEST_RUNNER)."""
+import unittest
+
+from django.test import TransactionTestCase
+from django.test.runner import DiscoverRunner
+
+from .testing import clear_caches
+
+
+class CacheClearingMixin:
+    """Очищает кеши перед каждым тестом с базой данных
+    (core.testing.clear_caches); SimpleTestCase запросов к базе,
+    а значит и к кешу в ней, не делает."""
+
+    def startTest(self, test):
+        if isinstance(test, TransactionTestCase):
+            clear_caches()
+        super().startTest(test)
+
+
+class TestRunner(DiscoverRunner):
+    """DiscoverRunner, каждый тест которого начинается с пустого
+    кеша: тесты работают с временем жизни кеша продакшена."""
+
+    def get_resultclass(self):
+        base = super().get_resultclass() or unittest.TextTestResult
+        return type(
+            f"CacheClearing{base.__name__}", (CacheClearingMixin, base), {}
+        )
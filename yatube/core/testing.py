@@ -0,0 +1,50 @@
+"""Помощники для тестов (pytest и unittest)."""
+from contextlib import ExitStack
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.urls import resolve
+
+from .queries import QueryRecorder, get_budget
+
+
+def clear_caches():
+    """Очищает все кеши. Кеш (и L1 в памяти процесса, и общий)
+    не откатывается вместе с базой теста, поэтому каждый тест
+    начинается с пустого кеша."""
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+
+def assert_query_budget(client, url, data=None, **extra):
+    """Выполняет GET-запрос и падает, если представление
+    превысило объявленный в urls.py бюджет запросов
+    или повторяет один и тот же запрос (N+1).
+    --------
+        Параметры:
+            client: django.test.Client
+                клиент, от имени которого выполняется запрос.
+            url: str
+                адрес страницы.
+    """
+    match = resolve(urlsplit(url).path)
+    budget = get_budget(match.func)
+    assert budget is not None, (
+        f"Для {match.view_name} не объявлен бюджет запросов"
+    )
+    recorder = QueryRecorder()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        response = client.get(url, data, **extra)
+    executed = "\n".join(sql for sql, _ in recorder.queries)
+    assert len(recorder) <= budget, (
+        f"{match.view_name}: {len(recorder)} SQL-запросов "
+        f"(и {len(recorder.cache_queries)} к кешу) "
+        f"при бюджете {budget}:\n{executed}"
+    )
+    duplicates = recorder.duplicates()
+    assert not duplicates, f"{match.view_name}: N+1 {duplicates}"
+    return response
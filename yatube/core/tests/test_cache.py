@@ -0,0 +1,144 @@
+from django.core.cache import caches
+from django.core.signals import request_started
+from django.db import connections, router
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core.cache_backends import TwoTierCache
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'test-shared',
+    },
+}
+
+
+def worker(name):
+    """Кеш отдельного "процесса": свой L1, общий L2."""
+    return TwoTierCache(None, {'OPTIONS': {
+        'LOCAL_LOCATION': name,
+        'BROADCAST_PREFIXES': ('posts:',),
+    }})
+
+
+@override_settings(CACHES=CACHES)
+class TwoTierCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.first = worker('test-first')
+        self.second = worker('test-second')
+        for cache in (self.first, self.second):
+            cache.clear()
+
+    def new_request(self):
+        request_started.send(sender=self.__class__)
+
+    def test_read_through(self):
+        """Значение из общего кеша видно другим воркерам
+        и оседает в их L1.
+        """
+        self.first.set('key', 'value')
+        self.assertEqual(self.second.get('key'), 'value')
+        self.assertEqual(self.second.local.get('key'), 'value')
+        self.assertEqual(
+            self.second.get_many(['key', 'missing']), {'key': 'value'}
+        )
+
+    def test_broadcast_invalidation(self):
+        """Изменение ключа с префиксом BROADCAST_PREFIXES очищает
+        L1 других воркеров в начале следующего запроса.
+        """
+        self.first.set('posts:generation', 1)
+        self.new_request()
+        self.assertEqual(self.second.get('posts:generation'), 1)
+        self.first.set('posts:generation', 2)
+        self.assertEqual(self.second.get('posts:generation'), 1)
+        self.new_request()
+        self.assertEqual(self.second.get('posts:generation'), 2)
+
+    def test_broadcast_deletes_changed_keys_only(self):
+        """Рассылка удаляет из чужого L1 только изменённые ключи."""
+        self.first.set_many({'posts:generation': 1, 'posts:count': 1})
+        self.new_request()
+        self.second.get_many(['posts:generation', 'posts:count'])
+        self.first.set('posts:generation', 2)
+        self.new_request()
+        self.assertEqual(self.second.get('posts:generation'), 2)
+        self.assertEqual(self.second.local.get('posts:count'), 1)
+        self.first.delete('posts:count')
+        self.new_request()
+        self.assertIsNone(self.second.get('posts:count'))
+        self.assertEqual(self.second.local.get('posts:generation'), 2)
+
+    def test_missing_log_clears_local(self):
+        """Без записи об изменённых ключах L1 очищается целиком."""
+        self.first.set('posts:generation', 1)
+        self.new_request()
+        self.second.get('posts:generation')
+        self.second.local.set('template.fragment', 'html')
+        self.first.set('posts:generation', 2)
+        self.second.shared.delete('two-tier:changed:2')
+        self.new_request()
+        self.assertEqual(self.second.get('posts:generation'), 2)
+        self.assertIsNone(self.second.local.get('template.fragment'))
+
+    def test_no_broadcast_for_other_keys(self):
+        """Запись прочих ключей не сбрасывает чужой L1."""
+        self.first.set('posts:generation', 1)
+        self.new_request()
+        self.second.get('posts:generation')
+        self.first.set('template.fragment', 'html')
+        self.new_request()
+        self.assertEqual(self.second.local.get('posts:generation'), 1)
+
+    def test_local_timeout(self):
+        """Время жизни записей L1 не больше LOCAL_TIMEOUT."""
+        self.assertEqual(self.first._local_timeout(None), 5)
+        self.assertEqual(self.first._local_timeout(2), 2)
+        self.assertEqual(self.first._local_timeout(600), 5)
+
+    def test_incr_delete(self):
+        """incr и delete доходят до других воркеров."""
+        self.first.set('posts:count', 1)
+        self.assertEqual(self.first.incr('posts:count'), 2)
+        self.new_request()
+        self.assertEqual(self.second.get('posts:count'), 2)
+        self.second.delete('posts:count')
+        self.new_request()
+        self.assertIsNone(self.first.get('posts:count'))
+
+
+class DatabaseCacheTests(TransactionTestCase):
+    def test_set_many_one_transaction(self):
+        """set_many записывает все ключи одной транзакцией."""
+        cache = caches['shared']
+        connection = connections[router.db_for_write(cache.cache_model_class)]
+        data = {f'card:{i}': i for i in range(5)}
+        with CaptureQueriesContext(connection) as queries:
+            cache.set_many(data)
+        begins = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('BEGIN')
+        ]
+        self.assertEqual(len(begins), 1)
+        self.assertEqual(cache.get_many(list(data)), data)
+
+    def test_incr_single_update(self):
+        """incr меняет значение одним UPDATE, а истёкший
+        или отсутствующий ключ - ошибка, как в других бэкендах."""
+        cache = caches['shared']
+        connection = connections[router.db_for_write(cache.cache_model_class)]
+        cache.set('page-count:all:', 5)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(cache.incr('page-count:all:', 2), 7)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(cache.decr('page-count:all:'), 6)
+        self.assertEqual(cache.get('page-count:all:'), 6)
+        with self.assertRaises(ValueError):
+            cache.incr('missing')
+        cache.set('expired', 1, -1)
+        with self.assertRaises(ValueError):
+            cache.incr('expired')
@@ -0,0 +1,73 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import TransactionTestCase, override_settings
+
+from core import concurrency
+from core.queries import QueryRecorder
+
+User = get_user_model()
+
+
+@override_settings(READ_WORKERS=2)
+class GatherTests(TransactionTestCase):
+    def setUp(self):
+        executor = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(executor.shutdown)
+        patcher = mock.patch.object(concurrency, "_executor", executor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_results_in_order(self):
+        """Результаты возвращаются в порядке функций,
+        функции выполняются в разных потоках."""
+        barrier = threading.Barrier(3, timeout=5)
+
+        def task(value):
+            # Все три функции должны выполняться одновременно.
+            barrier.wait()
+            return value, threading.get_ident()
+
+        results = concurrency.gather(
+            lambda: task(1), lambda: task(2), lambda: task(3)
+        )
+        self.assertEqual([value for value, _ in results], [1, 2, 3])
+        self.assertEqual(len({ident for _, ident in results}), 3)
+
+    def test_exception(self):
+        """Исключение функции из пула пробрасывается."""
+        def fail():
+            raise ValueError
+
+        with self.assertRaises(ValueError):
+            concurrency.gather(lambda: None, fail)
+
+    def test_sequential_in_transaction(self):
+        """Внутри транзакции функции выполняются в вызывающем потоке."""
+        with transaction.atomic():
+            idents = concurrency.gather(
+                threading.get_ident, threading.get_ident
+            )
+        self.assertEqual(set(idents), {threading.get_ident()})
+
+    @override_settings(READ_WORKERS=0)
+    def test_sequential_without_pool(self):
+        """При READ_WORKERS = 0 пул не используется."""
+        idents = concurrency.gather(threading.get_ident, threading.get_ident)
+        self.assertEqual(set(idents), {threading.get_ident()})
+
+    def test_execute_wrappers(self):
+        """Запросы из потоков пула учитываются обёрткой
+        вызывающего потока."""
+        User.objects.create_user(username="reader")
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            first, second = concurrency.gather(
+                lambda: User.objects.count(),
+                lambda: User.objects.filter(username="reader").exists()
+            )
+        self.assertEqual((first, second), (1, True))
+        self.assertEqual(len(recorder), 2)
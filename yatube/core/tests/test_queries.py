@@ -0,0 +1,87 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory, TestCase, TransactionTestCase, override_settings
+)
+from django.urls import ResolverMatch
+
+from core.middleware import QueryInspectorMiddleware
+from core.queries import QueryBudgetExceeded, normalize, query_budget
+
+User = get_user_model()
+
+
+def users_view(request):
+    for pk in range(6):
+        User.objects.filter(pk=pk).exists()
+    cache.get('core:users')
+    return HttpResponse()
+
+
+def cached_view(request):
+    # Запись в DatabaseCache - своя транзакция BEGIN IMMEDIATE.
+    cache.set('core:count', User.objects.count())
+    return HttpResponse()
+
+
+class QueryInspectorTests(TestCase):
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+        view = query_budget(users_view, 2)
+        self.request.resolver_match = ResolverMatch(view, (), {}, 'users')
+
+    def middleware(self):
+        return QueryInspectorMiddleware(
+            lambda request: request.resolver_match.func(request)
+        )
+
+    def test_normalize(self):
+        """Форма запроса не зависит от значений параметров."""
+        self.assertEqual(
+            normalize("SELECT * FROM t WHERE id = 1 AND s = 'a''b'"),
+            normalize("SELECT  * FROM t WHERE id = 25 AND s = 'x'")
+        )
+        self.assertEqual(
+            normalize("SELECT * FROM t WHERE id IN (%s, %s, %s)"),
+            "SELECT * FROM t WHERE id IN (...)"
+        )
+
+    @override_settings(QUERY_SAMPLE_RATE=0)
+    def test_sampling_off(self):
+        """Без выборки запросы не считаются."""
+        response = self.middleware()(self.request)
+        self.assertNotIn('X-Query-Count', response)
+
+    @override_settings(QUERY_SAMPLE_RATE=1)
+    def test_budget_and_n_plus_one_logged(self):
+        """Превышение бюджета и N+1 попадают в лог."""
+        with self.assertLogs('core.queries', 'WARNING') as logs:
+            response = self.middleware()(self.request)
+        self.assertEqual(response['X-Query-Count'], '6')
+        self.assertGreater(int(response['X-Cache-Query-Count']), 0)
+        self.assertTrue(any('N+1' in line for line in logs.output))
+        self.assertTrue(any('бюджете 2' in line for line in logs.output))
+
+    @override_settings(QUERY_SAMPLE_RATE=1, QUERY_BUDGET_RAISE=True)
+    def test_budget_raise(self):
+        """С QUERY_BUDGET_RAISE превышение бюджета - ошибка."""
+        with self.assertLogs('core.queries', 'WARNING'):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.middleware()(self.request)
+
+
+class TransactionQueriesTests(TransactionTestCase):
+    @override_settings(QUERY_SAMPLE_RATE=1, QUERY_BUDGET_RAISE=True)
+    def test_cache_write_within_budget(self):
+        """BEGIN и COMMIT записи в кеш при отрисовке не считаются
+        запросами представления."""
+        request = RequestFactory().get('/')
+        request.resolver_match = ResolverMatch(
+            query_budget(cached_view, 1), (), {}, 'cached'
+        )
+        response = QueryInspectorMiddleware(
+            lambda request: request.resolver_match.func(request)
+        )(request)
+        self.assertEqual(response['X-Query-Count'], '1')
+        self.assertGreater(int(response['X-Cache-Query-Count']), 0)
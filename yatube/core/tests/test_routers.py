@@ -0,0 +1,136 @@
+import random
+from collections import Counter
+from contextlib import ExitStack
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.db import connections
+from django.test import (Client, SimpleTestCase, TransactionTestCase,
+                         override_settings)
+from django.urls import reverse
+
+from core.queries import QueryRecorder
+from core.routers import (STICKY_COOKIE, ReplicaRouter, choose_replica,
+                          routing)
+from posts.models import Post
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS={"first": 3, "second": 1})
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_weights(self):
+        """Реплики выбираются пропорционально весам."""
+        random.seed(0)
+        chosen = Counter(choose_replica() for _ in range(4000))
+        self.assertEqual(set(chosen), {"first", "second"})
+        self.assertAlmostEqual(chosen["first"] / 4000, 0.75, delta=0.03)
+
+    def test_default(self):
+        """Вне представлений REPLICA_VIEWS и для других приложений
+        чтение идёт в default."""
+        self.assertIsNone(self.router.db_for_read(Post))
+        with routing() as state:
+            self.assertIsNone(self.router.db_for_read(Post))
+            state.replica = "first"
+            self.assertIsNone(self.router.db_for_read(Session))
+
+    def test_one_replica_per_request(self):
+        """Все чтения запроса идут на выбранную для него реплику."""
+        with routing() as state:
+            state.replica = "second"
+            self.assertEqual(
+                {self.router.db_for_read(Post) for _ in range(100)},
+                {"second"}
+            )
+
+    def test_write(self):
+        """Запись в модели REPLICA_APPS отмечается в состоянии."""
+        with routing() as state:
+            self.router.db_for_write(Session)
+            self.assertFalse(state.wrote)
+            self.assertIsNone(self.router.db_for_write(Post))
+            self.assertTrue(state.wrote)
+        self.assertFalse(self.router.allow_migrate("first", "posts"))
+
+
+@override_settings(DATABASE_REPLICAS={"replica": 1})
+class ReplicaRoutingViewTests(TransactionTestCase):
+    databases = {"default", "replica", "second"}
+
+    @classmethod
+    def setUpClass(cls):
+        # Реплики - другие подключения к тестовой базе default.
+        for alias in ("replica", "second"):
+            connections.databases[alias] = {
+                **connections["default"].settings_dict,
+                "TEST": {"MIRROR": "default"},
+            }
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        for alias in ("replica", "second"):
+            connections[alias].close()
+            del connections.databases[alias]
+
+    def setUp(self):
+        self.author = User.objects.create_user(username="author")
+        self.post = Post.objects.create(author=self.author, text="Пост")
+        self.detail = reverse("posts:post_detail", args=[self.post.pk])
+
+    def get(self, client, url):
+        recorders = {alias: QueryRecorder() for alias in self.databases}
+        with ExitStack() as stack:
+            for alias, recorder in recorders.items():
+                stack.enter_context(
+                    connections[alias].execute_wrapper(recorder)
+                )
+            response = client.get(url)
+        return response, {
+            alias: len(recorder) for alias, recorder in recorders.items()
+        }
+
+    def test_read_views(self):
+        """Страницы постов читаются с реплики, действия - с default."""
+        client = Client()
+        response, queries = self.get(client, self.detail)
+        self.assertContains(response, "Пост")
+        self.assertGreater(queries["replica"], 0)
+        client.force_login(self.author)
+        _, queries = self.get(
+            client, reverse("posts:post_edit", args=[self.post.pk])
+        )
+        self.assertEqual(queries["replica"], 0)
+
+    def test_read_your_writes(self):
+        """После своей записи клиент читает с default."""
+        client = Client()
+        client.force_login(User.objects.create_user(username="reader"))
+        response, _ = self.get(
+            client, reverse("posts:post_like", args=[self.post.pk])
+        )
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        _, queries = self.get(client, self.detail)
+        self.assertEqual(queries["replica"], 0)
+        client.cookies.pop(STICKY_COOKIE)
+        _, queries = self.get(client, self.detail)
+        self.assertGreater(queries["replica"], 0)
+
+    @override_settings(DATABASE_REPLICAS={"replica": 1, "second": 1})
+    def test_one_replica_per_request(self):
+        """Все чтения одного запроса идут на одну реплику."""
+        random.seed(0)
+        used = set()
+        for _ in range(6):
+            _, queries = self.get(Client(), self.detail)
+            replicas = {
+                alias for alias in ("replica", "second") if queries[alias]
+            }
+            self.assertEqual(len(replicas), 1)
+            used |= replicas
+        self.assertEqual(used, {"replica", "second"})
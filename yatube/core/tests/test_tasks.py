@@ -0,0 +1,126 @@
+import datetime as dt
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+
+from core import tasks
+from core.models import Task
+from posts.models import FeedItem, Follow, Post
+
+User = get_user_model()
+
+calls = []
+
+
+@tasks.task
+def record(value):
+    calls.append(value)
+
+
+@tasks.task(max_attempts=2)
+def explode():
+    raise ValueError("Сбой")
+
+
+def run_tasks():
+    call_command("run_tasks", "--once", "--workers", "2", stdout=StringIO())
+
+
+@override_settings(TASK_RETRY_DELAY=60)
+class TaskQueueTests(TransactionTestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueued_after_commit(self):
+        """Задача появляется в очереди только после коммита,
+        при откате транзакции - не появляется."""
+        with transaction.atomic():
+            record.enqueue(1)
+            self.assertFalse(Task.objects.exists())
+        with self.assertRaises(ValueError), transaction.atomic():
+            record.enqueue(2)
+            raise ValueError
+        task = Task.objects.get()
+        self.assertEqual(task.name, "core.tests.test_tasks.record")
+        self.assertEqual(json.loads(task.args), [1])
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager(self):
+        """При TASKS_EAGER задача выполняется сразу."""
+        record.enqueue(1)
+        self.assertEqual(calls, [1])
+        self.assertFalse(Task.objects.exists())
+
+    def test_run_tasks(self):
+        """run_tasks --once выполняет задачи, срок которых наступил."""
+        for value in range(3):
+            record.enqueue(value)
+        record.enqueue(3, delay=60)
+        run_tasks()
+        self.assertEqual(sorted(calls), [0, 1, 2])
+        stats = tasks.queue_stats()
+        self.assertEqual(stats["depth"][Task.DONE], 3)
+        self.assertEqual(stats["depth"][Task.PENDING], 1)
+        self.assertEqual(stats["depth"][Task.FAILED], 0)
+        self.assertIsNotNone(stats["wait"])
+
+    def test_retry_then_failed(self):
+        """Упавшая задача откладывается, после max_attempts
+        попыток остаётся с ошибкой."""
+        explode.enqueue()
+        run_tasks()
+        task = Task.objects.get()
+        self.assertEqual(task.status, Task.PENDING)
+        self.assertEqual(task.attempts, 1)
+        self.assertGreater(task.run_at, timezone.now())
+        self.assertIn("Сбой", task.last_error)
+
+        Task.objects.update(run_at=timezone.now())
+        run_tasks()
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.FAILED)
+        self.assertEqual(task.attempts, 2)
+
+    def test_retry_delay_grows(self):
+        """Задержка повтора растёт экспоненциально до наибольшей."""
+        with override_settings(TASK_RETRY_MAX_DELAY=300):
+            self.assertLessEqual(
+                tasks.retry_delay(1), dt.timedelta(seconds=60)
+            )
+            self.assertGreaterEqual(
+                tasks.retry_delay(3), dt.timedelta(seconds=120)
+            )
+            self.assertLessEqual(
+                tasks.retry_delay(10), dt.timedelta(seconds=300)
+            )
+
+    def test_lost_task_requeued(self):
+        """Задача, выполняющаяся дольше TASK_TIMEOUT, возвращается
+        в очередь."""
+        record.enqueue(1)
+        self.assertEqual(len(tasks.claim("worker", 10)), 1)
+        self.assertEqual(tasks.claim("other", 10), [])
+        Task.objects.update(
+            started=timezone.now() - dt.timedelta(hours=1)
+        )
+        self.assertEqual(tasks.requeue_lost(), 1)
+        self.assertEqual(len(tasks.claim("other", 10)), 1)
+
+    def test_post_side_effects_queued(self):
+        """Рассылка нового поста по лентам выполняется обработчиком
+        очереди, а не в запросе."""
+        author = User.objects.create_user(username="author")
+        reader = User.objects.create_user(username="reader")
+        Follow.objects.create(user=reader, author=author)
+        post = Post.objects.create(author=author, text="Пост")
+        self.assertFalse(FeedItem.objects.exists())
+        run_tasks()
+        self.assertTrue(FeedItem.objects.filter(user=reader, post=post))
+        self.assertFalse(
+            Task.objects.exclude(status=Task.DONE).exists()
+        )
@@ -1,6 +1,10 @@
 from django.contrib import admin
 
+from core.admin import input_filter
+from core.paginator import EstimatedCountPaginator
+
 from .models import Comment, Follow, Group, Like, Post
+from .search import matching_posts
 
 
 @admin.register(Post)
@@ -13,10 +17,33 @@ class PostAdmin(admin.ModelAdmin):
         'group'
     )
     list_editable = ('group', 'text')
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date', 'group')
+    date_hierarchy = 'pub_date'
+    autocomplete_fields = ('author',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = '-пусто-'
 
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(
+            db_field, request, **kwargs
+        )
+        if db_field.name in self.list_editable:
+            # Варианты выбираются один раз на форму списка,
+            # а не отдельным запросом в каждой строке
+            # (iter - без лишнего COUNT(*) для len()).
+            formfield.choices = list(iter(formfield.choices))
+        return formfield
+
+    def get_search_results(self, request, queryset, search_term):
+        """Ищет по поисковому индексу вместо LIKE по search_fields."""
+        if not search_term:
+            return queryset, False
+        found = matching_posts(search_term).values('pk')
+        return queryset.filter(pk__in=found), False
+
 
 @admin.register(Group)
 class PostGroup(admin.ModelAdmin):
@@ -42,8 +69,13 @@ class PostComment(admin.ModelAdmin):
         'post'
     )
     list_editable = ("text",)
+    list_select_related = ("author", "post")
     search_fields = ("text",)
-    list_filter = ("created", "author")
+    list_filter = ("created", input_filter("author__username", "автору"))
+    date_hierarchy = "created"
+    raw_id_fields = ("author", "post")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = '-пусто-'
 
 
@@ -54,8 +86,14 @@ class PostFollow(admin.ModelAdmin):
         'user',
         'author'
     )
-    search_fields = ("author",)
-    list_filter = ("user", "author")
+    list_select_related = ("user", "author")
+    list_filter = (
+        input_filter("user__username", "подписчику"),
+        input_filter("author__username", "автору"),
+    )
+    raw_id_fields = ("user", "author")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = '-пусто-'
 
 
@@ -66,6 +104,13 @@ class PostLike(admin.ModelAdmin):
         'user',
         'post'
     )
-    search_fields = ("post",)
-    list_filter = ("user", "post")
+    list_select_related = ("user", "post")
+    list_filter = (
+        input_filter("user__username", "пользователю"),
+        input_filter("post", "id поста"),
+    )
+    date_hierarchy = "created"
+    raw_id_fields = ("user", "post")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = '-пусто-'
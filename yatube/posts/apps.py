@@ -5,3 +5,6 @@ class PostsConfig(AppConfig):
     name = "posts"
     verbose_name = "управление записями блога"
     verbose_name_plural = "управление записями блога"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,67 @@
+"""Кеш карточек постов в списках ("матрёшка" внутри кеша страницы).
+
+Неизменная часть карточки - автор, дата, картинка, текст и ссылки -
+кешируется по ключу из id и версии поста (Post.version) и варианта
+ссылок: на странице автора не выводится ссылка на автора, на странице
+группы - на группу. Версия увеличивается при изменении поста, его
+картинки, группы и имени автора, поэтому старые карточки не
+удаляются, а перестают читаться и истекают через POST_CARD_TIMEOUT.
+
+Карточки страницы читаются одним get_many, заново собираются только
+отсутствующие, и они записываются одним set_many. Счётчики, кнопка
+лайка и отметки пользователя выводятся вне карточки.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+CARD_TEMPLATE = "includes/post/post.html"
+
+
+def bump_versions(posts) -> int:
+    """Увеличивает версию постов QuerySet posts."""
+    return posts.update(version=F("version") + 1)
+
+
+def card_context(post, path: str) -> dict:
+    return {
+        "post": post,
+        "show_author_link": post.author.username not in path,
+        "show_group_link": bool(post.group) and post.group.slug not in path,
+    }
+
+
+def card_key(context: dict) -> str:
+    post = context["post"]
+    variant = (
+        f"{context['show_author_link']:d}{context['show_group_link']:d}"
+    )
+    return f"post-card:{post.pk}:{post.version}:{variant}"
+
+
+def attach(posts, path: str) -> None:
+    """Проставляет постам card_html - HTML карточки из кеша
+    или собранный заново.
+    --------
+        Параметры:
+            posts: iterable
+                посты страницы (с select_related author и group).
+            path: str
+                путь страницы, по нему выбирается вариант ссылок.
+    """
+    contexts = {}
+    for post in posts:
+        context = card_context(post, path)
+        contexts[card_key(context)] = context
+    cached = cache.get_many(list(contexts))
+    rendered = {
+        key: render_to_string(CARD_TEMPLATE, context)
+        for key, context in contexts.items() if key not in cached
+    }
+    if rendered:
+        cache.set_many(rendered, settings.POST_CARD_TIMEOUT)
+    cached.update(rendered)
+    for key, context in contexts.items():
+        context["post"].card_html = mark_safe(cached[key])
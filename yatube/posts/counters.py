@@ -0,0 +1,174 @@
+"""Денормализованные счётчики постов и авторов.
+
+Счётчики меняются атомарно через F-выражения из сигналов
+сохранения/удаления Post, Comment и Like; расхождения
+исправляет команда reconcile_counters.
+
+Число постов пажинируемых списков (все посты, группа, автор,
+лента подписок) хранится в кеше (core.paginator.CachedCountPaginator):
+сигналы Post меняют его на ±1 после коммита транзакции (пост,
+сменивший группу или автора, переносится между списками), ленты -
+сбрасывают при рассылке, подписке и отписке. Посты "знаменитостей",
+подмешиваемые в ленты при чтении, ленты не сбрасывают: расхождение
+исчезает через PAGE_COUNT_TIMEOUT.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from core.db import immediate_atomic
+
+from .models import AuthorStats, Post
+
+PAGE_COUNT_SCOPES = ("all", "group", "author", "feed")
+
+User = get_user_model()
+
+
+def change_post_counter(post_id: int, field: str, delta: int) -> None:
+    """Изменяет счётчик field поста на delta."""
+    posts = Post.objects.filter(pk=post_id)
+    if delta < 0:
+        posts = posts.filter(**{f"{field}__gte": -delta})
+    posts.update(**{field: F(field) + delta})
+
+
+def change_post_count(author_id: int, delta: int) -> None:
+    """Изменяет счётчик постов автора на delta.
+
+    Если записи со счётчиками ещё нет, она создаётся
+    с точным значением.
+    """
+    stats = AuthorStats.objects.filter(author_id=author_id)
+    if delta < 0:
+        stats = stats.filter(post_count__gte=-delta)
+    if stats.update(post_count=F("post_count") + delta):
+        return
+    if AuthorStats.objects.filter(author_id=author_id).exists():
+        return
+    try:
+        with immediate_atomic():
+            AuthorStats.objects.create(
+                author_id=author_id,
+                post_count=Post.objects.filter(author_id=author_id).count()
+            )
+    except IntegrityError:
+        # Запись успел создать параллельный запрос.
+        pass
+
+
+def page_count_key(scope: str, value="") -> str:
+    """Ключ кеша числа постов списка: scope из PAGE_COUNT_SCOPES,
+    value - slug группы, имя автора или id читателя ленты."""
+    return f"page-count:{scope}:{value}"
+
+
+def page_count_refresh_key(scope: str, value="") -> str:
+    """Ключ отметки о поставленном в очередь точном подсчёте."""
+    return f"{page_count_key(scope, value)}:refresh"
+
+
+def _incr_on_commit(keys, delta: int) -> None:
+    """Меняет на delta числа keys, которые есть в кеше, после
+    коммита транзакции: при откате кеш не расходится с базой."""
+    def incr():
+        for key in keys:
+            try:
+                cache.incr(key, delta)
+            except ValueError:
+                pass
+
+    if keys:
+        transaction.on_commit(incr)
+
+
+def _list_keys(username: str, slug=None) -> set:
+    """Ключи чисел постов страниц автора и группы (если она есть)."""
+    keys = {page_count_key("author", username)}
+    if slug is not None:
+        keys.add(page_count_key("group", slug))
+    return keys
+
+
+def change_page_counts(post: Post, delta: int) -> None:
+    """Меняет на delta посчитанные числа постов списков,
+    в которые входит пост; непосчитанные не трогает."""
+    keys = _list_keys(
+        post.author.username, post.group.slug if post.group_id else None
+    )
+    _incr_on_commit([page_count_key("all"), *keys], delta)
+
+
+def move_page_counts(post: Post) -> None:
+    """Переносит сохраняемый пост, сменивший группу или автора,
+    из посчитанных чисел постов старых списков в новые.
+    Вызывается до сохранения: старые значения читаются из базы."""
+    stored = Post.objects.filter(pk=post.pk).values(
+        "author_id", "author__username", "group_id", "group__slug"
+    ).first()
+    if stored is None or (stored["author_id"], stored["group_id"]) == (
+        post.author_id, post.group_id
+    ):
+        return
+    old = _list_keys(stored["author__username"], stored["group__slug"])
+    new = _list_keys(
+        post.author.username, post.group.slug if post.group_id else None
+    )
+    _incr_on_commit(sorted(old - new), -1)
+    _incr_on_commit(sorted(new - old), 1)
+
+
+def reset_feed_counts(user_ids) -> None:
+    """Сбрасывает числа постов лент пользователей."""
+    cache.delete_many([page_count_key("feed", pk) for pk in user_ids])
+
+
+def reconcile_posts(post_ids) -> int:
+    """Пересчитывает счётчики постов, возвращает число исправленных."""
+    posts = Post.objects.filter(pk__in=post_ids).annotate(
+        actual_likes=Count("liked", distinct=True),
+        actual_comments=Count("comments", distinct=True)
+    ).only("pk", "like_count", "comment_count")
+    drifted = []
+    for post in posts:
+        actual = (post.actual_likes, post.actual_comments)
+        if (post.like_count, post.comment_count) != actual:
+            post.like_count, post.comment_count = actual
+            drifted.append(post)
+    Post.objects.bulk_update(drifted, ["like_count", "comment_count"])
+    return len(drifted)
+
+
+def reconcile_authors(author_ids) -> int:
+    """Пересчитывает счётчики авторов, возвращает число исправленных."""
+    actual = dict(
+        User.objects.filter(pk__in=author_ids).annotate(
+            total=Count("posts")
+        ).values_list("pk", "total")
+    )
+    stored = dict(
+        AuthorStats.objects.filter(author_id__in=author_ids)
+        .values_list("author_id", "post_count")
+    )
+    drifted = {
+        author_id: total for author_id, total in actual.items()
+        if stored.get(author_id) != total
+    }
+    AuthorStats.objects.bulk_create(
+        [
+            AuthorStats(author_id=author_id, post_count=total)
+            for author_id, total in drifted.items()
+            if author_id not in stored
+        ],
+        ignore_conflicts=True
+    )
+    AuthorStats.objects.bulk_update(
+        [
+            AuthorStats(author_id=author_id, post_count=total)
+            for author_id, total in drifted.items()
+            if author_id in stored
+        ],
+        ["post_count"]
+    )
+    return len(drifted)
@@ -0,0 +1,206 @@
+"""Материализованная лента подписок (fan-out-on-write).
+
+При публикации id поста записывается в ленту каждого подписчика
+автора (FeedItem), поэтому follow_index читает готовый список
+вместо соединения Post -> Follow. Посты авторов, у которых больше
+FEED_FANOUT_MAX_FOLLOWERS подписчиков, по лентам не рассылаются
+(Post.fanned_out=False) и подмешиваются при чтении.
+
+Лента хранит FEED_MAX_LENGTH последних постов: более старые
+удаляются из FeedItem и для дальних страниц выбираются из постов
+подписок отдельным запросом, так что лента не теряет постов.
+Страница собирается из ограниченных запросов (окно FeedItem,
+посты старше окна, неразосланные) слиянием в Python - см. Feed.
+"""
+from django.conf import settings
+from django.db.models import Count, Min, OuterRef, Subquery
+
+from .counters import reset_feed_counts
+from .models import FeedItem, Follow, Post
+
+
+def _trim(user_ids):
+    """Оставляет в лентах пользователей FEED_MAX_LENGTH
+    последних записей."""
+    cutoff = FeedItem.objects.filter(
+        user_id=OuterRef("user_id")
+    ).order_by("-post_id").values("post_id")[
+        settings.FEED_MAX_LENGTH:settings.FEED_MAX_LENGTH + 1
+    ]
+    FeedItem.objects.filter(
+        user_id__in=user_ids,
+        post_id__lte=Subquery(cutoff)
+    ).delete()
+
+
+def fan_out(post: Post) -> bool:
+    """Записывает пост в ленты подписчиков автора.
+
+    Возвращает False, если у автора слишком много подписчиков
+    и пост будет подмешиваться в ленту при чтении.
+    """
+    limit = settings.FEED_FANOUT_MAX_FOLLOWERS
+    follower_ids = list(
+        Follow.objects.filter(author_id=post.author_id)
+        .values_list("user_id", flat=True)[:limit + 1]
+    )
+    if len(follower_ids) > limit:
+        return False
+    FeedItem.objects.bulk_create(
+        [FeedItem(user_id=user_id, post=post) for user_id in follower_ids],
+        batch_size=settings.FEED_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+    if follower_ids:
+        _trim(follower_ids)
+        reset_feed_counts(follower_ids)
+    Post.objects.filter(pk=post.pk).update(fanned_out=True)
+    post.fanned_out = True
+    return True
+
+
+def backfill(user, author) -> None:
+    """Добавляет в ленту нового подписчика последние
+    разосланные посты автора."""
+    post_ids = Post.objects.filter(
+        author=author,
+        fanned_out=True
+    ).order_by("-pk").values_list("pk", flat=True)[:settings.FEED_MAX_LENGTH]
+    FeedItem.objects.bulk_create(
+        [FeedItem(user_id=user.pk, post_id=post_id) for post_id in post_ids],
+        batch_size=settings.FEED_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+    _trim([user.pk])
+    reset_feed_counts([user.pk])
+
+
+def rebuild(user_id: int) -> int:
+    """Заново собирает ленту пользователя: FEED_MAX_LENGTH последних
+    разосланных постов всех его авторов одним запросом, без
+    backfill и _trim по каждой подписке."""
+    post_ids = Post.objects.filter(
+        author__in=Follow.objects.filter(user_id=user_id).values("author_id"),
+        fanned_out=True
+    ).order_by("-pk").values_list("pk", flat=True)[:settings.FEED_MAX_LENGTH]
+    items = FeedItem.objects.bulk_create(
+        [FeedItem(user_id=user_id, post_id=post_id) for post_id in post_ids],
+        batch_size=settings.FEED_BATCH_SIZE
+    )
+    reset_feed_counts([user_id])
+    return len(items)
+
+
+def purge(user, author) -> None:
+    """Убирает из ленты бывшего подписчика посты автора."""
+    FeedItem.objects.filter(user=user, post__author=author).delete()
+    reset_feed_counts([user.pk])
+
+
+def reset_follower_counts(author_id: int) -> None:
+    """Сбрасывает числа постов лент подписчиков автора
+    (после удаления его поста)."""
+    reset_feed_counts(
+        Follow.objects.filter(author_id=author_id)
+        .values_list("user_id", flat=True)
+    )
+
+
+class Feed:
+    """Лента подписок пользователя - последовательность постов
+    по убыванию id для Paginator.
+
+    Строки страницы выбираются из FeedItem по индексу (user, post)
+    без сортировки. Неразосланные посты подписок (Post.fanned_out=False)
+    и разосланные посты старше окна ленты выбираются отдельными
+    запросами с LIMIT и сливаются с FeedItem в Python, а не одним
+    запросом с OR по всем постам подписок.
+    """
+    ordered = True
+
+    def __init__(self, user, posts=None):
+        self.user = user
+        self.posts = Post.objects.all() if posts is None else posts
+        self._live_count = None
+
+    def select_related(self, *fields):
+        return Feed(self.user, self.posts.select_related(*fields))
+
+    def _items(self):
+        return FeedItem.objects.filter(user=self.user).order_by("-post_id")
+
+    def _followed(self):
+        return Post.objects.filter(
+            author__in=Follow.objects.filter(user=self.user)
+            .values("author_id")
+        ).order_by("-pk")
+
+    def _unfanned(self):
+        return self._followed().filter(fanned_out=False)
+
+    def _older(self, oldest):
+        """Разосланные посты подписок старше окна ленты, начинающегося
+        с поста oldest (None - лента пуста)."""
+        posts = self._followed().filter(fanned_out=True)
+        if oldest is not None:
+            posts = posts.filter(pk__lt=oldest)
+        return posts
+
+    def post_ids(self, stop: int) -> list:
+        """id первых stop постов ленты."""
+        ids = list(self._items().values_list("post_id", flat=True)[:stop])
+        if len(ids) < stop:
+            # Окно исчерпано: дальше - посты, обрезанные _trim.
+            ids += self._older(ids[-1] if ids else None).values_list(
+                "pk", flat=True
+            )[:stop - len(ids)]
+        ids += self._unfanned().values_list("pk", flat=True)[:stop]
+        return sorted(set(ids), reverse=True)[:stop]
+
+    def fanned_count(self) -> int:
+        """Число разосланных постов ленты. Его поддерживают сигналы
+        (reset_feed_counts), поэтому оно кешируется."""
+        window = FeedItem.objects.filter(user=self.user).aggregate(
+            total=Count("pk"), oldest=Min("post_id")
+        )
+        older, unfanned = self._followed(), self._unfanned()
+        if window["oldest"] is not None:
+            older = older.filter(pk__lt=window["oldest"])
+            unfanned = unfanned.filter(pk__lt=window["oldest"])
+        # Разосланные посты старше окна - все посты подписок старше
+        # окна без неразосланных: оба числа считаются по индексам,
+        # без чтения fanned_out из строк.
+        return window["total"] + older.count() - unfanned.count()
+
+    def live_count(self) -> int:
+        """Число неразосланных постов ленты. Новый пост популярного
+        автора не меняет закешированные числа всех его подписчиков,
+        поэтому эта часть считается при каждом запросе
+        (core.paginator.CachedCountPaginator), один раз на Feed."""
+        if self._live_count is None:
+            self._live_count = self._unfanned().count()
+        return self._live_count
+
+    def count(self) -> int:
+        return self.fanned_count() + self.live_count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        if stop is None or start < 0 or stop < 0 or index.step:
+            raise ValueError("Лента поддерживает только срезы [start:stop].")
+        ids = self.post_ids(stop)[start:]
+        posts = self.posts.in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+    def __iter__(self):
+        return iter(self[:len(self)])
+
+
+def feed_posts(user) -> Feed:
+    """Посты ленты подписок пользователя (Feed)."""
+    return Feed(user)
@@ -1,5 +1,6 @@
 from django import forms
 
+from . import tasks
 from .models import Comment, Post
 
 
@@ -8,6 +9,17 @@ class PostForm(forms.ModelForm):
         model = Post
         fields = ("text", "group", "image")
 
+    def save(self, commit=True):
+        """Сохраняет пост; при смене картинки сбрасывает
+        старую миниатюру и ставит создание новой в очередь задач."""
+        image_changed = "image" in self.changed_data
+        if image_changed:
+            self.instance.image_set = ""
+        post = super().save(commit)
+        if commit and image_changed and post.image:
+            tasks.make_thumbnails.enqueue(post.pk)
+        return post
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,271 @@
+"""Синтетические данные для замеров производительности.
+
+Распределения приближены к реальной соцсети: популярность авторов
+подчиняется закону Ципфа - немногие авторы пишут большую часть
+постов и собирают большую часть подписчиков, лайки и комментарии
+достаются в основном постам популярных авторов. Тексты берутся
+из заранее сгенерированного Faker набора абзацев, строки пишутся
+через bulk_create пачками, после чего производные данные
+пересобираются transfer.rebuild_derived.
+"""
+import datetime as dt
+import random
+import time
+from dataclasses import dataclass
+from io import BytesIO
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from faker import Faker
+from PIL import Image, ImageDraw
+
+from .models import Comment, Follow, Group, Like, Post
+from .transfer import Report, keep_auto_now
+
+User = get_user_model()
+
+# Одинаковый пароль у всех пользователей: хеширование - самая
+# дорогая часть создания пользователя.
+PASSWORD = "loadtest"
+
+
+@dataclass
+class LoadConfig:
+    users: int = 1000
+    groups: int = 20
+    posts: int = 10000
+    # Средние значения: подписок на пользователя, лайков
+    # и комментариев на пост.
+    follows: int = 20
+    likes: int = 5
+    comments: int = 2
+    # Доля постов с картинкой и кол-во разных картинок.
+    images: float = 0.0
+    distinct_images: int = 5
+    # Посты публикуются равномерно за столько дней до текущего момента.
+    days: int = 365
+    seed: int = 0
+    batch_size: int = 5000
+    # Префикс имён пользователей, slug групп и файлов картинок.
+    prefix: str = "load"
+
+
+def zipf_weights(size: int, exponent: float = 1.0) -> list:
+    """Веса рангов 1..size по закону Ципфа."""
+    return [1 / rank ** exponent for rank in range(1, size + 1)]
+
+
+class LoadGenerator:
+    def __init__(self, config: LoadConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.fake = Faker("ru_RU")
+        self.fake.seed_instance(config.seed)
+        self.now = timezone.now()
+
+    def run(self) -> list:
+        """Создаёт все данные, возвращает отчёты по наборам."""
+        reports = [self.timed("users", self.make_users)]
+        reports.append(self.timed("groups", self.make_groups))
+        reports.append(self.timed("posts", self.make_posts))
+        reports.append(self.timed("follows", self.make_follows))
+        reports.append(self.timed("likes", self.make_likes))
+        reports.append(self.timed("comments", self.make_comments))
+        return reports
+
+    def timed(self, name, make) -> Report:
+        start = time.monotonic()
+        rows = make()
+        return Report(name, rows, time.monotonic() - start)
+
+    def insert(self, model, objects) -> int:
+        """bulk_create пачками по batch_size из генератора объектов,
+        возвращает кол-во добавленных строк. Повторные пары подписок
+        и лайков отбрасываются ограничениями уникальности."""
+        before = model.objects.count()
+        batch = []
+        for instance in objects:
+            batch.append(instance)
+            if len(batch) >= self.config.batch_size:
+                model.objects.bulk_create(batch, ignore_conflicts=True)
+                batch.clear()
+        model.objects.bulk_create(batch, ignore_conflicts=True)
+        return model.objects.count() - before
+
+    def make_users(self) -> int:
+        prefix = self.config.prefix
+        first = User.objects.filter(
+            username__startswith=f"{prefix}_"
+        ).count()
+        password = make_password(PASSWORD)
+        rows = self.insert(User, (
+            User(
+                username=f"{prefix}_{number}",
+                first_name=self.fake.first_name(),
+                last_name=self.fake.last_name(),
+                password=password,
+            )
+            for number in range(first, first + self.config.users)
+        ))
+        # bulk_create в SQLite не возвращает pk: ранг популярности
+        # задаётся случайной перестановкой созданных пользователей.
+        self.users = list(
+            User.objects.filter(username__startswith=f"{prefix}_")
+            .values_list("pk", flat=True)
+        )
+        self.rng.shuffle(self.users)
+        self.popularity = zipf_weights(len(self.users))
+        self.cum_popularity = list(accumulate(self.popularity))
+        return rows
+
+    def make_groups(self) -> int:
+        prefix = self.config.prefix
+        first = Group.objects.filter(slug__startswith=f"{prefix}-").count()
+        rows = self.insert(Group, (
+            Group(
+                title=self.fake.word().capitalize(),
+                slug=f"{prefix}-{number}",
+                description=self.fake.sentence(),
+            )
+            for number in range(first, first + self.config.groups)
+        ))
+        self.groups = list(
+            Group.objects.filter(slug__startswith=f"{prefix}-")
+            .values_list("pk", flat=True)
+        )
+        return rows
+
+    def make_images(self) -> list:
+        names = []
+        for number in range(self.config.distinct_images):
+            image = Image.new("RGB", (1600, 900), self.color())
+            draw = ImageDraw.Draw(image)
+            for _ in range(20):
+                x, y = self.rng.randrange(1600), self.rng.randrange(900)
+                draw.ellipse(
+                    (x, y, x + self.rng.randint(50, 400),
+                     y + self.rng.randint(50, 400)),
+                    fill=self.color()
+                )
+            content = BytesIO()
+            image.save(content, "JPEG", quality=90)
+            names.append(default_storage.save(
+                f"posts/{self.config.prefix}_{number}.jpg",
+                ContentFile(content.getvalue())
+            ))
+        return names
+
+    def color(self) -> tuple:
+        return tuple(self.rng.randrange(256) for _ in range(3))
+
+    def make_posts(self) -> int:
+        config = self.config
+        texts = [
+            self.fake.paragraph(nb_sentences=self.rng.randint(1, 12))
+            for _ in range(1000)
+        ]
+        images = self.make_images() if config.images else []
+        group_weights = list(accumulate(zipf_weights(len(self.groups))))
+        # Авторы по популярности: чем популярнее, тем больше постов.
+        authors = self.rng.choices(
+            self.users, cum_weights=self.cum_popularity, k=config.posts
+        )
+        seconds = config.days * 24 * 60 * 60
+        last_pk = Post.objects.order_by("-pk").values_list(
+            "pk", flat=True
+        ).first() or 0
+
+        def posts():
+            for author in authors:
+                image, group = "", None
+                if images and self.rng.random() < config.images:
+                    image = self.rng.choice(images)
+                if self.groups and self.rng.random() < 0.6:
+                    group, = self.rng.choices(
+                        self.groups, cum_weights=group_weights
+                    )
+                yield Post(
+                    author_id=author,
+                    group_id=group,
+                    text=self.rng.choice(texts),
+                    image=image,
+                    pub_date=self.now - dt.timedelta(
+                        seconds=self.rng.randrange(seconds)
+                    ),
+                )
+
+        with keep_auto_now(Post):
+            rows = self.insert(Post, posts())
+        self.posts = list(
+            Post.objects.filter(pk__gt=last_pk)
+            .values_list("pk", "pub_date", "author_id")
+        )
+        # Вес поста: популярность автора со случайным разбросом
+        # по распределению Парето - у популярных авторов тоже бывают
+        # незамеченные посты.
+        popularity = dict(zip(self.users, self.popularity))
+        self.post_weights = list(accumulate(
+            popularity[author] * self.rng.paretovariate(1.5)
+            for _, _, author in self.posts
+        ))
+        return rows
+
+    def reaction_time(self, pub_date) -> dt.datetime:
+        """Момент реакции на пост: в первые дни после публикации."""
+        delay = dt.timedelta(seconds=self.rng.expovariate(1 / 86400))
+        return min(pub_date + delay, self.now)
+
+    def make_follows(self) -> int:
+        config = self.config
+        total = config.follows * len(self.users)
+        # Подписчики выбираются равномерно, авторы - по популярности:
+        # получается степенной граф подписок.
+        pairs = zip(
+            self.rng.choices(self.users, k=total),
+            self.rng.choices(
+                self.users, cum_weights=self.cum_popularity, k=total
+            )
+        )
+        return self.insert(Follow, (
+            Follow(user_id=user, author_id=author)
+            for user, author in pairs if user != author
+        ))
+
+    def sample_posts(self, count: int):
+        return self.rng.choices(
+            self.posts, cum_weights=self.post_weights, k=count
+        )
+
+    def make_likes(self) -> int:
+        if not self.posts:
+            return 0
+        posts = self.sample_posts(self.config.likes * len(self.posts))
+        with keep_auto_now(Like):
+            return self.insert(Like, (
+                Like(
+                    user_id=self.rng.choice(self.users),
+                    post_id=pk,
+                    created=self.reaction_time(pub_date),
+                )
+                for pk, pub_date, _ in posts
+            ))
+
+    def make_comments(self) -> int:
+        if not self.posts:
+            return 0
+        texts = [self.fake.sentence() for _ in range(1000)]
+        posts = self.sample_posts(self.config.comments * len(self.posts))
+        with keep_auto_now(Comment):
+            return self.insert(Comment, (
+                Comment(
+                    author_id=self.rng.choice(self.users),
+                    post_id=pk,
+                    text=self.rng.choice(texts),
+                    created=self.reaction_time(pub_date),
+                )
+                for pk, pub_date, _ in posts
+            ))
@@ -0,0 +1,115 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from core.benchmark import git_revision, summarize
+from posts.management.commands.benchmark_views import dataset, targets
+
+# Страницы, в которых независимые запросы выполняются параллельно.
+PAGES = ("group_posts", "profile", "post_detail")
+
+
+class Command(BaseCommand):
+    help = ("Сравнивает время ответа и пропускную способность одного "
+            "многопоточного воркера при последовательных и параллельных "
+            "(core.concurrency) запросах чтения. Задержка сети до СУБД "
+            "имитируется паузой перед каждым SQL-запросом.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--clients",
+            type=int,
+            default=8,
+            help="Кол-во одновременных клиентов (потоков воркера)."
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=50,
+            help="Кол-во запросов от каждого клиента."
+        )
+        parser.add_argument(
+            "--latency-ms",
+            type=float,
+            default=1.0,
+            help="Имитируемая задержка одного SQL-запроса."
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.READ_WORKERS or 4,
+            help="Размер пула параллельных запросов."
+        )
+        parser.add_argument("--output", help="Файл для результата.")
+
+    def handle(self, *args, **options):
+        pages = targets()
+        urls = [pages[name][0] for name in PAGES if name in pages]
+        # Клиенты авторизованы: профиль и пост проверяют подписку
+        # и отметку "нравится".
+        login = Client()
+        login.force_login(pages["follow_index"][1])
+        results = {}
+        for mode, workers in (
+            ("sequential", 0), ("concurrent", options["workers"])
+        ):
+            with override_settings(DEBUG=False, READ_WORKERS=workers):
+                results[mode] = self.run_load(urls, login.cookies, options)
+            self.stderr.write(f"{mode}: {results[mode]}")
+        report = {
+            "revision": git_revision(),
+            "timestamp": timezone.now().isoformat(),
+            "dataset": dataset(),
+            "options": {
+                key: options[key]
+                for key in ("clients", "requests", "latency_ms", "workers")
+            },
+            "results": results,
+        }
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
+
+    def run_load(self, urls, cookies, options) -> dict:
+        latency = options["latency_ms"] / 1000
+        timings = []
+        lock = threading.Lock()
+
+        def delay(execute, sql, params, many, context):
+            time.sleep(latency)
+            return execute(sql, params, many, context)
+
+        def client_loop(number):
+            client = Client(SERVER_NAME="localhost", REMOTE_ADDR="10.0.0.1")
+            client.cookies = cookies
+            own = []
+            try:
+                with connection.execute_wrapper(delay):
+                    for index in range(options["requests"]):
+                        url = urls[(number + index) % len(urls)]
+                        start = time.perf_counter()
+                        client.get(url)
+                        own.append((time.perf_counter() - start) * 1000)
+            finally:
+                connections.close_all()
+            with lock:
+                timings.extend(own)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["clients"]) as clients:
+            list(clients.map(client_loop, range(options["clients"])))
+        elapsed = time.perf_counter() - start
+        return {
+            **summarize(timings),
+            "requests_per_second": round(len(timings) / elapsed, 1),
+        }
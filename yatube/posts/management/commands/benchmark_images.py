@@ -0,0 +1,74 @@
+import json
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from sorl.thumbnail import get_thumbnail
+
+from posts.models import Post
+
+
+def url_size(url: str) -> int:
+    """Размер файла из MEDIA_ROOT по его адресу."""
+    name = unquote(urlsplit(url).path)[len(settings.MEDIA_URL):]
+    return default_storage.size(name)
+
+
+def pick(srcset: str, width: int) -> str:
+    """Кандидат srcset, который выберет браузер для ширины width:
+    наименьший не уже width, иначе наибольший."""
+    candidates = sorted(
+        (int(descriptor[:-1]), url)
+        for url, descriptor in (
+            candidate.split() for candidate in srcset.split(", ")
+        )
+    )
+    for candidate_width, url in candidates:
+        if candidate_width >= width:
+            return url
+    return candidates[-1][1]
+
+
+class Command(BaseCommand):
+    help = ("Сравнивает объём картинок первой страницы главной: одна "
+            "JPEG-миниатюра против srcset с WebP для разных экранов.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--viewports",
+            type=int,
+            nargs="+",
+            default=[360, 768, 1280],
+            help="Ширины экранов в CSS-пикселях."
+        )
+        parser.add_argument(
+            "--dpr",
+            type=float,
+            default=2,
+            help="Плотность пикселей экрана."
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image="").exclude(image_set="")[
+            :settings.LIMIT_POSTS
+        ]
+        legacy = 0
+        by_viewport = dict.fromkeys(options["viewports"], 0)
+        for post in posts:
+            # Прежняя разметка: одна JPEG-миниатюра для всех экранов.
+            legacy += url_size(get_thumbnail(
+                post.image,
+                settings.POST_THUMBNAIL_GEOMETRY,
+                **settings.POST_THUMBNAIL_OPTIONS
+            ).url)
+            image = post.image_sources
+            srcset = (image["sources"] or [image])[0]["srcset"]
+            for viewport in by_viewport:
+                width = min(viewport, image["width"]) * options["dpr"]
+                by_viewport[viewport] += url_size(pick(srcset, width))
+        self.stdout.write(json.dumps({
+            "posts": len(posts),
+            "legacy_bytes": legacy,
+            "srcset_bytes": by_viewport,
+        }, indent=2))
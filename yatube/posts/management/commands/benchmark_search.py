@@ -0,0 +1,106 @@
+import json
+import random
+import string
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.db import transaction
+
+from core.benchmark import summarize
+
+from posts.models import Post
+from posts.search import LikeBackend, get_backend
+
+User = get_user_model()
+
+
+def vocabulary(size, seed):
+    rng = random.Random(seed)
+    return [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10)))
+        for _ in range(size)
+    ]
+
+
+class Command(BaseCommand):
+    help = ("Сравнивает задержку первой страницы поиска через индекс "
+            "(SEARCH_BACKEND) и через LIKE. С --posts база дополняется "
+            "синтетическими постами в транзакции, которая откатывается.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--posts",
+            type=int,
+            default=0,
+            help="Дополнить базу до стольких постов на время замера."
+        )
+        parser.add_argument(
+            "--queries",
+            nargs="+",
+            help="Запросы; по умолчанию - слова словаря разной частоты."
+        )
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            words = vocabulary(5000, options["seed"])
+            self.fill(options["posts"], words, options)
+            queries = options["queries"] or [
+                words[0], words[50], words[2000], f"{words[1]} {words[7]}"
+            ]
+            results = {
+                name: self.measure(backend, queries, options["repeat"])
+                for name, backend in (
+                    ("index", get_backend()),
+                    ("like", LikeBackend()),
+                )
+            }
+            results["posts"] = Post.objects.count()
+            transaction.set_rollback(True)
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def fill(self, total, words, options):
+        missing = total - Post.objects.count()
+        if missing <= 0:
+            return
+        rng = random.Random(options["seed"])
+        # Частоты слов по закону Ципфа, как в естественном тексте.
+        weights = [1 / rank for rank in range(1, len(words) + 1)]
+        author, _ = User.objects.get_or_create(username="search_benchmark")
+        start = time.monotonic()
+        while missing > 0:
+            size = min(missing, options["batch_size"])
+            Post.objects.bulk_create(
+                Post(
+                    author=author,
+                    text=" ".join(
+                        rng.choices(words, weights, k=rng.randint(5, 60))
+                    )
+                )
+                for _ in range(size)
+            )
+            missing -= size
+        documents = get_backend().rebuild()
+        self.stderr.write(
+            f"Добавлено постов: {total}, документов в индексе: "
+            f"{documents}, {time.monotonic() - start:.1f} с"
+        )
+
+    def measure(self, backend, queries, repeat):
+        report = {}
+        for query in queries:
+            timings = []
+            for _ in range(repeat):
+                start = time.monotonic()
+                paginator = Paginator(
+                    backend.search(query), settings.LIMIT_POSTS
+                )
+                list(paginator.get_page(1))
+                timings.append((time.monotonic() - start) * 1000)
+            report[query] = {"count": paginator.count, **summarize(timings)}
+        return report
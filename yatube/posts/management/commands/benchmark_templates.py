@@ -0,0 +1,155 @@
+import json
+import time
+from copy import deepcopy
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.template.loader import get_template
+from django.test import RequestFactory, override_settings
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from core.benchmark import git_revision, summarize
+from posts import viewer
+from posts.forms import CommentForm
+from posts.models import Post
+from posts.utils import load_page, paginate, paginate_comments
+
+User = get_user_model()
+
+LOADERS = ("cached", "uncached")
+NO_CACHE = {
+    "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+}
+
+
+def page_request(path: str):
+    """Запрос анонимного пользователя, как его видит шаблон."""
+    request = RequestFactory(SERVER_NAME="localhost").get(path)
+    request.user = AnonymousUser()
+    request.resolver_match = resolve(path)
+    return request
+
+
+def contexts() -> dict:
+    """Шаблон -> (запрос, контекст) главной страницы, страницы
+    самого плодовитого автора и самого популярного поста; строки
+    страниц (по LIMIT_POSTS постов) выбираются заранее, чтобы
+    замерялась только отрисовка."""
+    post = Post.objects.order_by("-like_count", "-pk").first()
+    if post is None:
+        raise CommandError(
+            "В базе нет постов: заполните её командой generate_load_data."
+        )
+    author = User.objects.select_related("stats").annotate(
+        total=Count("posts")
+    ).order_by("-total").first()
+    posts = Post.objects.select_related("author", "group")
+
+    def page(request, queryset):
+        page_obj = viewer.attach(
+            load_page(paginate(request, queryset)), request.user
+        )
+        list(page_obj)
+        return page_obj
+
+    index = page_request(reverse("posts:index"))
+    profile = page_request(reverse("posts:profile", args=[author.username]))
+    detail = page_request(reverse("posts:post_detail", args=[post.pk]))
+    post = Post.objects.select_related("author__stats", "group").get(
+        pk=post.pk
+    )
+    post.is_liked = False
+    comments = paginate_comments(detail, post)
+    list(comments)
+    return {
+        "posts/index.html": (index, {"page_obj": page(index, posts)}),
+        "posts/profile.html": (profile, {
+            "author": author,
+            "following": False,
+            "page_obj": page(profile, posts.filter(author=author)),
+        }),
+        "posts/post_detail.html": (detail, {
+            "post": post,
+            "form": CommentForm(),
+            "comments": comments,
+        }),
+    }
+
+
+def templates_setting(loader: str) -> list:
+    """Настройка TEMPLATES с загрузчиками с кешем или без."""
+    loaders = [
+        "django.template.loaders.filesystem.Loader",
+        "django.template.loaders.app_directories.Loader",
+    ]
+    if loader == "cached":
+        loaders = [("django.template.loaders.cached.Loader", loaders)]
+    templates = deepcopy(settings.TEMPLATES)
+    templates[0]["APP_DIRS"] = False
+    templates[0]["OPTIONS"]["loaders"] = loaders
+    return templates
+
+
+def measure(name: str, request, context: dict, repeat: int) -> dict:
+    """Время отрисовки шаблона в миллисекундах: first_ms - первой
+    (с загрузкой и разбором шаблонов), p50/p95 - последующих."""
+    timings = []
+    for _ in range(repeat + 1):
+        start = time.perf_counter()
+        get_template(name).render(context, request)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"first_ms": round(timings[0], 2), **summarize(timings[1:])}
+
+
+class Command(BaseCommand):
+    help = ("Замеряет время отрисовки шаблонов главной страницы, "
+            "профиля и поста (страница из LIMIT_POSTS постов) "
+            "с кешем загрузчика шаблонов и без него.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=100,
+            help="Кол-во отрисовок каждого шаблона с каждым загрузчиком."
+        )
+        parser.add_argument(
+            "--output",
+            help="Файл для результата; по умолчанию - stdout."
+        )
+
+    def handle(self, *args, **options):
+        targets = contexts()
+        results = {name: {} for name in targets}
+        # Фрагменты страниц и карточки постов не кешируются:
+        # замеряется полная отрисовка, а не чтение из кеша.
+        for loader in LOADERS:
+            with override_settings(
+                DEBUG=False,
+                TEMPLATES=templates_setting(loader),
+                CACHES=NO_CACHE,
+            ):
+                for name, (request, context) in targets.items():
+                    results[name][loader] = measure(
+                        name, request, context, options["repeat"]
+                    )
+                    self.stderr.write(
+                        f"{name} [{loader}]: {results[name][loader]}"
+                    )
+        report = {
+            "revision": git_revision(),
+            "timestamp": timezone.now().isoformat(),
+            "repeat": options["repeat"],
+            "posts_per_page": settings.LIMIT_POSTS,
+            "results": results,
+        }
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
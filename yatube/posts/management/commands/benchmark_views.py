@@ -0,0 +1,202 @@
+import json
+import time
+from contextlib import ExitStack
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.benchmark import git_revision, summarize
+from core.cache import bump_generation
+from core.queries import QueryRecorder
+from posts.models import Comment, Follow, Group, Like, Post
+
+User = get_user_model()
+
+MODES = ("warm", "cold")
+# Сравниваемые при --compare показатели.
+METRICS = ("p50_ms", "p95_ms", "queries", "cache_queries", "html_kb")
+
+
+def targets():
+    """Страницы для замера: лента, самая большая группа, самый
+    плодовитый автор, самый популярный пост и лента подписок
+    пользователя с наибольшим числом подписок."""
+    post = Post.objects.order_by("-like_count", "-pk").first()
+    if post is None:
+        raise CommandError(
+            "В базе нет постов: заполните её командой generate_load_data."
+        )
+    group = Group.objects.annotate(
+        total=Count("posts")
+    ).order_by("-total").first()
+    reader = User.objects.annotate(
+        total=Count("follower")
+    ).order_by("-total").first()
+    author = User.objects.annotate(
+        total=Count("posts")
+    ).order_by("-total").first()
+    pages = {
+        "index": (reverse("posts:index"), None),
+        "profile": (reverse("posts:profile", args=[author.username]), None),
+        "post_detail": (reverse("posts:post_detail", args=[post.pk]), None),
+        "follow_index": (reverse("posts:follow_index"), reader),
+    }
+    if group is not None:
+        pages["group_posts"] = (
+            reverse("posts:group_list", args=[group.slug]), None
+        )
+    return pages
+
+
+def dataset():
+    return {
+        "users": User.objects.count(),
+        "groups": Group.objects.count(),
+        "posts": Post.objects.count(),
+        "comments": Comment.objects.count(),
+        "follows": Follow.objects.count(),
+        "likes": Like.objects.count(),
+    }
+
+
+def request(client, url) -> tuple:
+    """Время ответа в миллисекундах, выполненные SQL-запросы
+    и размер HTML в байтах."""
+    recorder = QueryRecorder()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        start = time.perf_counter()
+        response = client.get(url)
+        elapsed = (time.perf_counter() - start) * 1000
+    if response.status_code != 200:
+        raise CommandError(f"{url}: код ответа {response.status_code}")
+    return elapsed, recorder, len(response.content)
+
+
+def measure(client, url, repeat: int, cold: bool) -> dict:
+    """Замер страницы: cold - перед каждым запросом начинается новое
+    поколение контента и закешированные фрагменты не используются,
+    иначе замеряются повторные запросы после прогревочного."""
+    if not cold:
+        request(client, url)
+    timings, queries, cache_queries, query_ms, sizes = [], [], [], [], []
+    for _ in range(repeat):
+        if cold:
+            bump_generation()
+        elapsed, recorder, size = request(client, url)
+        timings.append(elapsed)
+        sizes.append(size)
+        queries.append(len(recorder))
+        cache_queries.append(len(recorder.cache_queries))
+        query_ms.append(
+            sum(duration for _, duration in recorder.queries) * 1000
+        )
+    return {
+        **summarize(timings),
+        "queries": max(queries),
+        "cache_queries": max(cache_queries),
+        "query_ms": round(sum(query_ms) / len(query_ms), 2),
+        "html_kb": round(max(sizes) / 1024, 1),
+    }
+
+
+def compare(baseline: dict, report: dict) -> list:
+    """Строки с изменением показателей относительно baseline."""
+    lines = []
+    for page, result in report["results"].items():
+        for mode in MODES:
+            before = baseline.get("results", {}).get(page, {}).get(mode)
+            if not before:
+                continue
+            deltas = []
+            for metric in METRICS:
+                # Замеры старых коммитов могут не содержать
+                # показателей, добавленных позже.
+                if metric not in before:
+                    continue
+                old, new = before[metric], result[mode][metric]
+                change = f"{(new - old) / old:+.0%}" if old else "n/a"
+                deltas.append(f"{metric} {old} -> {new} ({change})")
+            lines.append(f"{page} [{mode}]: {', '.join(deltas)}")
+    return lines
+
+
+class Command(BaseCommand):
+    help = ("Замеряет p50/p95 времени ответа и кол-во SQL-запросов "
+            "главных страниц постов тестовым клиентом Django "
+            "и сохраняет результат в JSON для сравнения между коммитами.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=50,
+            help="Кол-во запросов каждой страницы в каждом режиме."
+        )
+        parser.add_argument(
+            "--pages",
+            nargs="+",
+            help="Страницы; по умолчанию - все."
+        )
+        parser.add_argument(
+            "--output",
+            help="Файл для результата; по умолчанию - stdout."
+        )
+        parser.add_argument(
+            "--compare",
+            help="Файл предыдущего замера для сравнения."
+        )
+
+    def handle(self, *args, **options):
+        pages = targets()
+        if options["pages"]:
+            unknown = set(options["pages"]) - set(pages)
+            if unknown:
+                raise CommandError(
+                    f"Неизвестные страницы: {', '.join(sorted(unknown))}"
+                )
+            pages = {name: pages[name] for name in options["pages"]}
+        results = {}
+        # Без отладочной панели и журнала запросов DEBUG, как
+        # в продакшене; адрес клиента не из INTERNAL_IPS.
+        with override_settings(DEBUG=False):
+            for name, (url, user) in pages.items():
+                client = Client(
+                    SERVER_NAME="localhost", REMOTE_ADDR="10.0.0.1"
+                )
+                if user is not None:
+                    client.force_login(user)
+                results[name] = {
+                    "url": url,
+                    **{
+                        mode: measure(
+                            client, url, options["repeat"], mode == "cold"
+                        )
+                        for mode in MODES
+                    },
+                }
+                self.stderr.write(f"{name}: {results[name]['warm']}")
+        report = {
+            "revision": git_revision(),
+            "timestamp": timezone.now().isoformat(),
+            "repeat": options["repeat"],
+            "dataset": dataset(),
+            "results": results,
+        }
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as file:
+                baseline = json.load(file)
+            for line in compare(baseline, report):
+                self.stdout.write(line)
@@ -0,0 +1,50 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = ("Выгружает группы, посты, комментарии, подписки и лайки "
+            "в файлы JSON Lines или CSV.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", help="Каталог для файлов.")
+        parser.add_argument(
+            "--format", choices=transfer.FORMATS, default="jsonl"
+        )
+        parser.add_argument(
+            "--datasets",
+            nargs="+",
+            help="Наборы данных; по умолчанию - все."
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Кол-во строк, читаемых из БД за раз."
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Начать заново, не продолжая прерванную выгрузку."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            datasets = transfer.get_datasets(options["datasets"])
+        except ValueError as error:
+            raise CommandError(error)
+        os.makedirs(options["directory"], exist_ok=True)
+        for dataset in datasets:
+            report = transfer.export_dataset(
+                dataset,
+                transfer.data_path(
+                    options["directory"], dataset, options["format"]
+                ),
+                options["format"],
+                options["chunk_size"],
+                resume=not options["restart"]
+            )
+            self.stdout.write(str(report))
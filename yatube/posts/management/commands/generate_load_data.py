@@ -0,0 +1,50 @@
+from dataclasses import fields
+
+from django.core.management.base import BaseCommand
+
+from posts import transfer
+from posts.loadgen import LoadConfig, LoadGenerator
+
+HELP = {
+    "users": "Кол-во пользователей.",
+    "groups": "Кол-во групп.",
+    "posts": "Кол-во постов.",
+    "follows": "Подписок на пользователя в среднем.",
+    "likes": "Лайков на пост в среднем.",
+    "comments": "Комментариев на пост в среднем.",
+    "images": "Доля постов с картинкой, от 0 до 1.",
+    "distinct_images": "Кол-во разных картинок.",
+    "days": "За сколько дней распределить даты публикации.",
+    "seed": "Начальное значение генератора случайных чисел.",
+    "batch_size": "Кол-во строк в одной пачке bulk_create.",
+    "prefix": "Префикс имён пользователей, slug групп и файлов.",
+}
+
+
+class Command(BaseCommand):
+    help = ("Заполняет базу синтетическими пользователями, группами, "
+            "постами, подписками, лайками и комментариями со степенным "
+            "распределением популярности для замеров производительности.")
+
+    def add_arguments(self, parser):
+        for field in fields(LoadConfig):
+            parser.add_argument(
+                f"--{field.name.replace('_', '-')}",
+                type=field.type,
+                default=field.default,
+                help=HELP[field.name]
+            )
+        parser.add_argument(
+            "--skip-rebuild",
+            action="store_true",
+            help="Не пересобирать ленты, счётчики, индекс и миниатюры."
+        )
+
+    def handle(self, *args, **options):
+        config = LoadConfig(**{
+            field.name: options[field.name] for field in fields(LoadConfig)
+        })
+        for report in LoadGenerator(config).run():
+            self.stdout.write(str(report))
+        if not options["skip_rebuild"]:
+            transfer.rebuild_derived(self.stdout)
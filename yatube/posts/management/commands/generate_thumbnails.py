@@ -0,0 +1,77 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from posts import thumbnails
+from posts.models import Post
+from posts.utils import batches
+
+
+def _generate(post_ids):
+    """Выполняется в дочернем процессе: соединения с БД,
+    унаследованные от родителя, закрыты до fork."""
+    try:
+        return thumbnails.generate(post_ids)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = ("Создаёт миниатюры картинок постов, у которых их ещё нет, "
+            "в пуле процессов.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Кол-во процессов; 0 - в текущем процессе."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Кол-во постов в одном задании."
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Пересоздать и уже созданные миниатюры."
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image="").exclude(image__isnull=True)
+        if not options["all"]:
+            posts = posts.filter(image_set="")
+        jobs = list(batches(posts, options["batch_size"]))
+        start = time.monotonic()
+        if options["workers"] and jobs:
+            done = self.run_pool(jobs, options["workers"])
+        else:
+            done = sum(thumbnails.generate(pks) for pks in jobs)
+        elapsed = time.monotonic() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Создано миниатюр: {done} за {elapsed:.1f} с"
+            )
+        )
+
+    def run_pool(self, jobs, workers):
+        # Дочерние процессы не должны делить сокеты и файлы БД
+        # с родителем: закрываем соединения до fork.
+        connections.close_all()
+        done = 0
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("fork")
+        ) as pool:
+            futures = [pool.submit(_generate, pks) for pks in jobs]
+            for future in as_completed(futures):
+                done += future.result()
+                self.stdout.write(f"Обработано: {done}", ending="\r")
+        self.stdout.write("")
+        return done
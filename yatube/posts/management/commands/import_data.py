@@ -0,0 +1,62 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = ("Загружает группы, посты, комментарии, подписки и лайки "
+            "из файлов export_data и пересобирает производные данные.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", help="Каталог с файлами.")
+        parser.add_argument(
+            "--format", choices=transfer.FORMATS, default="jsonl"
+        )
+        parser.add_argument(
+            "--datasets",
+            nargs="+",
+            help="Наборы данных; по умолчанию - все найденные."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Кол-во строк в одной пачке bulk_create."
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Начать заново, не продолжая прерванную загрузку."
+        )
+        parser.add_argument(
+            "--skip-rebuild",
+            action="store_true",
+            help="Не пересобирать ленты, счётчики, индекс и миниатюры."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            datasets = transfer.get_datasets(options["datasets"])
+        except ValueError as error:
+            raise CommandError(error)
+        for dataset in datasets:
+            path = transfer.data_path(
+                options["directory"], dataset, options["format"]
+            )
+            if not os.path.exists(path):
+                continue
+            report = transfer.import_dataset(
+                dataset,
+                path,
+                options["format"],
+                options["batch_size"],
+                resume=not options["restart"]
+            )
+            self.stdout.write(str(report))
+        if options["skip_rebuild"]:
+            return
+        # bulk_create не отправляет сигналы: производные данные
+        # пересобираются целиком.
+        transfer.rebuild_derived(self.stdout)
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from core.cache import bump_generation
+from posts.models import Comment, Post
+from posts.rendering import rerender
+from posts.utils import batches
+
+
+class Command(BaseCommand):
+    help = ("Заполняет отрисованный текст (text_html, excerpt) постов "
+            "и комментариев, созданных в обход save() или до появления "
+            "этих полей, и исправляет устаревший.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Кол-во записей, обрабатываемых за один запрос."
+        )
+
+    def handle(self, *args, **options):
+        size = options["batch_size"]
+        posts = sum(
+            rerender(Post, pks) for pks in batches(Post.objects, size)
+        )
+        comments = sum(
+            rerender(Comment, pks) for pks in batches(Comment.objects, size)
+        )
+        # bulk_update не шлёт post_save: кеш страниц сбрасывается здесь.
+        if posts or comments:
+            bump_generation()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Обновлено постов: {posts}, комментариев: {comments}"
+            )
+        )
@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from core.db import immediate_atomic
+from posts import feed
+from posts.models import FeedItem, Follow, Post
+from posts.utils import batches
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Пересобирает материализованные ленты подписок."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Кол-во постов или подписчиков в одной транзакции."
+        )
+
+    def handle(self, *args, **options):
+        size = options["batch_size"]
+        celebrities = Follow.objects.values("author").annotate(
+            followers=Count("pk")
+        ).filter(
+            followers__gt=settings.FEED_FANOUT_MAX_FOLLOWERS
+        ).values("author")
+        # Каждая пачка - своя короткая транзакция: блокировка записи
+        # SQLite не держится на всё время пересборки.
+        for pks in batches(Post.objects, size):
+            with immediate_atomic():
+                posts = Post.objects.filter(pk__in=pks)
+                posts.filter(author__in=celebrities).update(fanned_out=False)
+                posts.exclude(author__in=celebrities).update(fanned_out=True)
+        readers = User.objects.filter(
+            pk__in=Follow.objects.values("user_id")
+        )
+        FeedItem.objects.exclude(user__in=readers).delete()
+        total = items = 0
+        for user_ids in batches(readers, size):
+            with immediate_atomic():
+                FeedItem.objects.filter(user_id__in=user_ids).delete()
+                items += sum(feed.rebuild(user_id) for user_id in user_ids)
+            total += len(user_ids)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Ленты пересобраны, подписчиков: {total}, "
+                f"записей: {items}"
+            )
+        )
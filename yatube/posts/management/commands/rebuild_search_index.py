@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.db import immediate_atomic
+from posts.search import get_backend
+
+
+class Command(BaseCommand):
+    help = "Пересобирает поисковый индекс постов."
+
+    def handle(self, *args, **options):
+        with immediate_atomic():
+            documents = get_backend().rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Индекс пересобран, документов: {documents}")
+        )
@@ -0,0 +1,35 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from posts.counters import reconcile_authors, reconcile_posts
+from posts.models import Post
+from posts.utils import batches
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ("Сверяет денормализованные счётчики лайков, комментариев "
+            "и постов автора с фактическими данными.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Кол-во записей, сверяемых за один запрос."
+        )
+
+    def handle(self, *args, **options):
+        size = options["batch_size"]
+        posts = sum(
+            reconcile_posts(pks) for pks in batches(Post.objects, size)
+        )
+        authors = sum(
+            reconcile_authors(pks) for pks in batches(User.objects, size)
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Исправлено постов: {posts}, авторов: {authors}"
+            )
+        )
@@ -0,0 +1,66 @@
+# Generated by Django 2.2.28 on 2026-10-18 01:27
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def fill_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    Like = apps.get_model('posts', 'Like')
+    AuthorStats = apps.get_model('posts', 'AuthorStats')
+
+    def counter(model):
+        return Coalesce(Subquery(
+            model.objects.filter(post=OuterRef('pk')).values('post')
+            .annotate(total=Count('pk')).values('total')
+        ), 0)
+
+    Post.objects.update(
+        like_count=counter(Like),
+        comment_count=counter(Comment)
+    )
+    AuthorStats.objects.bulk_create(
+        [
+            AuthorStats(author_id=author_id, post_count=total)
+            for author_id, total in Post.objects.values('author')
+            .annotate(total=Count('pk')).values_list('author', 'total')
+        ],
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0018_auto_20261018_0126'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='Постов')),
+            ],
+            options={
+                'verbose_name': 'Счётчики автора',
+                'verbose_name_plural': 'Счётчики авторов',
+            },
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Комментариев'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Отметок нравится'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-18 01:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0020_auto_20261018_0131'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='thumbnail_url',
+            field=models.CharField(blank=True, editable=False, help_text='Заранее созданная миниатюра картинки', max_length=255, verbose_name='Адрес миниатюры'),
+        ),
+    ]
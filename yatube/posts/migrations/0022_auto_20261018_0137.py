@@ -0,0 +1,22 @@
+# Generated by Django 2.2.28 on 2026-10-18 01:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0021_post_thumbnail_url'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='post',
+            name='thumbnail_url',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_set',
+            field=models.TextField(blank=True, editable=False, help_text='JSON с адресами и размерами миниатюр (posts.thumbnails)', verbose_name='Миниатюры картинки'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+CREATE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_search USING fts5("
+    "text, comments, tokenize = 'unicode61 remove_diacritics 2')"
+)
+FILL = (
+    "INSERT INTO posts_search (rowid, text, comments) "
+    "SELECT p.id, p.text, COALESCE(("
+    "    SELECT group_concat(c.text, ' ') FROM posts_comment c"
+    "    WHERE c.post_id = p.id"
+    "), '') FROM posts_post p"
+)
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(CREATE)
+    schema_editor.execute(FILL)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS posts_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0022_auto_20261018_0137'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
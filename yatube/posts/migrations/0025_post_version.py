@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-18 03:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0024_auto_20261018_0148'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text='Меняется вместе с карточкой поста (posts.cards)', verbose_name='Версия'),
+        ),
+    ]
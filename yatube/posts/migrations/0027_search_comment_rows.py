@@ -0,0 +1,53 @@
+from django.db import migrations
+
+TOKENIZE = "tokenize = 'unicode61 remove_diacritics 2'"
+CREATE = (
+    f"CREATE VIRTUAL TABLE posts_search USING fts5(text, {TOKENIZE})",
+    "CREATE VIRTUAL TABLE posts_search_comments USING fts5("
+    f"text, post_id UNINDEXED, {TOKENIZE})",
+)
+FILL = (
+    "INSERT INTO posts_search (rowid, text) SELECT id, text FROM posts_post",
+    "INSERT INTO posts_search_comments (rowid, text, post_id) "
+    "SELECT id, text, post_id FROM posts_comment",
+)
+# Прежний индекс: документ поста - текст и все комментарии к нему.
+OLD_CREATE = (
+    "CREATE VIRTUAL TABLE posts_search USING fts5("
+    f"text, comments, {TOKENIZE})"
+)
+OLD_FILL = (
+    "INSERT INTO posts_search (rowid, text, comments) "
+    "SELECT p.id, p.text, COALESCE(("
+    "    SELECT group_concat(c.text, ' ') FROM posts_comment c"
+    "    WHERE c.post_id = p.id"
+    "), '') FROM posts_post p"
+)
+
+
+def split_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS posts_search")
+    for sql in (*CREATE, *FILL):
+        schema_editor.execute(sql)
+
+
+def merge_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS posts_search_comments")
+    schema_editor.execute("DROP TABLE IF EXISTS posts_search")
+    schema_editor.execute(OLD_CREATE)
+    schema_editor.execute(OLD_FILL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0026_text_html'),
+    ]
+
+    operations = [
+        migrations.RunPython(split_index, merge_index),
+    ]
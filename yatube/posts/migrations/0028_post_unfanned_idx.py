@@ -0,0 +1,17 @@
+# Generated by Django 2.2.28 on 2026-10-18 04:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0027_search_comment_rows'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(fanned_out=False), fields=['author', '-id'], name='post_unfanned_idx'),
+        ),
+    ]
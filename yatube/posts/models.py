@@ -1,8 +1,12 @@
+import json
+
 from django.contrib.auth import get_user_model
 from django.db import models
 
 from core.models import CreatedModel
 
+from .rendering import EXCERPT_LENGTH
+
 User = get_user_model()
 
 
@@ -33,6 +37,19 @@ class Group(models.Model):
 
 class Post(models.Model):
     text = models.TextField("Текст поста", help_text="Введите текст поста")
+    text_html = models.TextField(
+        "HTML текста",
+        blank=True,
+        editable=False,
+        help_text="Экранированный текст с переносами строк (posts.rendering)"
+    )
+    excerpt = models.CharField(
+        "Начало текста",
+        max_length=EXCERPT_LENGTH,
+        blank=True,
+        editable=False,
+        help_text="Заголовок страницы поста"
+    )
     pub_date = models.DateTimeField("Дата публикации", auto_now_add=True)
     author = models.ForeignKey(
         User,
@@ -55,18 +72,96 @@ class Post(models.Model):
         blank=True,
         null=True
     )
+    image_set = models.TextField(
+        "Миниатюры картинки",
+        blank=True,
+        editable=False,
+        help_text="JSON с адресами и размерами миниатюр (posts.thumbnails)"
+    )
+    fanned_out = models.BooleanField(
+        "Разослан по лентам",
+        default=False,
+        editable=False,
+        help_text="Пост записан в ленты подписчиков автора"
+    )
+    like_count = models.PositiveIntegerField(
+        "Отметок нравится",
+        default=0,
+        editable=False
+    )
+    comment_count = models.PositiveIntegerField(
+        "Комментариев",
+        default=0,
+        editable=False
+    )
+    version = models.PositiveIntegerField(
+        "Версия",
+        default=1,
+        editable=False,
+        help_text="Меняется вместе с карточкой поста (posts.cards)"
+    )
 
     class Meta:
-        ordering = ("-pub_date",)
+        ordering = ("-pub_date", "-id")
         verbose_name = "Пост"
         verbose_name_plural = "Посты"
+        indexes = [
+            models.Index(
+                fields=["-pub_date", "-id"],
+                name="post_pub_date_idx"
+            ),
+            models.Index(
+                fields=["group", "-pub_date", "-id"],
+                name="post_group_pub_date_idx"
+            ),
+            models.Index(
+                fields=["author", "-pub_date", "-id"],
+                name="post_author_pub_date_idx"
+            ),
+            # Неразосланные посты, подмешиваемые в ленты (posts.feed).
+            models.Index(
+                fields=["author", "-id"],
+                name="post_unfanned_idx",
+                condition=models.Q(fanned_out=False)
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
 
+    @property
+    def image_sources(self):
+        """Разобранный набор миниатюр или None, пока его нет."""
+        return json.loads(self.image_set) if self.image_set else None
+
+
+class AuthorStats(models.Model):
+    """Денормализованные счётчики автора."""
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        verbose_name="Автор",
+        related_name="stats"
+    )
+    post_count = models.PositiveIntegerField("Постов", default=0)
+
+    class Meta:
+        verbose_name = "Счётчики автора"
+        verbose_name_plural = "Счётчики авторов"
+
+    def __str__(self):
+        return str(self.author)
+
 
 class Comment(CreatedModel):
     text = models.TextField("Коментарий", help_text="Оставьте коментарий")
+    text_html = models.TextField(
+        "HTML текста",
+        blank=True,
+        editable=False,
+        help_text="Экранированный текст с переносами строк (posts.rendering)"
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -83,6 +178,16 @@ class Comment(CreatedModel):
     class Meta:
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
+        indexes = [
+            models.Index(
+                fields=["post", "created", "id"],
+                name="comment_post_created_idx"
+            ),
+            models.Index(
+                fields=["created"],
+                name="comment_created_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
@@ -105,6 +210,12 @@ class Follow(models.Model):
     class Meta:
         verbose_name = "Подписку"
         verbose_name_plural = "Подписки"
+        indexes = [
+            models.Index(
+                fields=["author", "user"],
+                name="follow_author_user_idx"
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["user", "author"],
@@ -130,9 +241,45 @@ class Like(CreatedModel):
     class Meta:
         verbose_name = "Отметка - нравится"
         verbose_name_plural = "Отметки - нравится"
+        indexes = [
+            models.Index(
+                fields=["post", "created"],
+                name="like_post_created_idx"
+            ),
+            models.Index(
+                fields=["created"],
+                name="like_created_idx"
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["user", "post"],
                 name="unique_constraint"
             )
         ]
+
+
+class FeedItem(models.Model):
+    """Запись материализованной ленты подписок."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name="Подписчик",
+        related_name="feed"
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name="Пост",
+        related_name="feed_items"
+    )
+
+    class Meta:
+        verbose_name = "Запись ленты"
+        verbose_name_plural = "Записи ленты"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "post"],
+                name="unique_feed_item"
+            )
+        ]
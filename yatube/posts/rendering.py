@@ -0,0 +1,64 @@
+"""Заранее отрисованный текст постов и комментариев.
+
+Текст экранируется и переносы строк заменяются на <br> (как фильтром
+linebreaksbr) один раз при сохранении, а не при каждом показе:
+шаблоны выводят готовое поле text_html. Заголовок страницы поста
+(первые EXCERPT_LENGTH символов, как truncatechars) хранится в excerpt.
+
+Поля заполняет сигнал pre_save, поэтому они не устаревают при
+сохранении из формы, админки или кода. Строки, записанные в обход
+save() (bulk_create при загрузке данных), и строки, созданные
+до появления полей, дописывает команда prerender_text.
+"""
+from django.template.defaultfilters import linebreaksbr, truncatechars
+
+EXCERPT_LENGTH = 30
+
+
+def text_html(text: str) -> str:
+    return linebreaksbr(text, autoescape=True)
+
+
+def excerpt(text: str) -> str:
+    return truncatechars(text, EXCERPT_LENGTH)
+
+
+def prerender(instance) -> None:
+    """Заполняет text_html (и excerpt, если он есть у модели)
+    по тексту instance."""
+    instance.text_html = text_html(instance.text)
+    if hasattr(instance, "excerpt"):
+        instance.excerpt = excerpt(instance.text)
+
+
+def rerender(model, pks) -> int:
+    """Пересчитывает отрисованный текст записей model с pk из pks,
+    сохраняет изменившиеся; возвращает их число. Посты с устаревшим
+    (а не пустым) text_html получают новую версию карточки
+    (posts.cards): карточка без text_html отрисована из text так же.
+    --------
+        Параметры:
+            model: Post или Comment
+                модель записей.
+            pks: iterable
+                pk записей пачки.
+    """
+    fields = ["text_html"]
+    if hasattr(model, "excerpt"):
+        fields.append("excerpt")
+    versioned = hasattr(model, "version")
+    changed = []
+    instances = model.objects.filter(pk__in=pks).only(
+        "pk", "text", *fields, *(["version"] if versioned else [])
+    )
+    for instance in instances:
+        stored = [getattr(instance, field) for field in fields]
+        prerender(instance)
+        if stored != [getattr(instance, field) for field in fields]:
+            if versioned and stored[0]:
+                instance.version += 1
+            changed.append(instance)
+    model.objects.bulk_update(
+        changed, fields + (["version"] if versioned else [])
+    )
+    return len(changed)
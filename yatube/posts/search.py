@@ -0,0 +1,282 @@
+"""Полнотекстовый поиск по постам и комментариям к ним.
+
+Бэкенд задаётся настройкой SEARCH_BACKEND (путь к классу):
+    SQLiteFTSBackend - инвертированные индексы FTS5: posts_search
+        (строка на пост) и posts_search_comments (строка на
+        комментарий с id поста). Пост находится, если все слова
+        запроса есть в его тексте или в одном из комментариев.
+        Совпадения в тексте упорядочены по релевантности bm25 и идут
+        перед найденными только по комментариям, а при совпадении
+        с более чем SEARCH_RANK_MAX_MATCHES постами все результаты
+        выводятся от новых к старым;
+    LikeBackend - LIKE '%...%' без индекса, для СУБД без FTS5
+        (в SQLite LIKE не учитывает регистр только для латиницы).
+Индекс обновляется сигналами сохранения/удаления Post и Comment:
+новый комментарий добавляет одну строку, а не переписывает документ
+поста. Индекс пересобирается командой rebuild_search_index.
+"""
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from core.db import immediate_atomic
+
+from .models import Post
+
+_WORDS = re.compile(r"\w+")
+
+
+def split_query(query: str) -> list:
+    """Слова поискового запроса; операторы и кавычки отбрасываются."""
+    return _WORDS.findall(query)[:settings.SEARCH_MAX_WORDS]
+
+
+class SearchBackend(ABC):
+    @abstractmethod
+    def matching(self, query: str):
+        """QuerySet постов, найденных по запросу, без сортировки;
+        пустой, если в запросе нет слов."""
+
+    def search(self, query: str):
+        """Посты, найденные по запросу, в порядке релевантности:
+        QuerySet или последовательность для Paginator."""
+        return self.matching(query)
+
+    def index_post(self, post_id: int) -> None:
+        """Обновляет текст поста в индексе."""
+
+    def remove_post(self, post_id: int) -> None:
+        """Удаляет пост из индекса (комментарии удалённого поста
+        удаляются сигналами их каскадного удаления)."""
+
+    def index_comment(self, comment_id: int) -> None:
+        """Обновляет комментарий в индексе."""
+
+    def remove_comment(self, comment_id: int) -> None:
+        """Удаляет комментарий из индекса."""
+
+    def rebuild(self) -> int:
+        """Пересобирает индекс, возвращает число документов."""
+        return 0
+
+
+class LikeBackend(SearchBackend):
+    def matching(self, query):
+        words = split_query(query)
+        if not words:
+            return Post.objects.none()
+        condition = Q()
+        for word in words:
+            condition &= Q(text__icontains=word) | Q(
+                comments__text__icontains=word
+            )
+        return Post.objects.filter(condition).distinct()
+
+
+class _InSubquery(RawSQL):
+    """Подзапрос для правой части __in. Django 2.2 сам берёт его
+    в скобки, а RawSQL - ещё раз: SQLite считает ((SELECT ...))
+    скалярным подзапросом и сравнивает только с первой строкой."""
+
+    def as_sql(self, compiler, connection):
+        return self.sql, self.params
+
+
+class RankedResults:
+    """Результаты поиска SQLiteFTSBackend в порядке релевантности -
+    последовательность постов для Paginator.
+
+    Срез выбирает id одним запросом ranked_ids с LIMIT/OFFSET,
+    строки постов загружаются по id.
+    """
+    ordered = True
+
+    def __init__(self, backend, expression, total, posts=None):
+        self.backend = backend
+        self.expression = expression
+        self.total = total
+        self.posts = Post.objects.all() if posts is None else posts
+
+    def select_related(self, *fields):
+        return RankedResults(
+            self.backend, self.expression, self.total,
+            self.posts.select_related(*fields)
+        )
+
+    def count(self) -> int:
+        return self.total
+
+    def __len__(self):
+        return self.total
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        if stop is None or start < 0 or stop < 0 or index.step:
+            raise ValueError(
+                "Результаты поиска поддерживают только срезы [start:stop]."
+            )
+        if stop <= start:
+            return []
+        ids = self.backend.ranked_ids(self.expression, start, stop)
+        posts = self.posts.in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+    def __iter__(self):
+        return iter(self[:self.total])
+
+
+class SQLiteFTSBackend(SearchBackend):
+    table = "posts_search"
+    comments_table = "posts_search_comments"
+
+    def match_expression(self, words) -> str:
+        # Каждое слово - строка FTS5 с поиском по префиксу,
+        # слова объединяются через неявный AND.
+        return " ".join(f'"{word}"*' for word in words)
+
+    def matches(self) -> str:
+        """Подзапрос id постов, совпавших текстом или комментарием;
+        параметры - выражение MATCH дважды."""
+        return (
+            f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s "
+            f"UNION SELECT post_id FROM {self.comments_table} "
+            f"WHERE {self.comments_table} MATCH %s"
+        )
+
+    def count(self, expression: str) -> int:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT count(*) FROM ({self.matches()})",
+                [expression, expression]
+            )
+            return cursor.fetchone()[0]
+
+    def ranked(self) -> str:
+        """Запрос id совпавших постов в порядке релевантности;
+        параметры - выражение MATCH дважды, LIMIT и OFFSET.
+
+        bm25 считается одним проходом по совпадениям: найденные
+        только по комментариям получают 0 (bm25 отрицателен) и идут
+        после совпадений в тексте, от новых постов к старым.
+        """
+        return (
+            "SELECT found.id FROM ("
+            f"SELECT rowid AS id, bm25({self.table}) AS relevance "
+            f"FROM {self.table} WHERE {self.table} MATCH %s "
+            f"UNION ALL SELECT post_id, 0 FROM {self.comments_table} "
+            f"WHERE {self.comments_table} MATCH %s"
+            ") AS found JOIN posts_post ON posts_post.id = found.id "
+            "GROUP BY found.id "
+            "ORDER BY min(found.relevance), posts_post.pub_date DESC, "
+            "found.id DESC LIMIT %s OFFSET %s"
+        )
+
+    def ranked_ids(self, expression: str, start: int, stop: int) -> list:
+        """id постов с start по stop в порядке релевантности."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                self.ranked(), [expression, expression, stop - start, start]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def found(self, expression: str):
+        return Post.objects.filter(
+            pk__in=_InSubquery(self.matches(), [expression, expression])
+        )
+
+    def matching(self, query):
+        words = split_query(query)
+        if not words:
+            return Post.objects.none()
+        return self.found(self.match_expression(words))
+
+    def search(self, query):
+        words = split_query(query)
+        if not words:
+            return Post.objects.none()
+        expression = self.match_expression(words)
+        count = self.count(expression)
+        # Для частых слов сортировка по релевантности дороже, чем её
+        # польза: такие запросы выводятся от новых постов к старым.
+        if count > settings.SEARCH_RANK_MAX_MATCHES:
+            return self.found(expression)
+        return RankedResults(self, expression, count)
+
+    def index_post(self, post_id):
+        # Удаление и вставка - одна транзакция: иначе параллельные
+        # сохранения поста вставляют строку с тем же rowid дважды.
+        with immediate_atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE rowid = %s", [post_id]
+            )
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, text) "
+                "SELECT id, text FROM posts_post WHERE id = %s",
+                [post_id]
+            )
+
+    def remove_post(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE rowid = %s", [post_id]
+            )
+
+    def index_comment(self, comment_id):
+        with immediate_atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.comments_table} WHERE rowid = %s",
+                [comment_id]
+            )
+            cursor.execute(
+                f"INSERT INTO {self.comments_table} (rowid, text, post_id) "
+                "SELECT id, text, post_id FROM posts_comment WHERE id = %s",
+                [comment_id]
+            )
+
+    def remove_comment(self, comment_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.comments_table} WHERE rowid = %s",
+                [comment_id]
+            )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            for table, columns, source in (
+                (self.table, "rowid, text", "SELECT id, text FROM posts_post"),
+                (self.comments_table, "rowid, text, post_id",
+                 "SELECT id, text, post_id FROM posts_comment"),
+            ):
+                cursor.execute(f"DELETE FROM {table}")
+                cursor.execute(f"INSERT INTO {table} ({columns}) {source}")
+                # Слияние сегментов индекса после массовой вставки.
+                cursor.execute(
+                    f"INSERT INTO {table} ({table}) VALUES ('optimize')"
+                )
+            cursor.execute(f"SELECT count(*) FROM {self.table}")
+            return cursor.fetchone()[0]
+
+
+@lru_cache(maxsize=None)
+def _load_backend(path: str) -> SearchBackend:
+    return import_string(path)()
+
+
+def get_backend() -> SearchBackend:
+    return _load_backend(settings.SEARCH_BACKEND)
+
+
+def search_posts(query: str):
+    return get_backend().search(query)
+
+
+def matching_posts(query: str):
+    return get_backend().matching(query)
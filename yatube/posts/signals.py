@@ -0,0 +1,155 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from core.cache import bump_generation
+
+from . import cards, feed, rendering, search, tasks
+from .counters import (change_page_counts, change_post_count,
+                       change_post_counter, move_page_counts)
+from .models import Comment, Follow, Group, Like, Post
+
+User = get_user_model()
+
+# Поля пользователя, выводимые в карточке поста.
+CARD_USER_FIELDS = {"username", "first_name", "last_name"}
+
+
+def content_changed(sender, **kwargs):
+    """Сбрасывает кеш страниц сменой поколения контента."""
+    bump_generation()
+
+
+for model in (Post, Comment, Like, Follow, Group):
+    post_save.connect(content_changed, sender=model)
+    post_delete.connect(content_changed, sender=model)
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, raw=False, **kwargs):
+    """Ставит в очередь рассылку нового поста по лентам подписчиков
+    и увеличивает счётчики постов автора и списков."""
+    if created and not raw:
+        tasks.fan_out.enqueue(instance.pk)
+        change_post_count(instance.author_id, 1)
+        change_page_counts(instance, 1)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    change_post_count(instance.author_id, -1)
+    change_page_counts(instance, -1)
+    if instance.fanned_out:
+        feed.reset_follower_counts(instance.author_id)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        change_post_counter(instance.post_id, "comment_count", 1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    change_post_counter(instance.post_id, "comment_count", -1)
+
+
+@receiver(post_save, sender=Like)
+def like_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        change_post_counter(instance.post_id, "like_count", 1)
+
+
+@receiver(post_delete, sender=Like)
+def like_deleted(sender, instance, **kwargs):
+    change_post_counter(instance.post_id, "like_count", -1)
+
+
+@receiver(post_save, sender=Follow)
+def follow_backfill(sender, instance, created, raw=False, **kwargs):
+    """Заполняет ленту при подписке."""
+    if created and not raw:
+        feed.backfill(instance.user, instance.author)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_purge(sender, instance, **kwargs):
+    """Чистит ленту при отписке."""
+    feed.purge(instance.user, instance.author)
+
+
+@receiver(post_save, sender=Post)
+def post_indexed(sender, instance, raw=False, **kwargs):
+    """Ставит в очередь обновление документа поста в поисковом индексе."""
+    if not raw:
+        tasks.index_post.enqueue(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def post_unindexed(sender, instance, **kwargs):
+    search.get_backend().remove_post(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def comment_indexed(sender, instance, raw=False, **kwargs):
+    """Ставит в очередь добавление комментария в поисковый индекс."""
+    if not raw:
+        tasks.index_comment.enqueue(instance.pk)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_unindexed(sender, instance, **kwargs):
+    search.get_backend().remove_comment(instance.pk)
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Comment)
+def text_rendered(sender, instance, raw=False, **kwargs):
+    """Отрисовывает текст поста или комментария при сохранении."""
+    if not raw:
+        rendering.prerender(instance)
+
+
+@receiver(pre_save, sender=Post)
+def post_version(sender, instance, raw=False, **kwargs):
+    """Изменённый пост получает новую версию карточки."""
+    if instance.pk is not None and not raw:
+        instance.version += 1
+
+
+@receiver(pre_save, sender=Post)
+def post_moved(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Пост, перенесённый в другую группу или к другому автору,
+    переходит между посчитанными числами постов списков."""
+    if instance.pk is None or raw:
+        return
+    if update_fields is not None and not {"group", "author"} & set(
+        update_fields
+    ):
+        return
+    move_page_counts(instance)
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def group_cards_changed(sender, instance, created=False, **kwargs):
+    """Название и slug группы выводятся в карточках её постов;
+    при удалении группы ссылка на неё из карточек пропадает."""
+    if not created:
+        cards.bump_versions(Post.objects.filter(group=instance))
+
+
+@receiver(post_save, sender=User)
+def author_cards_changed(sender, instance, created, update_fields=None,
+                         raw=False, **kwargs):
+    """Имя автора выводится в карточках его постов. Сохранения
+    других полей (last_login при входе) версии не меняют."""
+    if created or raw:
+        return
+    if update_fields is not None and not CARD_USER_FIELDS & set(
+        update_fields
+    ):
+        return
+    cards.bump_versions(Post.objects.filter(author=instance))
+    bump_generation()
@@ -0,0 +1,65 @@
+"""Фоновые задачи постов (core.tasks)."""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from core.tasks import task
+
+from . import feed, search, thumbnails
+from .counters import page_count_key, page_count_refresh_key
+from .models import Post
+
+User = get_user_model()
+
+
+@task
+def fan_out(post_id: int) -> None:
+    """Рассылает пост по лентам подписчиков. Пока пост
+    не разослан, он подмешивается в ленты при чтении."""
+    post = Post.objects.filter(pk=post_id).only("pk", "author").first()
+    if post is not None:
+        feed.fan_out(post)
+
+
+@task
+def index_post(post_id: int) -> None:
+    """Обновляет текст поста в поисковом индексе
+    (удалённый пост из индекса удаляется)."""
+    search.get_backend().index_post(post_id)
+
+
+@task
+def index_comment(comment_id: int) -> None:
+    """Обновляет комментарий в поисковом индексе
+    (удалённый комментарий из индекса удаляется)."""
+    search.get_backend().index_comment(comment_id)
+
+
+@task
+def make_thumbnails(post_id: int) -> None:
+    """Создаёт миниатюры картинки поста; ошибка ведёт к повтору."""
+    post = (
+        Post.objects.filter(pk=post_id).exclude(image="")
+        .only("pk", "image").first()
+    )
+    if post is not None:
+        thumbnails.make_thumbnail(post)
+
+
+@task
+def count_posts(scope: str, value="") -> None:
+    """Считает точное число постов пажинируемого списка
+    (posts.counters.page_count_key) и кладёт его в кеш."""
+    if scope == "group":
+        count = Post.objects.filter(group__slug=value).count()
+    elif scope == "author":
+        count = Post.objects.filter(author__username=value).count()
+    elif scope == "feed":
+        # Неразосланные посты лента досчитывает при каждом запросе.
+        count = feed.feed_posts(User(pk=value)).fanned_count()
+    else:
+        count = Post.objects.count()
+    cache.set(
+        page_count_key(scope, value), count, settings.PAGE_COUNT_TIMEOUT
+    )
+    cache.delete(page_count_refresh_key(scope, value))
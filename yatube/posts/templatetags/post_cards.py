@@ -0,0 +1,13 @@
+from django import template
+
+from posts import cards
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def load_post_cards(context, posts):
+    """Готовит карточки постов страницы (posts.cards) перед циклом
+    {% for post in page_obj %}; ничего не выводит."""
+    cards.attach(posts, context["request"].path)
+    return ""
@@ -0,0 +1,87 @@
+from contextlib import ExitStack
+
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.queries import QueryRecorder
+from posts.models import Comment, Follow, Group, Like, Post
+
+User = get_user_model()
+
+# SQL-запросов на страницу списка в админке, включая сессию,
+# пользователя и навигацию по датам; не зависит от числа строк.
+CHANGELIST_BUDGET = 10
+
+
+class AdminChangelistTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        group = Group.objects.create(
+            title='Группа', slug='slug', description='-'
+        )
+        users = [
+            User.objects.create_user(username=f'user_{i}') for i in range(5)
+        ]
+        for i in range(30):
+            post = Post.objects.create(
+                author=users[i % 5], group=group, text=f'Пост {i}'
+            )
+            Comment.objects.create(
+                author=users[i % 5], post=post, text='Коментарий'
+            )
+            Like.objects.create(user=users[(i + 1) % 5], post=post)
+        for user in users[1:]:
+            Follow.objects.create(user=user, author=users[0])
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(AdminChangelistTests.admin)
+
+    def get(self, url, data=None):
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.client.get(url, data)
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(
+            len(recorder), CHANGELIST_BUDGET,
+            '\n'.join(sql for sql, _ in recorder.queries)
+        )
+        self.assertFalse(recorder.duplicates(), 'N+1')
+        return response
+
+    def test_changelists_bounded_queries(self):
+        """Списки и фильтры админки - в пределах бюджета запросов
+        и без N+1."""
+        pages = [
+            ('posts_post', {}),
+            ('posts_post', {'pub_date__year': '2026'}),
+            ('posts_comment', {'author__username': 'user_1'}),
+            ('posts_like', {}),
+            ('posts_like', {'user__username': 'user_1'}),
+            ('posts_follow', {'author__username': 'user_0'}),
+        ]
+        for model, data in pages:
+            with self.subTest(model=model, data=data):
+                self.get(reverse(f'admin:{model}_changelist'), data)
+
+    @override_settings(ESTIMATED_COUNT_LIMIT=10)
+    def test_estimated_count(self):
+        """Больше ESTIMATED_COUNT_LIMIT строк - число оценивается,
+        без полного COUNT(*)."""
+        response = self.get(reverse('admin:posts_like_changelist'))
+        self.assertEqual(
+            response.context['cl'].result_count, Like.objects.last().pk
+        )
+        response = self.get(
+            reverse('admin:posts_like_changelist'),
+            {'user__username': 'user_1'}
+        )
+        self.assertEqual(response.context['cl'].result_count, 6)
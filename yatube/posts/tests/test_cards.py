@@ -0,0 +1,93 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.cache import bump_generation
+from posts import cards
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostCardTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Группа', slug='slug', description='-'
+        )
+        Post.objects.bulk_create([
+            Post(author=cls.user, group=cls.group, text=f'Пост {i}')
+            for i in range(5)
+        ])
+
+    def setUp(self):
+        patcher = mock.patch.object(
+            cards, 'render_to_string', wraps=cards.render_to_string
+        )
+        self.render = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def rendered(self, url=None):
+        """Сколько карточек собрано заново при показе страницы."""
+        self.render.reset_mock()
+        bump_generation()
+        response = Client().get(url or reverse('posts:index'))
+        self.assertEqual(response.status_code, 200)
+        return self.render.call_count
+
+    def test_cards_cached(self):
+        """Карточки собираются один раз, изменённый пост -
+        заново."""
+        self.assertEqual(self.rendered(), 5)
+        self.assertEqual(self.rendered(), 0)
+        post = Post.objects.first()
+        post.text = 'Изменённый пост'
+        post.save()
+        self.assertEqual(self.rendered(), 1)
+        self.assertContains(
+            Client().get(reverse('posts:index')), 'Изменённый пост'
+        )
+
+    def test_group_and_author_changes(self):
+        """Переименование группы и автора меняет версии карточек,
+        вход пользователя - нет."""
+        self.assertEqual(self.rendered(), 5)
+        update_last_login(None, self.user)
+        self.assertEqual(self.rendered(), 0)
+        self.user.first_name = 'Имя'
+        self.user.save()
+        self.assertEqual(self.rendered(), 5)
+        self.group.title = 'Новое название'
+        self.group.save()
+        self.assertEqual(self.rendered(), 5)
+
+    def test_author_rename_shown(self):
+        """Переименование автора сразу видно на закешированной
+        странице."""
+        Client().get(reverse('posts:index'))
+        self.user.first_name = 'Новое'
+        self.user.last_name = 'Имя'
+        self.user.save()
+        self.assertContains(
+            Client().get(reverse('posts:index')), 'Автор: Новое Имя', count=5
+        )
+
+    def test_link_variants(self):
+        """На странице группы и автора карточки без ссылок на них."""
+        self.rendered()
+        for url, link in (
+            (reverse('posts:group_list', kwargs={'slug': 'slug'}),
+             reverse('posts:group_list', kwargs={'slug': 'slug'})),
+            (reverse('posts:profile', kwargs={'username': 'auth'}),
+             reverse('posts:profile', kwargs={'username': 'auth'})),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.rendered(url), 5)
+                self.assertNotContains(
+                    Client().get(url), f'href="{link}"'
+                )
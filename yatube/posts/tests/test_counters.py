@@ -0,0 +1,225 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db import transaction
+from django.test import (Client, TestCase, TransactionTestCase,
+                         override_settings)
+from django.urls import reverse
+
+from core.queries import QueryRecorder
+from posts.counters import page_count_key
+from posts.models import AuthorStats, Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class CounterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(CounterTests.user)
+
+    def refresh(self):
+        return Post.objects.get(pk=CounterTests.post.pk)
+
+    def test_like_counter(self):
+        """post_like и post_dislike меняют like_count."""
+        kwargs = {'post_id': CounterTests.post.pk}
+        self.authorized_client.get(reverse('posts:post_like', kwargs=kwargs))
+        self.authorized_client.get(reverse('posts:post_like', kwargs=kwargs))
+        self.assertEqual(self.refresh().like_count, 1)
+        self.authorized_client.get(
+            reverse('posts:post_dislike', kwargs=kwargs)
+        )
+        self.assertEqual(self.refresh().like_count, 0)
+
+    def test_comment_counter(self):
+        """add_comment увеличивает comment_count."""
+        self.authorized_client.post(
+            reverse('posts:add_comment',
+                    kwargs={'post_id': CounterTests.post.pk}),
+            {'text': 'Коментарий'}
+        )
+        self.assertEqual(self.refresh().comment_count, 1)
+        Comment.objects.all().delete()
+        self.assertEqual(self.refresh().comment_count, 0)
+
+    def test_post_counter(self):
+        """post_create увеличивает счётчик постов автора."""
+        self.assertEqual(CounterTests.user.stats.post_count, 1)
+        self.authorized_client.post(
+            reverse('posts:post_create'), {'text': 'Новый пост'}
+        )
+        self.assertEqual(
+            AuthorStats.objects.get(author=CounterTests.user).post_count, 2
+        )
+
+    def test_reconcile_counters(self):
+        """reconcile_counters исправляет расхождения."""
+        Comment.objects.create(
+            author=CounterTests.user, post=CounterTests.post, text='К'
+        )
+        Post.objects.update(comment_count=7, like_count=3)
+        AuthorStats.objects.all().delete()
+        out = StringIO()
+        call_command('reconcile_counters', batch_size=1, stdout=out)
+        post = self.refresh()
+        self.assertEqual((post.comment_count, post.like_count), (1, 0))
+        self.assertEqual(
+            AuthorStats.objects.get(author=CounterTests.user).post_count, 1
+        )
+        self.assertIn('Исправлено постов: 1, авторов: 1', out.getvalue())
+
+
+class PageCountTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='slug', description='-'
+        )
+        Post.objects.bulk_create([
+            Post(author=cls.user, group=cls.group, text=f'Пост {i}')
+            for i in range(8)
+        ])
+
+    def get(self, url, client=None):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = (client or Client()).get(url)
+        counts = [sql for sql, _ in recorder.queries if 'COUNT(' in sql]
+        return response, counts
+
+    def test_count_cached(self):
+        """Число постов считается один раз и берётся из кеша."""
+        url = reverse('posts:group_list', kwargs={'slug': 'slug'})
+        _, counts = self.get(url)
+        self.assertEqual(len(counts), 1)
+        self.assertEqual(cache.get(page_count_key('group', 'slug')), 8)
+        response, counts = self.get(url)
+        self.assertEqual(counts, [])
+        self.assertEqual(response.context['page_obj'].paginator.count, 8)
+
+    def test_follow_resets_feed_count(self):
+        """Подписка сбрасывает число постов ленты."""
+        client = Client()
+        client.force_login(self.reader)
+        url = reverse('posts:follow_index')
+        self.get(url, client)
+        self.assertEqual(cache.get(page_count_key('feed', self.reader.pk)), 0)
+        Follow.objects.create(user=self.reader, author=self.user)
+        response, _ = self.get(url, client)
+        self.assertEqual(response.context['page_obj'].paginator.count, 8)
+
+    def test_unfanned_posts_counted_live(self):
+        """Неразосланные посты (популярного автора или ещё ждущие
+        рассылки) не входят в закешированное число ленты и считаются
+        при каждом запросе."""
+        Follow.objects.create(user=self.reader, author=self.user)
+        client = Client()
+        client.force_login(self.reader)
+        url = reverse('posts:follow_index')
+        response, _ = self.get(url, client)
+        self.assertEqual(response.context['page_obj'].paginator.count, 8)
+        self.assertEqual(cache.get(page_count_key('feed', self.reader.pk)), 0)
+        post = Post.objects.create(author=self.user, text='Новый')
+        response, _ = self.get(url, client)
+        self.assertEqual(response.context['page_obj'].paginator.count, 9)
+        post.delete()
+        response, _ = self.get(url, client)
+        self.assertEqual(response.context['page_obj'].paginator.count, 8)
+
+    @override_settings(ESTIMATED_COUNT_LIMIT=5, LIMIT_POSTS=1)
+    def test_capped_count(self):
+        """Без числа в кеше большие списки считаются до предела,
+        точное число считает фоновая задача."""
+        response, _ = self.get(reverse('posts:index'))
+        paginator = response.context['page_obj'].paginator
+        self.assertTrue(paginator.is_capped)
+        self.assertEqual(paginator.num_pages, 5)
+        self.assertContains(response, '5+')
+        self.assertIsNone(cache.get(page_count_key('all')))
+
+        cache.clear()
+        with override_settings(TASKS_EAGER=True):
+            response, _ = self.get(reverse('posts:index'))
+        self.assertEqual(cache.get(page_count_key('all')), 8)
+        response, _ = self.get(reverse('posts:index'))
+        self.assertFalse(response.context['page_obj'].paginator.is_capped)
+        self.assertEqual(response.context['page_obj'].paginator.count, 8)
+
+
+class PageCountSignalTests(TransactionTestCase):
+    """Сигналы меняют числа после коммита, поэтому транзакции
+    тестов должны коммититься."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='auth')
+        self.group = Group.objects.create(
+            title='Группа', slug='slug', description='-'
+        )
+        self.other = Group.objects.create(
+            title='Другая', slug='other', description='-'
+        )
+        Post.objects.bulk_create([
+            Post(author=self.user, group=self.group, text=f'Пост {i}')
+            for i in range(8)
+        ])
+
+    def count(self, url):
+        return Client().get(url).context['page_obj'].paginator.count
+
+    def test_signals_update_counts(self):
+        """Создание и удаление поста меняют посчитанные числа,
+        откат транзакции - нет."""
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': 'slug'}),
+            reverse('posts:profile', kwargs={'username': 'auth'}),
+        ):
+            self.count(url)
+        keys = [
+            page_count_key('all'),
+            page_count_key('group', 'slug'),
+            page_count_key('author', 'auth'),
+        ]
+        post = Post.objects.create(
+            author=self.user, group=self.group, text='Новый'
+        )
+        self.assertEqual(list(cache.get_many(keys).values()), [9] * 3)
+        with self.assertRaises(ValueError), transaction.atomic():
+            Post.objects.create(author=self.user, text='Откат')
+            raise ValueError
+        post.delete()
+        self.assertEqual(list(cache.get_many(keys).values()), [8] * 3)
+
+    def test_group_change_moves_count(self):
+        """Правка, переносящая пост в другую группу, меняет
+        числа постов обеих групп."""
+        urls = [
+            reverse('posts:group_list', kwargs={'slug': slug})
+            for slug in ('slug', 'other')
+        ]
+        self.assertEqual([self.count(url) for url in urls], [8, 0])
+        client = Client()
+        client.force_login(self.user)
+        post = Post.objects.first()
+        client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            {'text': post.text, 'group': self.other.pk}
+        )
+        self.assertEqual([self.count(url) for url in urls], [7, 1])
+        post.refresh_from_db()
+        post.group = None
+        post.save()
+        self.assertEqual([self.count(url) for url in urls], [7, 0])
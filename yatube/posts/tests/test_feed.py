@@ -0,0 +1,113 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from posts.feed import feed_posts
+from posts.models import FeedItem, Follow, Post
+
+User = get_user_model()
+
+
+# Рассылка по лентам выполняется сразу при постановке задачи.
+@override_settings(TASKS_EAGER=True)
+class FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.other = User.objects.create_user(username='other')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def test_post_fanned_out_to_followers(self):
+        """Новый пост попадает в ленту подписчика,
+        но не в ленту остальных.
+        """
+        post = Post.objects.create(author=self.author, text='Пост')
+        post.refresh_from_db()
+        self.assertTrue(post.fanned_out)
+        self.assertTrue(
+            FeedItem.objects.filter(user=self.reader, post=post).exists()
+        )
+        self.assertIn(post, feed_posts(self.reader))
+        self.assertNotIn(post, feed_posts(self.other))
+
+    @override_settings(FEED_MAX_LENGTH=2)
+    def test_feed_trimmed(self):
+        """Лента обрезается до FEED_MAX_LENGTH последних постов,
+        обрезанные посты выбираются по подпискам."""
+        posts = [
+            Post.objects.create(author=self.author, text=str(i))
+            for i in range(4)
+        ]
+        Post.objects.create(author=self.other, text='Чужой пост')
+        self.assertEqual(
+            set(self.reader.feed.values_list('post_id', flat=True)),
+            {posts[2].pk, posts[3].pk}
+        )
+        feed = feed_posts(self.reader)
+        self.assertEqual(list(feed), posts[::-1])
+        self.assertEqual(feed[1:3], [posts[2], posts[1]])
+        self.assertEqual(len(feed), 4)
+
+    @override_settings(FEED_FANOUT_MAX_FOLLOWERS=1)
+    def test_unfanned_posts_merged_in_order(self):
+        """Неразосланные посты сливаются с лентой по убыванию id
+        на любой странице."""
+        celebrity = User.objects.create_user(username='celebrity')
+        Follow.objects.create(user=self.reader, author=celebrity)
+        Follow.objects.create(user=self.other, author=celebrity)
+        posts = [
+            Post.objects.create(
+                author=celebrity if i % 3 else self.author, text=str(i)
+            )
+            for i in range(7)
+        ]
+        self.assertEqual(
+            list(
+                Post.objects.order_by('pk')
+                .values_list('fanned_out', flat=True)
+            ),
+            [True, False, False] * 2 + [True]
+        )
+        feed = feed_posts(self.reader)
+        self.assertEqual(len(feed), 7)
+        self.assertEqual(feed[0:3] + feed[3:7], posts[::-1])
+
+    @override_settings(FEED_FANOUT_MAX_FOLLOWERS=0)
+    def test_celebrity_posts_merged_on_read(self):
+        """Посты автора с большим числом подписчиков не
+        рассылаются, но видны в ленте подписчика.
+        """
+        post = Post.objects.create(author=self.author, text='Пост')
+        self.assertFalse(post.fanned_out)
+        self.assertFalse(FeedItem.objects.filter(post=post).exists())
+        self.assertIn(post, feed_posts(self.reader))
+        self.assertNotIn(post, feed_posts(self.other))
+
+    def test_follow_backfill_and_unfollow_purge(self):
+        """Подписка заполняет ленту постами автора,
+        отписка - очищает.
+        """
+        post = Post.objects.create(author=self.author, text='Пост')
+        follow = Follow.objects.create(user=self.other, author=self.author)
+        self.assertIn(post, feed_posts(self.other))
+        follow.delete()
+        self.assertNotIn(post, feed_posts(self.other))
+        self.assertFalse(self.other.feed.exists())
+
+    def test_rebuild_feeds(self):
+        """Команда rebuild_feeds восстанавливает ленты пачками
+        и удаляет ленты пользователей без подписок."""
+        post = Post.objects.create(author=self.author, text='Пост')
+        FeedItem.objects.all().delete()
+        FeedItem.objects.create(user=self.other, post=post)
+        Post.objects.update(fanned_out=False)
+        call_command('rebuild_feeds', batch_size=1, stdout=StringIO())
+        self.assertFalse(self.other.feed.exists())
+        self.assertTrue(
+            FeedItem.objects.filter(user=self.reader, post=post).exists()
+        )
+        self.assertTrue(Post.objects.get(pk=post.pk).fanned_out)
@@ -74,7 +74,7 @@ class PostCreateFormTests(TestCase):
             Post.objects.filter(
                 text='Тестовый пост_1',
                 group=PostCreateFormTests.post.group,
-                image=PostCreateFormTests.post.image,
+                image="posts/small.gif",
                 author=PostCreateFormTests.user
             ).exists()
         )
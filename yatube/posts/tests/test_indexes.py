@@ -0,0 +1,81 @@
+import re
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from posts.feed import feed_posts
+from posts.models import Comment, Follow, Group, Like, Post
+
+User = get_user_model()
+
+FULL_SCAN = re.compile(r"\bSCAN\b(?!.*\bINDEX\b)")
+SORT = "TEMP B-TREE FOR ORDER BY"
+
+
+@skipUnless(connection.vendor == "sqlite", "План запроса SQLite")
+class IndexUsageTests(TestCase):
+    """Основные запросы представлений posts не сканируют
+    таблицы целиком (EXPLAIN QUERY PLAN)."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Пост', group=cls.group
+        )
+        Follow.objects.create(
+            user=User.objects.create_user(username='reader'),
+            author=cls.user
+        )
+
+    def assert_indexed(self, queryset):
+        plan = queryset.explain()
+        for line in plan.splitlines():
+            with self.subTest(line=line):
+                self.assertIsNone(FULL_SCAN.search(line), plan)
+        self.assertNotIn(SORT, plan)
+
+    def test_listing_queries(self):
+        """Главная, группа и профиль читают посты по индексу
+        без сортировки во временном B-дереве."""
+        limit = settings.LIMIT_POSTS
+        posts = Post.objects.select_related('author', 'group')
+        queries = {
+            'index': posts,
+            'group_list': posts.filter(group=self.group),
+            'profile': posts.filter(author=self.user),
+        }
+        for name, queryset in queries.items():
+            with self.subTest(view=name):
+                self.assert_indexed(queryset[:limit])
+
+    def test_follow_feed_query(self):
+        """Лента подписок читает id постов страницы из FeedItem
+        по индексу, без сортировки; неразосланные посты подписок -
+        по частичному индексу, а не по всем постам авторов."""
+        feed = feed_posts(User.objects.get(username='reader'))
+        self.assert_indexed(feed._items().values('post_id')[:10])
+        plan = feed._unfanned().values('pk')[:10].explain()
+        self.assertIn('post_unfanned_idx', plan)
+
+    def test_comment_and_like_queries(self):
+        """Комментарии и отметки поста читаются по индексу."""
+        self.assert_indexed(
+            Comment.objects.filter(post=self.post)
+            .select_related('author').order_by('created', 'id')[:20]
+        )
+        self.assert_indexed(
+            Like.objects.filter(post=self.post).order_by('-created')[:1]
+        )
+        self.assert_indexed(
+            Like.objects.filter(user=self.user, post=self.post)
+        )
@@ -0,0 +1,120 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count, F
+from django.test import TestCase
+
+from posts.loadgen import LoadConfig, LoadGenerator
+from posts.models import Comment, FeedItem, Follow, Group, Like, Post
+
+User = get_user_model()
+
+
+class LoadGeneratorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reports = LoadGenerator(LoadConfig(
+            users=100, groups=5, posts=1000, follows=10, likes=3,
+            comments=1, batch_size=300
+        )).run()
+
+    def test_counts(self):
+        """Создано заданное кол-во строк, отчёты совпадают с базой."""
+        self.assertEqual(User.objects.count(), 100)
+        self.assertEqual(Group.objects.count(), 5)
+        self.assertEqual(Post.objects.count(), 1000)
+        self.assertEqual(Comment.objects.count(), 1000)
+        reports = {report.dataset: report.rows for report in self.reports}
+        self.assertEqual(reports["follows"], Follow.objects.count())
+        self.assertEqual(reports["likes"], Like.objects.count())
+
+    def test_power_law(self):
+        """Подписчики и лайки сосредоточены у немногих авторов."""
+        followers = sorted(
+            User.objects.annotate(total=Count("following"))
+            .values_list("total", flat=True),
+            reverse=True
+        )
+        self.assertGreater(followers[0], 10 * followers[50])
+        likes = sorted(
+            Post.objects.annotate(total=Count("liked"))
+            .values_list("total", flat=True),
+            reverse=True
+        )
+        self.assertGreater(sum(likes[:100]), sum(likes) / 2)
+
+    def test_dates(self):
+        """Даты публикации распределены по году, реакции - после поста."""
+        dates = Post.objects.values_list("pub_date", flat=True)
+        self.assertGreater((max(dates) - min(dates)).days, 300)
+        self.assertFalse(
+            Like.objects.filter(created__lt=F("post__pub_date")).exists()
+        )
+        self.assertFalse(
+            Comment.objects.filter(created__lt=F("post__pub_date")).exists()
+        )
+
+
+class BenchmarkViewsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        LoadGenerator(
+            LoadConfig(users=20, groups=2, posts=50, follows=5)
+        ).run()
+        call_command("rebuild_feeds", stdout=StringIO())
+        call_command("reconcile_counters", stdout=StringIO())
+
+    def test_report(self):
+        """Замер сохраняется в JSON и сравнивается с предыдущим."""
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "result.json")
+            call_command(
+                "benchmark_views", repeat=2, output=output, stderr=StringIO()
+            )
+            with open(output) as file:
+                report = json.load(file)
+            self.assertEqual(report["dataset"]["posts"], 50)
+            self.assertEqual(
+                set(report["results"]),
+                {"index", "group_posts", "profile", "post_detail",
+                 "follow_index"}
+            )
+            for result in report["results"].values():
+                for mode in ("warm", "cold"):
+                    self.assertEqual(
+                        set(result[mode]),
+                        {"p50_ms", "p95_ms", "mean_ms", "queries",
+                         "cache_queries", "query_ms", "html_kb"}
+                    )
+            self.assertTrue(FeedItem.objects.exists())
+            stdout = StringIO()
+            call_command(
+                "benchmark_views", repeat=1, pages=["index"],
+                compare=output, stdout=stdout, stderr=StringIO()
+            )
+            self.assertIn("index [cold]: p50_ms", stdout.getvalue())
+
+    def test_templates(self):
+        """Время отрисовки шаблонов замеряется с кешем загрузчика
+        и без него."""
+        stdout = StringIO()
+        call_command(
+            "benchmark_templates", repeat=2, stdout=stdout, stderr=StringIO()
+        )
+        report = json.loads(stdout.getvalue())
+        self.assertEqual(report["posts_per_page"], 10)
+        self.assertEqual(
+            set(report["results"]),
+            {"posts/index.html", "posts/profile.html",
+             "posts/post_detail.html"}
+        )
+        for result in report["results"].values():
+            for loader in ("cached", "uncached"):
+                self.assertEqual(
+                    set(result[loader]),
+                    {"first_ms", "p50_ms", "p95_ms", "mean_ms"}
+                )
@@ -0,0 +1,99 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.db import connection, connections, transaction
+from django.test import Client, TransactionTestCase
+from django.urls import reverse
+
+from core.db import immediate_atomic
+from posts.models import Comment, Like, Post
+
+User = get_user_model()
+
+THREADS = 8
+ROUNDS = 15
+
+
+class SQLiteLockingTests(TransactionTestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username="author")
+        self.post = Post.objects.create(author=self.author, text="Пост")
+        self.clients = []
+        for number in range(THREADS):
+            client = Client()
+            client.force_login(
+                User.objects.create_user(username=f"reader{number}")
+            )
+            self.clients.append(client)
+
+    def test_pragmas(self):
+        """Новое соединение настроено PRAGMA из SQLITE_PRAGMAS."""
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            self.assertEqual(cursor.fetchone()[0], "wal")
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+    def test_begin_immediate_opt_in(self):
+        """BEGIN IMMEDIATE - только в immediate_atomic, остальные
+        транзакции не берут блокировку записи заранее."""
+        statements = []
+
+        def record(execute, sql, params, many, context):
+            statements.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            with transaction.atomic():
+                Post.objects.count()
+            with immediate_atomic():
+                with immediate_atomic():
+                    Post.objects.count()
+        self.assertEqual(
+            [sql for sql in statements if sql.startswith("BEGIN")],
+            ["BEGIN", "BEGIN IMMEDIATE"]
+        )
+
+    def test_concurrent_writes(self):
+        """Лайки и комментарии из многих потоков одновременно
+        сохраняются без ошибок "database is locked"."""
+        post_id = self.post.pk
+        urls = {
+            "like": reverse("posts:post_like", args=[post_id]),
+            "dislike": reverse("posts:post_dislike", args=[post_id]),
+            "comment": reverse("posts:add_comment", args=[post_id]),
+        }
+        barrier = threading.Barrier(THREADS, timeout=30)
+        errors = []
+
+        def hammer(client):
+            try:
+                barrier.wait()
+                for number in range(ROUNDS):
+                    for response in (
+                        client.get(urls["like"]),
+                        client.post(urls["comment"], {"text": f"К{number}"}),
+                        client.get(urls["dislike"]),
+                        client.get(urls["like"]),
+                    ):
+                        if response.status_code != 302:
+                            errors.append(response.status_code)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=hammer, args=[client])
+            for client in self.clients
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(Like.objects.count(), THREADS)
+        self.assertEqual(Comment.objects.count(), THREADS * ROUNDS)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, THREADS)
+        self.assertEqual(self.post.comment_count, THREADS * ROUNDS)
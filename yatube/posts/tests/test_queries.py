@@ -0,0 +1,84 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.testing import assert_query_budget
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class QueryBudgetTests(TestCase):
+    """Представления укладываются в бюджеты запросов из posts.urls
+    и не выполняют N+1 на странице из 10 постов."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        authors = [
+            User.objects.create_user(username=f'author_{i}')
+            for i in range(6)
+        ]
+        groups = [
+            Group.objects.create(
+                title=f'Группа {i}', slug=f'slug_{i}', description='-'
+            )
+            for i in range(3)
+        ]
+        for i in range(12):
+            Post.objects.create(
+                author=authors[i % len(authors)],
+                group=groups[i % len(groups)],
+                text=f'Пост {i}'
+            )
+        cls.post = Post.objects.create(
+            author=cls.user, group=groups[0], text='Пост автора'
+        )
+        for author in authors:
+            Follow.objects.create(user=cls.user, author=author)
+            Comment.objects.create(
+                author=author, post=cls.post, text='Коментарий'
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(QueryBudgetTests.user)
+
+    def test_read_views_budget(self):
+        """Страницы чтения - в пределах бюджета, с холодным
+        и с прогретым кешем."""
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': 'slug_0'}),
+            reverse('posts:profile', kwargs={'username': 'author_0'}),
+            reverse('posts:post_detail',
+                    kwargs={'post_id': QueryBudgetTests.post.pk}),
+            reverse('posts:post_comments',
+                    kwargs={'post_id': QueryBudgetTests.post.pk}),
+            reverse('posts:follow_index'),
+            reverse('posts:search') + '?q=Пост',
+            reverse('posts:post_create'),
+            reverse('posts:post_edit',
+                    kwargs={'post_id': QueryBudgetTests.post.pk}),
+        ]
+        for url in urls:
+            for attempt in ('cold', 'warm'):
+                with self.subTest(url=url, cache=attempt):
+                    assert_query_budget(self.authorized_client, url)
+
+    def test_write_views_budget(self):
+        """Лайк и подписка - в пределах бюджета."""
+        post_kwargs = {'post_id': QueryBudgetTests.post.pk}
+        user_kwargs = {'username': 'author_0'}
+        urls = [
+            reverse('posts:post_like', kwargs=post_kwargs),
+            reverse('posts:post_dislike', kwargs=post_kwargs),
+            reverse('posts:profile_unfollow', kwargs=user_kwargs),
+            reverse('posts:profile_follow', kwargs=user_kwargs),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                assert_query_budget(self.authorized_client, url)
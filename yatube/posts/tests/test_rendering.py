@@ -0,0 +1,86 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.cache import get_generation
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+TEXT = "Первая строка <b>жирная</b>\nвторая строка длинного поста"
+
+
+class RenderedTextTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="auth")
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_rendered_on_save(self):
+        """Формы сохраняют экранированный текст с переносами
+        и начало текста; правка поста их обновляет."""
+        self.client.post(reverse("posts:post_create"), {"text": TEXT})
+        post = Post.objects.get()
+        self.assertEqual(
+            post.text_html,
+            "Первая строка &lt;b&gt;жирная&lt;/b&gt;<br>"
+            "вторая строка длинного поста"
+        )
+        self.assertEqual(post.excerpt, "Первая строка <b>жирная</b>\nв…")
+        self.client.post(
+            reverse("posts:add_comment", args=[post.pk]), {"text": TEXT}
+        )
+        self.assertEqual(Comment.objects.get().text_html, post.text_html)
+        self.client.post(
+            reverse("posts:post_edit", args=[post.pk]), {"text": "Новый"}
+        )
+        post.refresh_from_db()
+        self.assertEqual((post.text_html, post.excerpt), ("Новый", "Новый"))
+
+    def test_templates_output_stored(self):
+        """Шаблоны выводят сохранённый текст, а не отрисовывают его."""
+        post = Post.objects.create(author=self.user, text=TEXT)
+        Comment.objects.create(author=self.user, post=post, text=TEXT)
+        Post.objects.update(text_html="Сохранённый пост", excerpt="Начало")
+        Comment.objects.update(text_html="Сохранённый комментарий")
+        response = self.client.get(
+            reverse("posts:post_detail", args=[post.pk])
+        )
+        self.assertContains(response, "Пост : Начало")
+        self.assertContains(response, "Сохранённый пост")
+        self.assertContains(response, "Сохранённый комментарий")
+        self.assertNotContains(response, "вторая строка")
+
+    def test_prerender_command(self):
+        """prerender_text заполняет строки, созданные bulk_create,
+        и исправляет устаревшие, меняя версию их карточек; повторный
+        запуск ничего не меняет и кеш страниц не сбрасывает."""
+        Post.objects.bulk_create(
+            [Post(author=self.user, text=f"Пост\n{i}") for i in range(5)]
+        )
+        post = Post.objects.first()
+        Post.objects.filter(pk=post.pk).update(text_html="Устаревший")
+        Comment.objects.bulk_create(
+            [Comment(author=self.user, post=post, text="Комментарий")]
+        )
+        stdout = StringIO()
+        generation = get_generation()
+        call_command("prerender_text", batch_size=2, stdout=stdout)
+        self.assertNotEqual(get_generation(), generation)
+        self.assertIn("постов: 5, комментариев: 1", stdout.getvalue())
+        self.assertFalse(Post.objects.filter(text_html="").exists())
+        self.assertEqual(
+            list(Post.objects.exclude(version=1).values_list("pk")),
+            [(post.pk,)]
+        )
+        self.assertEqual(Comment.objects.get().text_html, "Комментарий")
+        generation = get_generation()
+        call_command("prerender_text", stdout=stdout)
+        self.assertIn("постов: 0, комментариев: 0", stdout.getvalue())
+        self.assertEqual(get_generation(), generation)
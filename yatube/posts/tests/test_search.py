@@ -0,0 +1,156 @@
+from django.contrib.auth import get_user_model
+from django.contrib.admin.sites import site
+from django.db import connection
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Post
+from posts.admin import PostAdmin
+from posts.search import get_backend, matching_posts, search_posts
+
+User = get_user_model()
+
+
+# Индексация выполняется сразу при постановке задачи.
+@override_settings(TASKS_EAGER=True)
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.in_text = Post.objects.create(
+            author=cls.user, text='Рецепт борща со сметаной'
+        )
+        cls.in_comment = Post.objects.create(
+            author=cls.user, text='Что приготовить на обед?'
+        )
+        Comment.objects.create(
+            author=cls.user, post=cls.in_comment, text='Сварите борщ'
+        )
+        Post.objects.create(author=cls.user, text='Прогулка по парку')
+
+    def test_ranked_by_text_and_comments(self):
+        """Пост находится по тексту и по комментариям, совпадение
+        в тексте поста выше совпадения в комментарии."""
+        self.assertEqual(
+            list(search_posts('борщ')),
+            [SearchTests.in_text, SearchTests.in_comment]
+        )
+
+    def test_index_follows_edit_and_delete(self):
+        """Индекс обновляется при правке и удалении поста."""
+        post = Post.objects.get(pk=SearchTests.in_text.pk)
+        post.text = 'Рецепт окрошки'
+        post.save()
+        self.assertIn(post, search_posts('окрош'))
+        self.assertNotIn(post, search_posts('сметаной'))
+        post.delete()
+        self.assertFalse(matching_posts('окрошки').exists())
+
+    def test_comment_indexed_alone(self):
+        """Комментарий индексируется своей строкой: число запросов
+        не зависит от числа комментариев поста, удалённый комментарий
+        больше не находится."""
+        post = SearchTests.in_comment
+        Comment.objects.bulk_create([
+            Comment(author=SearchTests.user, post=post, text=f'Ответ {i}')
+            for i in range(20)
+        ])
+        comment = Comment.objects.create(
+            author=SearchTests.user, post=post, text='Добавьте укроп'
+        )
+        # Удаление и вставка строки в точке сохранения.
+        with self.assertNumQueries(4):
+            get_backend().index_comment(comment.pk)
+        self.assertEqual(list(search_posts('укроп')), [post])
+        comment.delete()
+        self.assertFalse(matching_posts('укроп').exists())
+        self.assertEqual(list(search_posts('борщ')), [
+            SearchTests.in_text, post
+        ])
+
+    def test_ranked_pages(self):
+        """Срезы результатов выбираются по релевантности с LIMIT/OFFSET,
+        число результатов известно без выборки."""
+        results = search_posts('борщ')
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[1:2], [SearchTests.in_comment])
+        self.assertEqual(results[2:4], [])
+
+    def explain(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return ' '.join(str(row[-1]) for row in cursor.fetchall())
+
+    def test_ranking_not_correlated(self):
+        """Ранжирование - один проход по совпадениям, без подзапроса
+        на каждую найденную строку."""
+        backend = get_backend()
+        expression = backend.match_expression(['борщ'])
+        plan = self.explain(
+            backend.ranked(), [expression, expression, 10, 0]
+        )
+        self.assertNotIn('CORRELATED', plan)
+
+    def test_admin_search_not_correlated(self):
+        """Поиск в админке выбирает совпадения одним подзапросом,
+        а не по подзапросу на каждую строку постов."""
+        request = RequestFactory().get('/')
+        queryset, _ = PostAdmin(Post, site).get_search_results(
+            request, Post.objects.all(), 'борщ'
+        )
+        self.assertEqual(
+            set(queryset), {SearchTests.in_text, SearchTests.in_comment}
+        )
+        self.assertNotIn('CORRELATED', queryset.explain())
+
+    @override_settings(SEARCH_RANK_MAX_MATCHES=1)
+    def test_frequent_words_by_date(self):
+        """Частые слова выводятся от новых постов к старым."""
+        self.assertEqual(
+            list(search_posts('борщ')),
+            [SearchTests.in_comment, SearchTests.in_text]
+        )
+
+    def test_query_syntax_is_ignored(self):
+        """Операторы и кавычки FTS5 в запросе не ломают поиск."""
+        for query in ('"борщ', 'борщ AND (', 'NEAR(*', '   '):
+            with self.subTest(query=query):
+                list(search_posts(query))
+
+    @override_settings(SEARCH_BACKEND='posts.search.LikeBackend')
+    def test_like_backend(self):
+        """Запасной бэкенд без индекса находит те же посты."""
+        self.assertEqual(
+            set(search_posts('Рецепт')), {SearchTests.in_text}
+        )
+        self.assertEqual(get_backend().rebuild(), 0)
+
+    def test_rebuild(self):
+        """Пересборка индекса учитывает все посты."""
+        self.assertEqual(get_backend().rebuild(), Post.objects.count())
+        self.assertEqual(search_posts('борщ').count(), 2)
+
+    def test_search_page(self):
+        """Страница поиска выводит найденные посты."""
+        response = Client().get(reverse('posts:search'), {'q': 'борщ'})
+        self.assertEqual(response.context['query'], 'борщ')
+        self.assertEqual(
+            list(response.context['page_obj']),
+            [SearchTests.in_text, SearchTests.in_comment]
+        )
+
+    def test_admin_search(self):
+        """Поиск в админке идёт через тот же индекс."""
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        client = Client()
+        client.force_login(admin)
+        response = client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'борщ'}
+        )
+        self.assertEqual(
+            set(response.context['cl'].result_list),
+            {SearchTests.in_text, SearchTests.in_comment}
+        )
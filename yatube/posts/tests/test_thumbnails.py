@@ -0,0 +1,101 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import thumbnails
+from posts.forms import PostForm
+from posts.models import Post
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+User = get_user_model()
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def uploaded(name='small.gif'):
+    return SimpleUploadedFile(
+        name=name, content=SMALL_GIF, content_type='image/gif'
+    )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.post = Post.objects.create(
+            author=ThumbnailTests.user, text='Пост', image=uploaded()
+        )
+
+    def test_generate_stores_image_set(self):
+        """Миниатюры создаются заранее во всех форматах, шаблон
+        выводит srcset и размеры из поста, в том числе на уже
+        закешированных страницах."""
+        Client().get(reverse('posts:index'))
+        self.assertEqual(thumbnails.generate([self.post.pk]), 1)
+        self.post.refresh_from_db()
+        image = self.post.image_sources
+        self.assertTrue(image['src'].startswith(settings.MEDIA_URL))
+        self.assertEqual((image['width'], image['height']), (2, 1))
+        self.assertEqual(
+            [source['type'] for source in image['sources']], ['image/webp']
+        )
+        for url in (
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+            reverse('posts:index'),
+        ):
+            with self.subTest(url=url):
+                response = Client().get(url)
+                self.assertContains(response, image['sources'][0]['srcset'])
+                self.assertContains(response, 'width="2" height="1"')
+
+    def test_new_image_resets_thumbnail(self):
+        """Новая картинка из PostForm сбрасывает старую миниатюру,
+        новая создаётся задачей после коммита."""
+        thumbnails.generate([self.post.pk])
+        self.post.refresh_from_db()
+        form = PostForm(
+            {'text': 'Пост'},
+            files={'image': uploaded('other.gif')},
+            instance=self.post
+        )
+        self.assertTrue(form.is_valid())
+        form.save()
+        self.post.refresh_from_db()
+        self.assertIsNone(self.post.image_sources)
+
+    def test_generate_thumbnails_command(self):
+        """Команда создаёт недостающие миниатюры."""
+        Post.objects.create(author=ThumbnailTests.user, text='Без картинки')
+        call_command('generate_thumbnails', workers=0, stdout=StringIO())
+        self.assertEqual(
+            Post.objects.exclude(image='').filter(image_set='').count(),
+            0
+        )
+        self.assertEqual(
+            Post.objects.filter(image='').exclude(image_set='').count(),
+            0
+        )
@@ -0,0 +1,112 @@
+import datetime as dt
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from posts import transfer
+from posts.models import Comment, FeedItem, Follow, Group, Like, Post
+
+User = get_user_model()
+
+
+# Исходные посты разосланы по лентам, как после выполнения очереди.
+@override_settings(TASKS_EAGER=True)
+class TransferTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        group = Group.objects.create(
+            title='Группа', slug='slug', description='Описание, "с кавычками"'
+        )
+        for i in range(5):
+            post = Post.objects.create(
+                author=cls.author,
+                group=group if i % 2 else None,
+                text=f'Пост {i}\nвторая строка'
+            )
+            Comment.objects.create(
+                author=cls.reader, post=post, text=f'Коментарий {i}'
+            )
+            Like.objects.create(user=cls.reader, post=post)
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.pub_date = timezone.now() - dt.timedelta(days=365)
+        Post.objects.update(pub_date=cls.pub_date)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def snapshot(self):
+        return {
+            model.__name__: list(model.objects.order_by('pk').values())
+            for model in (Group, Post, Comment, Follow, Like)
+        }
+
+    def delete_all(self):
+        Group.objects.all().delete()
+        Post.objects.all().delete()
+        Follow.objects.all().delete()
+
+    def test_round_trip(self):
+        """Данные переносятся без потерь, с датами публикации;
+        производные данные пересобираются."""
+        for data_format in transfer.FORMATS:
+            with self.subTest(format=data_format):
+                before = self.snapshot()
+                call_command(
+                    'export_data', self.directory, format=data_format,
+                    chunk_size=2, stdout=StringIO()
+                )
+                self.delete_all()
+                output = StringIO()
+                call_command(
+                    'import_data', self.directory, format=data_format,
+                    batch_size=2, stdout=output
+                )
+                self.assertIn('строк/с', output.getvalue())
+                self.assertEqual(self.snapshot(), before)
+                self.assertEqual(
+                    FeedItem.objects.filter(
+                        user=TransferTests.reader
+                    ).count(),
+                    5
+                )
+
+    def test_resume_import(self):
+        """Прерванная загрузка продолжается с сохранённого места."""
+        call_command('export_data', self.directory, stdout=StringIO())
+        path = transfer.data_path(
+            self.directory, transfer.get_datasets(['posts'])[0], 'jsonl'
+        )
+        self.delete_all()
+        transfer.write_state(path, rows=3)
+        call_command(
+            'import_data', self.directory, datasets=['groups', 'posts'],
+            skip_rebuild=True, stdout=StringIO()
+        )
+        self.assertEqual(Post.objects.count(), 2)
+
+    def test_resume_export(self):
+        """Прерванная выгрузка дописывает файл без повторов."""
+        dataset = transfer.get_datasets(['posts'])[0]
+        path = transfer.data_path(self.directory, dataset, 'jsonl')
+        transfer.export_dataset(dataset, path, 'jsonl', chunk_size=2)
+        with open(path, encoding='utf-8') as file:
+            lines = file.readlines()
+        with open(path, 'w', encoding='utf-8') as file:
+            file.writelines(lines[:3])
+        transfer.write_state(
+            path, last_pk=Post.objects.order_by('pk')[1].pk,
+            offset=len(''.join(lines[:2]).encode())
+        )
+        report = transfer.export_dataset(dataset, path, 'jsonl', 2)
+        self.assertEqual(report.rows, 3)
+        with open(path, encoding='utf-8') as file:
+            self.assertEqual(file.readlines(), lines)
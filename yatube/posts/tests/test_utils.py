@@ -0,0 +1,154 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.paginator import Page
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Group, Post
+from posts.utils import CursorPaginator, WindowedPaginator, elided_page_range
+
+User = get_user_model()
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create([
+            Post(author=cls.user, text='Тестовый пост' + str(i),
+                 group=cls.group)
+            for i in range(settings.LIMIT_POSTS * 2 + settings.SECOND_PAGE)
+        ])
+        # Одинаковая дата публикации: порядок держится только на pk.
+        first = Post.objects.order_by('pk').first()
+        Post.objects.update(pub_date=first.pub_date)
+
+    def setUp(self):
+        self.paginator = CursorPaginator(
+            Post.objects.all(), settings.LIMIT_POSTS
+        )
+
+    def test_cursor_walks_all_posts(self):
+        """Проход по курсорам вперёд выдаёт все посты
+        без пропусков и повторов в порядке (-pub_date, -pk).
+        """
+        seen = []
+        page = self.paginator.get_page()
+        self.assertFalse(page.has_previous())
+        while True:
+            seen.extend(post.pk for post in page)
+            if not page.has_next():
+                break
+            page = self.paginator.get_page(page.next_cursor)
+        self.assertEqual(
+            seen,
+            list(Post.objects.order_by('-pub_date', '-pk')
+                 .values_list('pk', flat=True))
+        )
+        self.assertEqual(len(page), settings.SECOND_PAGE)
+
+    def test_cursor_previous(self):
+        """Курсор previous возвращает ту же страницу,
+        с которой был сделан переход вперёд.
+        """
+        first = self.paginator.get_page()
+        second = self.paginator.get_page(first.next_cursor)
+        back = self.paginator.get_page(second.previous_cursor)
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+        self.assertTrue(back.has_next())
+
+    def test_bad_cursor_gives_first_page(self):
+        """Повреждённый токен даёт первую страницу."""
+        for cursor in ('мусор', 'e30', 'WyJuIiwgWyJ4Il1d'):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(
+                    list(self.paginator.get_page(cursor)),
+                    list(self.paginator.get_page())
+                )
+
+    def test_view_cursor_walk(self):
+        """Главная и профиль листаются курсором: первая страница -
+        обычная Page, "Следующая" ведёт курсором, страницы по курсору
+        проходят все посты без повторов и пропусков."""
+        expected = list(
+            Post.objects.values_list('pk', flat=True)
+        )
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:profile', kwargs={'username': 'auth'}),
+        ):
+            with self.subTest(url=url):
+                response = Client().get(url)
+                page_obj = response.context['page_obj']
+                self.assertIsInstance(page_obj, Page)
+                seen = [post.pk for post in page_obj]
+                cursor = str(page_obj.next_cursor)
+                while cursor:
+                    self.assertContains(response, f'?cursor={cursor}')
+                    response = Client().get(url, {'cursor': cursor})
+                    page_obj = response.context['page_obj']
+                    self.assertTrue(page_obj.is_cursor)
+                    seen += [post.pk for post in page_obj]
+                    cursor = page_obj.next_cursor
+                self.assertEqual(seen, expected)
+
+    @override_settings(PAGINATION_MODES={})
+    def test_view_offset_mode(self):
+        """Без режима "cursor" ссылки ведут по номерам страниц."""
+        response = Client().get(reverse('posts:index'))
+        self.assertNotContains(response, '?cursor=')
+        self.assertContains(response, '?page=2')
+
+
+class WindowedPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.groups = {}
+        for slug, total in (('small', 30), ('large', 3000)):
+            group = Group.objects.create(
+                title=slug, slug=slug, description='-'
+            )
+            Post.objects.bulk_create([
+                Post(author=cls.user, text='Пост', group=group)
+                for _ in range(total)
+            ])
+            cls.groups[slug] = group
+
+    def test_elided_page_range(self):
+        """Первые, последние и соседние с текущей страницы,
+        пропуски - многоточие."""
+        ellipsis = WindowedPaginator.ELLIPSIS
+        cases = {
+            (1, 5): [1, 2, 3, 4, 5],
+            (1, 100): [1, 2, 3, ellipsis, 100],
+            (50, 100): [1, ellipsis, 48, 49, 50, 51, 52, ellipsis, 100],
+            (100, 100): [1, ellipsis, 98, 99, 100],
+        }
+        for (number, num_pages), expected in cases.items():
+            with self.subTest(number=number, num_pages=num_pages):
+                self.assertEqual(
+                    list(elided_page_range(number, num_pages, 2, 1)),
+                    expected
+                )
+
+    @override_settings(LIMIT_POSTS=1)
+    def test_html_size_bounded(self):
+        """Размер страницы группы не зависит от числа страниц."""
+        sizes = {}
+        for slug in self.groups:
+            response = Client().get(
+                reverse('posts:group_list', kwargs={'slug': slug}),
+                {'page': 20}
+            )
+            self.assertContains(response, WindowedPaginator.ELLIPSIS)
+            sizes[slug] = len(response.content)
+        self.assertLess(abs(sizes['large'] - sizes['small']), 100)
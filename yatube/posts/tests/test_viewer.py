@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.queries import QueryRecorder
+from posts import viewer
+from posts.models import Follow, Like, Post
+from posts.search import get_backend
+
+User = get_user_model()
+
+
+class ViewerStateTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.followed = User.objects.create_user(username='followed')
+        cls.other = User.objects.create_user(username='other')
+        cls.posts = [
+            Post.objects.create(
+                author=(cls.followed, cls.other)[i % 2], text=f'Пост {i}'
+            )
+            for i in range(10)
+        ]
+        Follow.objects.create(user=cls.user, author=cls.followed)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(ViewerStateTests.user)
+
+    def test_annotate(self):
+        """Отметки проставляются двумя запросами на страницу."""
+        Like.objects.create(user=self.user, post=self.posts[3])
+        posts = Post.objects.all()
+        with self.assertNumQueries(3):
+            posts = viewer.annotate(posts, self.user)
+        liked = [post for post in posts if post.is_liked]
+        self.assertEqual(liked, [self.posts[3]])
+        for post in posts:
+            self.assertEqual(
+                post.author_followed, post.author_id == self.followed.pk
+            )
+
+    def test_anonymous(self):
+        """Для анонимного пользователя запросов отметок нет."""
+        posts = list(Post.objects.all())
+        with self.assertNumQueries(0):
+            viewer.annotate(posts, AnonymousUser())
+        self.assertFalse(any(post.is_liked for post in posts))
+
+    def test_constant_queries(self):
+        """Число запросов главной страницы не зависит от числа
+        лайков пользователя, кнопки лайка выводятся у всех постов."""
+        url = reverse('posts:index')
+        counts = []
+        for batch in self.posts[:2], self.posts[2:]:
+            Like.objects.bulk_create(
+                [Like(user=self.user, post=post) for post in batch]
+            )
+            cache.clear()
+            recorder = QueryRecorder()
+            with connection.execute_wrapper(recorder):
+                response = self.client.get(url)
+            counts.append(len(recorder.queries))
+        self.assertEqual(counts[0], counts[1])
+        self.assertContains(response, 'Мне нравится', count=10)
+        self.assertContains(response, 'Вы подписаны', count=5)
+
+    def test_search(self):
+        """Результаты поиска показывают лайки и подписки
+        пользователя."""
+        get_backend().rebuild()
+        Like.objects.create(user=self.user, post=self.posts[0])
+        response = self.client.get(reverse('posts:search'), {'q': 'Пост'})
+        self.assertEqual(len(response.context['page_obj']), 10)
+        self.assertContains(response, 'Мне нравится', count=1)
+        self.assertContains(response, 'Оценить пост', count=9)
+        self.assertContains(response, 'Вы подписаны', count=5)
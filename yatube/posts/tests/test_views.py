@@ -1,15 +1,23 @@
 import shutil
 import tempfile
+from io import StringIO
+from unittest import mock
 
 from django import forms
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase, override_settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import (Client, TestCase, TransactionTestCase,
+                         override_settings)
 from django.urls import reverse
 
-from posts.models import Comment, Follow, Group, Post
+from core import concurrency
+from core.queries import QueryRecorder
+from core.models import Task
+from posts.models import Comment, FeedItem, Follow, Group, Like, Post
 
 from .data import URL_TEMPLATES
 
@@ -376,12 +384,14 @@ class CashViewTests(TestCase):
         self.authorized_client.force_login(CashViewTests.user)
 
     def test_cash(self):
-        """Тест работоспособности кеша"""
+        """Тест работоспособности кеша: страница отдаётся из кеша,
+        пока контент не изменился, и обновляется при изменении.
+        """
         response = self.authorized_client.get(reverse("posts:index"))
-        Post.objects.create(
-            text="Тестовый пост 2",
-            group=CashViewTests.group,
-            author=CashViewTests.user
+        # update() не отправляет сигналов - поколение кеша не меняется.
+        Post.objects.filter(pk=CashViewTests.post.pk).update(
+            text="Тихо изменённый пост",
+            text_html="Тихо изменённый пост"
         )
         response_1 = self.authorized_client.get(reverse("posts:index"))
         self.assertEqual(
@@ -394,3 +404,216 @@ class CashViewTests(TestCase):
             response.content,
             response_2.content
         )
+        Post.objects.create(
+            text="Тестовый пост 2",
+            group=CashViewTests.group,
+            author=CashViewTests.user
+        )
+        response_3 = self.authorized_client.get(reverse("posts:index"))
+        self.assertContains(response_3, "Тестовый пост 2")
+
+    def test_cash_keys(self):
+        """Закешированная главная страница не отдаётся
+        вместо ленты подписок.
+        """
+        self.authorized_client.get(reverse("posts:index"))
+        response = self.authorized_client.get(reverse("posts:follow_index"))
+        self.assertNotContains(response, CashViewTests.post.text)
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text="Тестовый пост",
+            group=cls.group
+        )
+        cls.urls = (
+            reverse("posts:index"),
+            reverse("posts:group_list", kwargs={"slug": "slug"}),
+            reverse("posts:profile", kwargs={"username": "auth"}),
+            reverse("posts:post_detail", kwargs={"post_id": cls.post.pk}),
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(ConditionalGetTests.reader)
+
+    def test_not_modified(self):
+        """Пока контент не изменился, страницы отвечают 304
+        без запросов к БД, кроме сессии и пользователя."""
+        for url in ConditionalGetTests.urls:
+            with self.subTest(url=url):
+                # Первый ответ может выдать cookie с токеном CSRF,
+                # который входит в ETag.
+                self.client.get(url)
+                response = self.client.get(url)
+                self.assertIn("Cookie", response["Vary"])
+                self.assertIn("no-cache", response["Cache-Control"])
+                recorder = QueryRecorder()
+                with connection.execute_wrapper(recorder):
+                    response = self.client.get(
+                        url, HTTP_IF_NONE_MATCH=response["ETag"]
+                    )
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(len(recorder), 2)
+
+    def test_last_modified(self):
+        """Страница не изменилась с даты Last-Modified."""
+        url = reverse("posts:index")
+        response = self.client.get(url)
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_modified(self):
+        """Изменение контента и смена пользователя меняют ETag."""
+        url = reverse("posts:post_detail",
+                      kwargs={"post_id": ConditionalGetTests.post.pk})
+        etag = self.client.get(url)["ETag"]
+        Comment.objects.create(
+            author=ConditionalGetTests.user,
+            post=ConditionalGetTests.post,
+            text="Новый коментарий"
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "Новый коментарий")
+        etag = response["ETag"]
+        other = Client()
+        other.force_login(ConditionalGetTests.user)
+        response = other.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class CommentPaginationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user, text="Пост")
+        Comment.objects.bulk_create([
+            Comment(author=cls.user, post=cls.post, text=f"Коментарий {i}")
+            for i in range(settings.LIMIT_COMMENTS + settings.SECOND_PAGE)
+        ])
+
+    def test_post_detail_first_comments(self):
+        """На странице поста - первые LIMIT_COMMENTS комментариев
+        по возрастанию даты и ссылка на следующую порцию."""
+        response = Client().get(
+            reverse("posts:post_detail", kwargs={"post_id": self.post.pk})
+        )
+        comments = response.context["comments"]
+        self.assertEqual(len(comments), settings.LIMIT_COMMENTS)
+        self.assertEqual(comments[0].text, "Коментарий 0")
+        self.assertTrue(comments.has_next())
+        self.assertContains(response, comments.next_cursor)
+
+    def test_more_comments_fragment(self):
+        """Фрагмент "Показать ещё" отдаёт оставшиеся комментарии."""
+        url = reverse("posts:post_comments", kwargs={"post_id": self.post.pk})
+        first = Client().get(url).context["comments"]
+        response = Client().get(url, {"cursor": first.next_cursor})
+        self.assertTemplateUsed(response, "includes/comment_list.html")
+        self.assertTemplateNotUsed(response, "base.html")
+        comments = response.context["comments"]
+        self.assertEqual(len(comments), settings.SECOND_PAGE)
+        self.assertFalse(comments.has_next())
+
+
+class ConcurrentReadViewTests(TransactionTestCase):
+    """Вне транзакции теста представления читают в пуле потоков
+    READ_WORKERS (core.concurrency)."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='auth')
+        self.reader = User.objects.create_user(username='reader')
+        self.group = Group.objects.create(
+            title='Тестовая группа', slug='slug', description='-'
+        )
+        self.post = Post.objects.create(
+            author=self.user, group=self.group, text='Тестовый пост'
+        )
+        Follow.objects.create(user=self.reader, author=self.user)
+        Like.objects.create(user=self.reader, post=self.post)
+        self.client = Client()
+        self.client.force_login(self.reader)
+        patcher = mock.patch.object(
+            concurrency, '_run', wraps=concurrency._run
+        )
+        self.pooled = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_pages(self):
+        """Страницы, собранные в пуле, те же, что и по очереди."""
+        self.assertTrue(settings.READ_WORKERS)
+        detail = reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.pk}
+        )
+        for url in (*PUBLIC_URLS, detail, reverse('posts:follow_index')):
+            with self.subTest(url=url):
+                self.pooled.reset_mock()
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(self.pooled.called)
+                self.assertContains(response, 'Тестовый пост')
+                self.assertContains(response, 'Мне нравится')
+        response = self.client.get(
+            reverse('posts:profile', kwargs={'username': 'auth'})
+        )
+        self.assertTrue(response.context['following'])
+        self.assertEqual(response.context['page_obj'][0], self.post)
+
+
+class QueuedTasksViewTests(TransactionTestCase):
+    """Побочные действия представлений (рассылка, индексация)
+    выполняет обработчик очереди run_tasks, а не запрос."""
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='auth')
+        self.reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def search(self, query):
+        response = self.reader_client.get(
+            reverse('posts:search'), {'q': query}
+        )
+        return list(response.context['page_obj'])
+
+    def test_post_and_comment_processed_by_queue(self):
+        """Новый пост и комментарий находятся поиском и пост
+        попадает в ленту подписчика после run_tasks --once."""
+        self.author_client.post(
+            reverse('posts:post_create'), {'text': 'Рецепт борща'}
+        )
+        post = Post.objects.get()
+        self.author_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': post.pk}),
+            {'text': 'Добавьте сметану'}
+        )
+        self.assertEqual(self.search('борща'), [])
+        self.assertEqual(self.search('сметану'), [])
+        self.assertFalse(FeedItem.objects.exists())
+
+        call_command('run_tasks', '--once', stdout=StringIO())
+        self.assertFalse(Task.objects.exclude(status=Task.DONE).exists())
+        self.assertEqual(self.search('борща'), [post])
+        self.assertEqual(self.search('сметану'), [post])
+        response = self.reader_client.get(reverse('posts:follow_index'))
+        self.assertEqual(list(response.context['page_obj']), [post])
+        self.assertTrue(
+            FeedItem.objects.filter(user=self.reader, post=post).exists()
+        )
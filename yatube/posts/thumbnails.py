@@ -0,0 +1,105 @@
+"""Заранее созданные миниатюры картинок постов.
+
+Миниатюры создаются не при первой отрисовке шаблона, а после
+сохранения картинки через PostForm - фоновой задачей
+posts.tasks.make_thumbnails. Для каждой картинки строятся несколько
+ширин (POST_IMAGE_WIDTHS) в нескольких форматах (POST_IMAGE_FORMATS);
+адреса и размеры сохраняются в Post.image_set, чтобы шаблон выводил
+<picture> со srcset, width и height, не открывая файлы. Пока набор
+пуст, шаблоны строят миниатюру тегом {% thumbnail %}.
+Уже загруженные картинки обрабатывает команда generate_thumbnails.
+"""
+import json
+import logging
+
+from django.conf import settings
+from django.db.models import F
+from sorl.thumbnail import get_thumbnail
+
+from core.cache import bump_generation
+
+from .models import Post
+
+logger = logging.getLogger("posts.thumbnails")
+
+MIME_TYPES = {
+    "WEBP": "image/webp",
+    "JPEG": "image/jpeg",
+    "PNG": "image/png",
+}
+
+
+def _geometry(width: int) -> str:
+    full_width, full_height = map(
+        int, settings.POST_THUMBNAIL_GEOMETRY.split("x")
+    )
+    return f"{width}x{round(width * full_height / full_width)}"
+
+
+def build_image_set(image) -> dict:
+    """Создаёт миниатюры картинки всех ширин и форматов.
+
+    Форматы перечислены в POST_IMAGE_FORMATS в порядке
+    предпочтения; последний - запасной для <img>.
+    """
+    sources = []
+    for image_format, quality in settings.POST_IMAGE_FORMATS.items():
+        thumbnails = {}
+        for width in settings.POST_IMAGE_WIDTHS:
+            thumbnail = get_thumbnail(
+                image,
+                _geometry(width),
+                format=image_format,
+                quality=quality,
+                **settings.POST_THUMBNAIL_OPTIONS
+            )
+            # Без upscale маленькая картинка даёт одинаковые миниатюры
+            # для разных ширин.
+            thumbnails[thumbnail.width] = thumbnail
+        sources.append({
+            "type": MIME_TYPES[image_format],
+            "srcset": ", ".join(
+                f"{thumbnail.url} {width}w"
+                for width, thumbnail in sorted(thumbnails.items())
+            ),
+        })
+    largest = thumbnails[max(thumbnails)]
+    return {
+        "src": largest.url,
+        "width": largest.width,
+        "height": largest.height,
+        "srcset": sources.pop()["srcset"],
+        "sources": sources,
+    }
+
+
+def make_thumbnail(post: Post) -> dict:
+    """Создаёт миниатюры картинки поста и сохраняет их набор.
+
+    Набор записывается, только если картинка поста не сменилась,
+    пока строились миниатюры; версия карточки поста и поколение
+    контента меняются.
+    """
+    image_set = build_image_set(post.image)
+    if Post.objects.filter(pk=post.pk, image=post.image.name).update(
+        image_set=json.dumps(image_set), version=F("version") + 1
+    ):
+        bump_generation()
+    return image_set
+
+
+def generate(post_ids) -> int:
+    """Создаёт миниатюры постов post_ids, возвращает их число.
+
+    Ошибки отдельных картинок пишутся в лог и не прерывают обработку.
+    """
+    done = 0
+    posts = Post.objects.filter(pk__in=post_ids).exclude(image="")
+    for post in posts.only("pk", "image"):
+        try:
+            make_thumbnail(post)
+        except Exception:
+            logger.exception("Не удалось создать миниатюру поста %s", post.pk)
+        else:
+            done += 1
+    return done
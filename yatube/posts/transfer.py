@@ -0,0 +1,269 @@
+"""Потоковые выгрузка и загрузка данных постов в JSON Lines и CSV.
+
+Строки читаются через iterator(chunk_size) и пишутся через
+bulk_create пачками, поэтому память не зависит от объёма данных.
+Первичные ключи и даты (pub_date, created) сохраняются, связи
+хранятся как id: пользователи должны быть перенесены заранее.
+Прогресс каждого файла пишется в файл состояния рядом с ним,
+и прерванная выгрузка или загрузка продолжается с места остановки.
+
+bulk_create не отправляет сигналы: после загрузки ленты, счётчики,
+поисковый индекс и миниатюры пересобираются rebuild_derived.
+"""
+import csv
+import json
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from django.core.management import call_command
+
+from core.cache import bump_generation
+from core.db import immediate_atomic
+
+from .models import Comment, Follow, Group, Like, Post
+
+FORMATS = ("jsonl", "csv")
+
+
+@dataclass(frozen=True)
+class Dataset:
+    name: str
+    model: type
+    columns: tuple
+
+
+# В порядке загрузки: сначала те, на кого ссылаются.
+DATASETS = (
+    Dataset("groups", Group, ("id", "title", "slug", "description")),
+    Dataset(
+        "posts", Post,
+        ("id", "text", "pub_date", "author_id", "group_id", "image")
+    ),
+    Dataset(
+        "comments", Comment,
+        ("id", "text", "created", "author_id", "post_id")
+    ),
+    Dataset("follows", Follow, ("id", "user_id", "author_id")),
+    Dataset("likes", Like, ("id", "created", "user_id", "post_id")),
+)
+
+
+def get_datasets(names=None):
+    if not names:
+        return DATASETS
+    unknown = set(names) - {dataset.name for dataset in DATASETS}
+    if unknown:
+        raise ValueError(f"Неизвестные наборы: {', '.join(sorted(unknown))}")
+    return tuple(dataset for dataset in DATASETS if dataset.name in names)
+
+
+def data_path(directory: str, dataset: Dataset, data_format: str) -> str:
+    return os.path.join(directory, f"{dataset.name}.{data_format}")
+
+
+def state_path(path: str) -> str:
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.state")
+
+
+def read_state(path: str) -> dict:
+    try:
+        with open(state_path(path)) as state:
+            return json.load(state)
+    except FileNotFoundError:
+        return {}
+
+
+def write_state(path: str, **state) -> None:
+    # Запись через временный файл: состояние не бывает наполовину
+    # записанным, даже если процесс прервали.
+    temporary = f"{state_path(path)}.tmp"
+    with open(temporary, "w") as file:
+        json.dump(state, file)
+    os.replace(temporary, state_path(path))
+
+
+def clear_state(path: str) -> None:
+    try:
+        os.remove(state_path(path))
+    except FileNotFoundError:
+        pass
+
+
+@dataclass
+class Report:
+    dataset: str
+    rows: int
+    seconds: float
+
+    @property
+    def rate(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (f"{self.dataset}: {self.rows} строк за {self.seconds:.1f} с "
+                f"({self.rate:.0f} строк/с)")
+
+
+def _serializers(dataset: Dataset):
+    """Преобразователи значений столбцов в JSON-совместимые."""
+    def as_is(value):
+        return value
+
+    def isoformat(value):
+        return None if value is None else value.isoformat()
+
+    return [
+        isoformat
+        if dataset.model._meta.get_field(column).get_internal_type()
+        == "DateTimeField" else as_is
+        for column in dataset.columns
+    ]
+
+
+def export_dataset(dataset: Dataset, path: str, data_format: str,
+                   chunk_size: int, resume: bool = True) -> Report:
+    """Выгружает набор в файл по возрастанию pk.
+
+    Каждые chunk_size строк в файл состояния записываются последний
+    выгруженный pk и размер файла; при resume файл обрезается до этого
+    размера и дописывается со следующего pk, иначе перезаписывается.
+    """
+    state = read_state(path) if resume else {}
+    last_pk = state.get("last_pk", 0)
+    rows = dataset.model.objects.filter(pk__gt=last_pk).order_by("pk")
+    serializers = _serializers(dataset)
+    start = time.monotonic()
+    exported = 0
+    with open(
+        path, "a" if last_pk else "w", newline="", encoding="utf-8"
+    ) as file:
+        # Строки, записанные после последнего сохранения состояния,
+        # отбрасываются и выгружаются заново.
+        file.truncate(state.get("offset", 0))
+        if data_format == "csv":
+            writer = csv.writer(file)
+            if not last_pk:
+                writer.writerow(dataset.columns)
+        for row in rows.values_list(*dataset.columns).iterator(
+            chunk_size=chunk_size
+        ):
+            values = [
+                serialize(value) for serialize, value in zip(serializers, row)
+            ]
+            if data_format == "csv":
+                writer.writerow(values)
+            else:
+                file.write(json.dumps(
+                    dict(zip(dataset.columns, values)), ensure_ascii=False
+                ))
+                file.write("\n")
+            exported += 1
+            if exported % chunk_size == 0:
+                file.flush()
+                write_state(path, last_pk=row[0], offset=file.tell())
+    clear_state(path)
+    return Report(dataset.name, exported, time.monotonic() - start)
+
+
+def _read(path: str, data_format: str):
+    with open(path, newline="", encoding="utf-8") as file:
+        if data_format == "csv":
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if header is None:
+                return
+            for values in reader:
+                yield dict(zip(header, values))
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _deserialize(model, fields, record: dict):
+    values = {}
+    for field in fields:
+        value = record.get(field.attname)
+        # В CSV нет NULL: пустая строка в поле, допускающем NULL.
+        if value == "" and field.null:
+            value = None
+        values[field.attname] = (
+            None if value is None else field.to_python(value)
+        )
+    return model(**values)
+
+
+@contextmanager
+def keep_auto_now(model):
+    """Отключает auto_now_add у полей модели, чтобы bulk_create
+    сохранил даты из файла, а не текущее время."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, "auto_now_add", False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def import_dataset(dataset: Dataset, path: str, data_format: str,
+                   batch_size: int, resume: bool = True) -> Report:
+    """Загружает набор из файла пачками по batch_size строк.
+
+    Каждая пачка - отдельная транзакция, после неё в файл состояния
+    записывается число загруженных строк; при resume уже загруженные
+    строки пропускаются. Строки с занятыми pk или нарушающие
+    уникальность пропускаются (ignore_conflicts), поэтому повторная
+    загрузка пачки безопасна.
+    """
+    done = read_state(path).get("rows", 0) if resume else 0
+    fields = [
+        dataset.model._meta.get_field(column) for column in dataset.columns
+    ]
+    start = time.monotonic()
+    imported = 0
+    batch = []
+
+    def flush():
+        # Размер одного INSERT bulk_create выбирает сам по ограничениям
+        # СУБД (в SQLite - не больше 999 параметров); batch_size задаёт
+        # только транзакцию и частоту сохранения прогресса.
+        with immediate_atomic():
+            dataset.model.objects.bulk_create(batch, ignore_conflicts=True)
+        write_state(path, rows=done + imported)
+        batch.clear()
+
+    with keep_auto_now(dataset.model):
+        for number, record in enumerate(_read(path, data_format)):
+            if number < done:
+                continue
+            batch.append(_deserialize(dataset.model, fields, record))
+            imported += 1
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    clear_state(path)
+    return Report(dataset.name, imported, time.monotonic() - start)
+
+
+def rebuild_derived(stdout=None) -> None:
+    """Пересобирает данные, которые при сохранении обновляют сигналы:
+    счётчики, ленты, поисковый индекс, отрисованный текст
+    и миниатюры - после загрузки через bulk_create."""
+    for command in (
+        "reconcile_counters",
+        "rebuild_feeds",
+        "rebuild_search_index",
+        "prerender_text",
+        "generate_thumbnails",
+    ):
+        call_command(command, stdout=stdout)
+    bump_generation()
@@ -1,40 +1,76 @@
 from django.urls import path
 
+from core.queries import query_budget
+
 from . import views
 
 app_name = "posts"
 
 urlpatterns = [
-    path("", views.index, name="index"),
-    path("group/<slug:slug>/", views.group_posts, name="group_list"),
-    path("profile/<str:username>/", views.profile, name="profile"),
-    path("posts/<int:post_id>/", views.post_detail, name="post_detail"),
-    path("create/", views.post_create, name="post_create"),
-    path("posts/<int:post_id>/edit/", views.post_edit, name="post_edit"),
+    path("", query_budget(views.index, 6), name="index"),
+    path(
+        "group/<slug:slug>/",
+        query_budget(views.group_posts, 7),
+        name="group_list"
+    ),
+    path(
+        "profile/<str:username>/",
+        query_budget(views.profile, 7),
+        name="profile"
+    ),
+    path(
+        "posts/<int:post_id>/",
+        query_budget(views.post_detail, 6),
+        name="post_detail"
+    ),
+    path(
+        "posts/<int:post_id>/comments/",
+        query_budget(views.post_comments, 4),
+        name="post_comments"
+    ),
+    path(
+        "create/",
+        query_budget(views.post_create, 14),
+        name="post_create"
+    ),
+    path(
+        "posts/<int:post_id>/edit/",
+        query_budget(views.post_edit, 9),
+        name="post_edit"
+    ),
     path(
         "posts/<int:post_id>/comment/",
-        views.add_comment,
+        query_budget(views.add_comment, 9),
         name="add_comment"
     ),
-    path("follow/", views.follow_index, name="follow_index"),
+    path(
+        "follow/",
+        query_budget(views.follow_index, 12),
+        name="follow_index"
+    ),
+    path(
+        "search/",
+        query_budget(views.search, 7),
+        name="search"
+    ),
     path(
         "profile/<str:username>/follow/",
-        views.profile_follow,
+        query_budget(views.profile_follow, 10),
         name="profile_follow"
     ),
     path(
         "profile/<str:username>/unfollow/",
-        views.profile_unfollow,
+        query_budget(views.profile_unfollow, 10),
         name="profile_unfollow"
     ),
     path(
         "posts/<int:post_id>/like/",
-        views.post_like,
+        query_budget(views.post_like, 8),
         name="post_like"
     ),
     path(
         "posts/<int:post_id>/dislike/",
-        views.post_dislike,
+        query_budget(views.post_dislike, 8),
         name="post_dislike"
     )
 ]
@@ -1,20 +1,331 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from functools import partial
+
 from django.conf import settings
-from django.core.paginator import Paginator
+from django.core.exceptions import ValidationError
+from django.core.cache import cache
+from django.db.models import Q
 from django.http import HttpRequest
+from django.utils.functional import SimpleLazyObject
+
+from core.paginator import CachedCountPaginator
+
+from . import tasks
+from .counters import page_count_key, page_count_refresh_key
+from .models import Comment
+
+PAGINATION_OFFSET = "offset"
+PAGINATION_CURSOR = "cursor"
+
+
+def elided_page_range(number: int, num_pages: int, on_each_side: int,
+                      on_ends: int):
+    """Номера страниц для ссылок пажинатора: on_ends первых
+    и последних и on_each_side по обе стороны от текущей
+    страницы number; пропуски отмечаются WindowedPaginator.ELLIPSIS.
+    Число ссылок не зависит от num_pages.
+    """
+    if num_pages <= (on_each_side + on_ends) * 2 + 1:
+        yield from range(1, num_pages + 1)
+        return
+    if number > 1 + on_each_side + on_ends + 1:
+        yield from range(1, on_ends + 1)
+        yield WindowedPaginator.ELLIPSIS
+        yield from range(number - on_each_side, number + 1)
+    else:
+        yield from range(1, number + 1)
+    if number < num_pages - on_each_side - on_ends - 1:
+        yield from range(number + 1, number + on_each_side + 1)
+        yield WindowedPaginator.ELLIPSIS
+        yield from range(num_pages - on_ends + 1, num_pages + 1)
+    else:
+        yield from range(number + 1, num_pages + 1)
+
+
+class WindowedPaginator(CachedCountPaginator):
+    """Paginator, страницы которого выводят в шаблоне окно номеров
+    вокруг текущей страницы (page.elided_page_range) вместо всего
+    page_range. Страница остаётся обычной Page."""
+    ELLIPSIS = "…"
+
+    def get_elided_page_range(self, number: int) -> list:
+        return list(elided_page_range(
+            number,
+            self.num_pages,
+            settings.PAGINATION_ON_EACH_SIDE,
+            settings.PAGINATION_ON_ENDS
+        ))
+
+    def get_page(self, number):
+        # num_pages уже посчитан при проверке номера страницы:
+        # окно не требует запросов.
+        page = super().get_page(number)
+        page.elided_page_range = self.get_elided_page_range(page.number)
+        return page
+
+
+class CursorPage(Sequence):
+    """Страница курсорной пажинации.
+
+    В отличие от django.core.paginator.Page не знает ни номера
+    страницы, ни общего количества записей: ссылки на соседние
+    страницы задаются непрозрачными токенами next_cursor
+    и previous_cursor.
+    """
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, next_cursor=None,
+                 previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return "<CursorPage>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Курсорная (keyset) пажинация.
+
+    Вместо OFFSET и COUNT(*) строит условие по значениям полей
+    сортировки последней показанной записи, поэтому стоимость
+    любой страницы равна стоимости первой.
+    --------
+        Параметры:
+            object_list: QuerySet
+                пажинируемый набор записей.
+            per_page: int
+                кол-во записей на странице.
+            ordering: tuple
+                поля сортировки; последнее поле должно
+                быть уникальным (по умолчанию pk).
+    """
+    NEXT = "n"
+    PREVIOUS = "p"
 
+    def __init__(self, object_list, per_page, ordering=("-pub_date", "-pk")):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
 
-def paginate(request: HttpRequest, posts):
+    def _fields(self):
+        model = self.object_list.model
+        for name in self.ordering:
+            descending = name.startswith("-")
+            attname = name.lstrip("-")
+            if attname == "pk":
+                field = model._meta.pk
+            else:
+                field = model._meta.get_field(attname)
+            yield attname, field, descending
+
+    def encode_cursor(self, direction, obj):
+        values = [
+            field.value_to_string(obj) for _, field, _ in self._fields()
+        ]
+        raw = json.dumps([direction, values]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        """Возвращает (направление, значения полей) или None,
+        если токен повреждён."""
+        try:
+            padding = "=" * (-len(cursor) % 4)
+            direction, raw_values = json.loads(
+                base64.urlsafe_b64decode(cursor + padding)
+            )
+            fields = list(self._fields())
+            if (direction not in (self.NEXT, self.PREVIOUS)
+                    or len(raw_values) != len(fields)):
+                return None
+            values = [
+                field.to_python(value)
+                for (_, field, _), value in zip(fields, raw_values)
+            ]
+        except (binascii.Error, ValueError, TypeError, ValidationError):
+            return None
+        return direction, values
+
+    def _after(self, values, reverse=False):
+        """Условие "строго после" значений в порядке сортировки."""
+        condition = Q()
+        equal = {}
+        for (attname, _, descending), value in zip(self._fields(), values):
+            lookup = "lt" if descending != reverse else "gt"
+            condition |= Q(**equal, **{f"{attname}__{lookup}": value})
+            equal[attname] = value
+        return condition
+
+    def _reversed_ordering(self):
+        return [
+            name[1:] if name.startswith("-") else "-" + name
+            for name in self.ordering
+        ]
+
+    def get_page(self, cursor=None):
+        """Возвращает страницу CursorPage.
+
+        Неверный или отсутствующий токен даёт первую страницу,
+        по аналогии с Paginator.get_page.
+        """
+        decoded = self.decode_cursor(cursor) if cursor else None
+        queryset = self.object_list
+        if decoded is None:
+            rows = list(
+                queryset.order_by(*self.ordering)[:self.per_page + 1]
+            )
+            has_more, has_before = len(rows) > self.per_page, False
+        elif decoded[0] == self.NEXT:
+            rows = list(
+                queryset.filter(self._after(decoded[1]))
+                .order_by(*self.ordering)[:self.per_page + 1]
+            )
+            has_more, has_before = len(rows) > self.per_page, True
+        else:
+            rows = list(
+                queryset.filter(self._after(decoded[1], reverse=True))
+                .order_by(*self._reversed_ordering())[:self.per_page + 1]
+            )
+            has_before, has_more = len(rows) > self.per_page, True
+            rows = rows[:self.per_page][::-1]
+        rows = rows[:self.per_page]
+        next_cursor = previous_cursor = None
+        if rows and has_more:
+            next_cursor = self.encode_cursor(self.NEXT, rows[-1])
+        if rows and has_before:
+            previous_cursor = self.encode_cursor(self.PREVIOUS, rows[0])
+        return CursorPage(rows, self, next_cursor, previous_cursor)
+
+
+def get_pagination_mode(request: HttpRequest) -> str:
+    """Режим пажинации для текущего представления.
+
+    Берётся из settings.PAGINATION_MODES по имени URL-шаблона,
+    по умолчанию - обычная постраничная пажинация.
+    """
+    match = getattr(request, "resolver_match", None)
+    url_name = match.url_name if match else None
+    return settings.PAGINATION_MODES.get(url_name, PAGINATION_OFFSET)
+
+
+def request_page_count(scope: str, value="") -> None:
+    """Ставит точный подсчёт постов списка в очередь задач,
+    если он ещё не поставлен."""
+    if cache.add(
+        page_count_refresh_key(scope, value), True, settings.TASK_TIMEOUT
+    ):
+        tasks.count_posts.enqueue(scope, value)
+
+
+def paginate(request: HttpRequest, posts, mode=None, count=None):
     """Выполняет функцию 'пажинации'.
     --------
         Параметры:
             request: HttpRequest
                 обьект запроса.
+            posts: QuerySet
+                пажинируемый набор постов.
+            mode: str
+                PAGINATION_OFFSET или PAGINATION_CURSOR (с параметром
+                cursor - CursorPage, без него - Page с next_cursor);
+                если не задан, определяется get_pagination_mode.
+            count: tuple
+                (scope, value) для posts.counters.page_count_key:
+                число постов берётся из кеша, а не COUNT(*).
     --------
         Константы:
             LIMIT_POSTS
                 константа, хранящая кол-во постов, разммещаемых
                 на странице. Импортируется из settings.
     """
-    paginator = Paginator(posts, settings.LIMIT_POSTS)
+    if mode is None:
+        mode = get_pagination_mode(request)
+    cursor = request.GET.get("cursor") if mode == PAGINATION_CURSOR else None
+    if cursor:
+        paginator = CursorPaginator(posts, settings.LIMIT_POSTS)
+        return paginator.get_page(cursor)
+    count_key = on_miss = None
+    if count is not None:
+        count_key = page_count_key(*count)
+        on_miss = partial(request_page_count, *count)
+    paginator = WindowedPaginator(
+        posts, settings.LIMIT_POSTS, count_key=count_key, on_miss=on_miss
+    )
     page_number = request.GET.get('page')
-    return paginator.get_page(page_number)
+    page = paginator.get_page(page_number)
+    if mode == PAGINATION_CURSOR:
+        # Страница по номеру остаётся обычной Page (первая страница
+        # и переходы по номеру), а ссылка "Следующая" ведёт курсором:
+        # дальше по списку страницы выбираются без OFFSET. Курсор
+        # строится из последней строки при первом обращении в шаблоне,
+        # внутри {% cache %}.
+        page.next_cursor = SimpleLazyObject(partial(_next_cursor, page))
+    return page
+
+
+def _next_cursor(page):
+    if not page.has_next():
+        return ""
+    paginator = CursorPaginator(
+        page.paginator.object_list, page.paginator.per_page
+    )
+    return paginator.encode_cursor(CursorPaginator.NEXT, page[-1])
+
+
+def load_page(page):
+    """Выбирает строки страницы Paginator сразу, а не при первом
+    обращении из шаблона (для concurrency.gather)."""
+    if not getattr(page, "is_cursor", False):
+        page.object_list = list(page.object_list)
+    return page
+
+
+def paginate_comments(request: HttpRequest, post):
+    """Курсорная пажинация комментариев поста: от старых к новым,
+    по LIMIT_COMMENTS штук, курсор - в параметре cursor.
+    --------
+        Параметры:
+            request: HttpRequest
+                обьект запроса.
+            post: Post или int
+                пост (или его pk), комментарии которого выводятся.
+    """
+    paginator = CursorPaginator(
+        Comment.objects.filter(post=post).select_related("author"),
+        settings.LIMIT_COMMENTS,
+        ordering=("created", "pk")
+    )
+    return paginator.get_page(request.GET.get("cursor"))
+
+
+def batches(queryset, size):
+    """Отдаёт pk записей пачками по size штук."""
+    last_pk = 0
+    while True:
+        pks = list(
+            queryset.filter(pk__gt=last_pk).order_by("pk")
+            .values_list("pk", flat=True)[:size]
+        )
+        if not pks:
+            return
+        yield pks
+        last_pk = pks[-1]
@@ -0,0 +1,94 @@
+"""Отметки текущего пользователя на постах страницы.
+
+Нравится ли пост пользователю (post.is_liked) и подписан ли он
+на автора (post.author_followed) выбираются для всей страницы двумя
+запросами - лайки по id постов и подписки по id авторов, - а не
+отдельным exists() на каждый пост. Для анонимного пользователя запросов нет.
+
+attach откладывает выборку до первого обращения к строкам страницы:
+если фрагмент страницы взят из кеша ({% cache %}), ни строки, ни
+отметки не выбираются.
+"""
+from collections.abc import Sequence
+
+from core.concurrency import gather
+
+from .models import Follow, Like
+
+
+def liked_post_ids(user, post_ids) -> set:
+    """id постов из post_ids, которые нравятся пользователю."""
+    return set(
+        Like.objects.filter(user=user, post_id__in=post_ids)
+        .values_list("post_id", flat=True)
+    )
+
+
+def followed_author_ids(user, author_ids) -> set:
+    """id авторов из author_ids, на которых подписан пользователь."""
+    return set(
+        Follow.objects.filter(user=user, author_id__in=author_ids)
+        .values_list("author_id", flat=True)
+    )
+
+
+def annotate(posts, user, followed_ids=None) -> list:
+    """Проставляет постам is_liked и author_followed.
+    --------
+        Параметры:
+            posts: iterable
+                посты страницы.
+            user: User
+                текущий пользователь (в том числе анонимный).
+            followed_ids: set
+                уже известные id авторов, на которых подписан
+                пользователь; если не заданы, выбираются запросом.
+    """
+    posts = list(posts)
+    liked = set()
+    if user.is_authenticated and posts:
+        post_ids = {post.pk for post in posts}
+        if followed_ids is None:
+            author_ids = {post.author_id for post in posts}
+            liked, followed_ids = gather(
+                lambda: liked_post_ids(user, post_ids),
+                lambda: followed_author_ids(user, author_ids)
+            )
+        else:
+            liked = liked_post_ids(user, post_ids)
+    followed_ids = followed_ids or set()
+    for post in posts:
+        post.is_liked = post.pk in liked
+        post.author_followed = post.author_id in followed_ids
+    return posts
+
+
+class ViewerStateList(Sequence):
+    """Строки страницы, выбираемые и размечаемые annotate
+    при первом обращении."""
+
+    def __init__(self, posts, user, followed_ids=None):
+        self._posts = posts
+        self._user = user
+        self._followed_ids = followed_ids
+        self._rows = None
+
+    def _load(self) -> list:
+        if self._rows is None:
+            self._rows = annotate(
+                self._posts, self._user, self._followed_ids
+            )
+        return self._rows
+
+    def __getitem__(self, index):
+        return self._load()[index]
+
+    def __len__(self):
+        return len(self._load())
+
+
+def attach(page, user, followed_ids=None):
+    """Размечает посты страницы Paginator или CursorPage
+    отметками пользователя при первом обращении к ним."""
+    page.object_list = ViewerStateList(page.object_list, user, followed_ids)
+    return page
@@ -4,13 +4,21 @@ from django.forms import SlugField
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 
+from core.concurrency import gather
+from core.conditional import conditional_page
+
+from . import viewer
+from .feed import feed_posts
 from .forms import CommentForm, PostForm
 from .models import Follow, Group, Like, Post
-from .utils import paginate
+from .search import search_posts
+from .utils import (PAGINATION_OFFSET, load_page, paginate,
+                    paginate_comments)
 
 User = get_user_model()
 
 
+@conditional_page
 def index(request: HttpRequest) -> HttpResponse:
     """Возвращает объект ответа HttpResponse
     и собирает главную страницу index.html.
@@ -24,10 +32,13 @@ def index(request: HttpRequest) -> HttpResponse:
                 обьект запроса.
     """
     posts = Post.objects.select_related('author', 'group')
-    page_obj = paginate(request, posts)
+    page_obj = viewer.attach(
+        paginate(request, posts, count=("all",)), request.user
+    )
     return render(request, "posts/index.html", {"page_obj": page_obj})
 
 
+@conditional_page
 def group_posts(request: HttpRequest, slug: SlugField) -> HttpResponse:
     """Возвращает объект ответа HttpResponse
     и собирает страницу с записями по группам group_list.html.
@@ -42,9 +53,16 @@ def group_posts(request: HttpRequest, slug: SlugField) -> HttpResponse:
             slug: SlugField
                 slug-строка содержащая название запрашиваемой группы.
     """
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.select_related('author', 'group')
-    page_obj = paginate(request, posts)
+    posts = Post.objects.filter(group__slug=slug).select_related(
+        'author', 'group'
+    )
+    # Строки страницы выбираются лениво внутри {% cache %},
+    # параллельно с группой выполняется только COUNT(*).
+    group, page_obj = gather(
+        lambda: get_object_or_404(Group, slug=slug),
+        lambda: paginate(request, posts, count=("group", slug))
+    )
+    viewer.attach(page_obj, request.user)
     return render(
         request,
         "posts/group_list.html",
@@ -52,6 +70,7 @@ def group_posts(request: HttpRequest, slug: SlugField) -> HttpResponse:
     )
 
 
+@conditional_page
 def profile(request: HttpRequest, username: str) -> HttpResponse:
     """Возвращает объект ответа HttpResponse
     и собирает страницу с записями конкретного
@@ -69,13 +88,26 @@ def profile(request: HttpRequest, username: str) -> HttpResponse:
                 строка содержащая логин пользователя
                 запрашиваемой страницы.
     """
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.select_related("author", "group")
-    following = request.user.is_authenticated and Follow.objects.filter(
-        user=request.user,
-        author=author
-    ).exists()
-    page_obj = paginate(request, posts)
+    posts = Post.objects.filter(
+        author__username=username
+    ).select_related("author", "group")
+    user = request.user if request.user.is_authenticated else None
+    author, following, page_obj = gather(
+        lambda: get_object_or_404(
+            User.objects.select_related("stats"),
+            username=username
+        ),
+        lambda: user is not None and Follow.objects.filter(
+            user=user,
+            author__username=username
+        ).exists(),
+        lambda: load_page(
+            paginate(request, posts, count=("author", username))
+        )
+    )
+    viewer.attach(
+        page_obj, request.user, {author.pk} if following else set()
+    )
     return render(
         request,
         "posts/profile.html",
@@ -83,6 +115,7 @@ def profile(request: HttpRequest, username: str) -> HttpResponse:
     )
 
 
+@conditional_page
 def post_detail(request: HttpRequest, post_id: int) -> HttpResponse:
     """Возвращает объект ответа HttpResponse
     и собирает страницу конкретной записи post_detail.html.
@@ -98,22 +131,43 @@ def post_detail(request: HttpRequest, post_id: int) -> HttpResponse:
                 переменная, содержащая primary key
             запрашиваемого поста.
     """
-    post = get_object_or_404(Post, pk=post_id)
+    user = request.user if request.user.is_authenticated else None
+    post, comments, liked = gather(
+        lambda: get_object_or_404(
+            Post.objects.select_related("author__stats", "group"),
+            pk=post_id
+        ),
+        lambda: paginate_comments(request, post_id),
+        lambda: user is not None and viewer.liked_post_ids(user, [post_id])
+    )
+    post.is_liked = bool(liked)
     form = CommentForm()
-    comments = post.comments.all
-    likeing = request.user.is_authenticated and Like.objects.filter(
-        user=request.user,
-        post=post
-    ).exists()
     return render(request, "posts/post_detail.html", {
         "post": post,
         "form": form,
-        "comments": comments,
-        "likeing": likeing
+        "comments": comments
     }
     )
 
 
+def post_comments(request: HttpRequest, post_id: int) -> HttpResponse:
+    """Возвращает HTML-фрагмент со следующей порцией
+    комментариев поста (кнопка "Показать ещё").
+    --------
+        Параметры:
+            request: HttpRequest
+                обьект запроса, курсор - в параметре cursor.
+            post_id: int
+                переменная, содержащая primary key
+            запрашиваемого поста.
+    """
+    post = get_object_or_404(Post.objects.only("pk"), pk=post_id)
+    return render(request, "includes/comment_list.html", {
+        "post": post,
+        "comments": paginate_comments(request, post)
+    })
+
+
 @login_required
 def post_create(request: HttpRequest) -> HttpResponse:
     """Возвращает объект ответа HttpResponse
@@ -127,13 +181,12 @@ def post_create(request: HttpRequest) -> HttpResponse:
             request: HttpRequest
                 обьект запроса.
     """
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if not form.is_valid():
         return render(request, "posts/create_post.html", {"form": form})
 
-    post = form.save(commit=False)
-    post.author = request.user
-    post.save()
+    form.instance.author = request.user
+    form.save()
     return redirect("posts:profile", request.user)
 
 
@@ -209,12 +262,38 @@ def follow_index(request: HttpRequest) -> HttpResponse:
             request: HttpRequest
                 обьект запроса.
     """
-    posts = Post.objects.filter(author__following__user=request.user)
-    page_obj = paginate(request, posts)
+    posts = feed_posts(request.user).select_related("author", "group")
+    page_obj = viewer.attach(
+        paginate(request, posts, count=("feed", request.user.pk)),
+        request.user
+    )
     return render(
         request, "posts/follow.html", {"page_obj": page_obj})
 
 
+def search(request: HttpRequest) -> HttpResponse:
+    """Возвращает объект ответа HttpResponse
+    и собирает страницу результатов поиска search.html.
+
+    Посты ищутся по тексту и комментариям бэкендом
+    SEARCH_BACKEND и выводятся в порядке релевантности.
+    --------
+        Параметры:
+            request: HttpRequest
+                обьект запроса, строка поиска - в параметре q.
+    """
+    query = request.GET.get("q", "").strip()
+    posts = search_posts(query).select_related("author", "group")
+    page_obj = viewer.attach(
+        paginate(request, posts, mode=PAGINATION_OFFSET), request.user
+    )
+    return render(
+        request,
+        "posts/search.html",
+        {"query": query, "page_obj": page_obj}
+    )
+
+
 @login_required
 def profile_follow(request: HttpRequest, username: str) -> HttpResponse:
     """Подписка на автора."""
@@ -4,7 +4,9 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 SECRET_KEY = 'togx7ee+=xnswxx8%*(f@*@(j*fd4y&6xaudmrle#+o*+bt)i0'
 
-DEBUG = True
+# Режим отладки выключен по умолчанию; при разработке
+# включается переменной окружения YATUBE_DEBUG=1.
+DEBUG = os.environ.get('YATUBE_DEBUG') == '1'
 
 ALLOWED_HOSTS = [
     'localhost',
@@ -28,10 +30,11 @@ INSTALLED_APPS = [
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
     'sorl.thumbnail',
-    'debug_toolbar',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.QueryInspectorMiddleware',
+    'core.middleware.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -39,9 +42,13 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware'
 ]
 
+# Панель отладки - только при разработке.
+if DEBUG:
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
+
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
@@ -53,7 +60,7 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
+        'APP_DIRS': DEBUG,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -61,21 +68,91 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.year.year',
+                'core.context_processors.page_cache.page_cache',
             ],
         },
     },
 ]
+# Без DEBUG шаблоны разбираются один раз и хранятся в памяти
+# процесса (cached.Loader): {% extends %} и {% include %} в циклах
+# не читают и не компилируют файлы на каждый запрос. При отладке
+# шаблоны читаются с диска заново, чтобы правки были видны без
+# перезапуска (и APP_DIRS нужен debug_toolbar).
+if not DEBUG:
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
 
+# SQLite под несколькими воркерами: соединения живут CONN_MAX_AGE
+# секунд, транзакции, которые читают и затем пишут, начинаются
+# с BEGIN IMMEDIATE (core.db.immediate_atomic), занятая запись ожидается до timeout секунд вместо ошибки
+# "database is locked". Тестовая БД - файл, а не общая память:
+# в режиме shared cache блокировки табличные и ожидание не работает.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'core.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': int(os.environ.get('YATUBE_CONN_MAX_AGE', 60)),
+        'OPTIONS': {
+            'timeout': 20,
+        },
+        'TEST': {
+            'NAME': os.path.join(BASE_DIR, 'test_db.sqlite3'),
+        },
     }
 }
 
+# Реплики только для чтения (core.routers.ReplicaRouter): файлы
+# и веса в YATUBE_DB_REPLICAS="/srv/replica1.sqlite3:3,/srv/replica2.sqlite3",
+# вес по умолчанию - 1. Реплики наполняются вне Django (litestream,
+# .backup по расписанию); в тестах реплики - зеркала default.
+DATABASE_REPLICAS = {}
+for number, replica in enumerate(
+    filter(None, os.environ.get('YATUBE_DB_REPLICAS', '').split(',')), 1
+):
+    path, _, weight = replica.rpartition(':')
+    if not weight.isdigit():
+        path, weight = replica, '1'
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS[f'replica{number}'] = int(weight)
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Представления, читающие модели REPLICA_APPS с реплик, и сколько
+# секунд после своей записи пользователь читает с основной БД,
+# чтобы сразу видеть свой пост, комментарий, лайк или подписку.
+REPLICA_VIEWS = (
+    'posts:index',
+    'posts:group_list',
+    'posts:profile',
+    'posts:post_detail',
+    'posts:follow_index',
+)
+REPLICA_APPS = ('posts', 'auth')
+REPLICA_STICKY_SECONDS = 10
+
+# PRAGMA каждого нового соединения SQLite (core.db): журнал WAL -
+# чтение не ждёт записи, synchronous=NORMAL - fsync только при
+# контрольных точках WAL, чтение файла через mmap и временные
+# таблицы в памяти.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+    'cache_size': -20000,
+}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -108,8 +185,38 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
 
+# Учёт SQL-запросов (core.middleware.QueryInspectorMiddleware):
+# доля запросов, для которых считаются SQL-запросы (0 - выключено),
+# число повторов одного запроса, считающееся N+1, и нужно ли
+# падать при превышении бюджета представления вместо записи в лог.
+QUERY_SAMPLE_RATE = 0
+QUERY_N_PLUS_ONE_THRESHOLD = 5
+QUERY_BUDGET_RAISE = False
+
 LIMIT_POSTS = 10
 SECOND_PAGE = 3
+# Ссылки пажинатора: кол-во номеров страниц по обе стороны от текущей
+# и в начале и в конце списка, остальные заменяются многоточием.
+PAGINATION_ON_EACH_SIDE = 2
+PAGINATION_ON_ENDS = 1
+# Кол-во комментариев, показываемых на странице поста за раз.
+LIMIT_COMMENTS = 20
+# Режим пажинации по имени URL-шаблона: "offset" (по умолчанию)
+# или "cursor": страница по номеру - обычная, а ссылка "Следующая"
+# ведёт курсором, и дальше по длинному списку страницы выбираются
+# без OFFSET. Лента подписок (posts.feed.Feed) - не QuerySet
+# и листается только по номеру.
+PAGINATION_MODES = {
+    'index': 'cursor',
+    'profile': 'cursor',
+}
+
+# Лента подписок: максимальная длина ленты одного пользователя,
+# порог подписчиков, после которого посты автора не рассылаются
+# по лентам, а подмешиваются при чтении, и размер пачки вставки.
+FEED_MAX_LENGTH = 1000
+FEED_FANOUT_MAX_FOLLOWERS = 5000
+FEED_BATCH_SIZE = 500
 
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
@@ -122,10 +229,89 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Пажинатор админки (core.paginator.EstimatedCountPaginator): до
+# стольких строк список считается точно, дальше - оценивается.
+ESTIMATED_COUNT_LIMIT = 10000
+# Сколько секунд хранить в кеше число постов списков (группа, автор,
+# лента) для пажинатора (core.paginator.CachedCountPaginator);
+# сигналы поддерживают его, время жизни исправляет расхождения.
+# Пока значения нет, списки считаются до ESTIMATED_COUNT_LIMIT.
+PAGE_COUNT_TIMEOUT = 60 * 60
+
+# Поиск по постам (posts.search): класс бэкенда, максимальное число
+# слов запроса и число совпадений, начиная с которого результаты
+# не сортируются по релевантности. SQLiteFTSBackend требует таблицу
+# FTS5 из миграций posts; для других СУБД - posts.search.LikeBackend.
+SEARCH_BACKEND = 'posts.search.SQLiteFTSBackend'
+SEARCH_MAX_WORDS = 8
+SEARCH_RANK_MAX_MATCHES = 5000
+
+# Миниатюры картинок постов (posts.thumbnails): наибольший размер
+# и параметры sorl-thumbnail, ширины для srcset, форматы в порядке
+# предпочтения (последний - запасной) с качеством сжатия. Миниатюры
+# создаёт фоновая задача после сохранения поста, для уже загруженных
+# картинок - команда generate_thumbnails.
+POST_THUMBNAIL_GEOMETRY = "960x339"
+POST_THUMBNAIL_OPTIONS = {"crop": "center", "upscale": False}
+POST_IMAGE_WIDTHS = (480, 960)
+POST_IMAGE_FORMATS = {"WEBP": 75, "JPEG": 82}
+
+# Очередь фоновых задач в БД (core.tasks), их выполняет команда
+# run_tasks. TASKS_EAGER - выполнять задачу сразу при постановке,
+# без обработчика очереди; число попыток; задержка первого повтора
+# и наибольшая задержка (удваивается с каждой попыткой), с; через
+# сколько секунд выполняющаяся задача считается потерянной
+# и возвращается в очередь; сколько секунд хранить выполненные задачи.
+TASKS_EAGER = False
+TASK_MAX_ATTEMPTS = 5
+TASK_RETRY_DELAY = 10
+TASK_RETRY_MAX_DELAY = 60 * 60
+TASK_TIMEOUT = 10 * 60
+TASK_RETENTION = 24 * 60 * 60
+
+# Потоки общего пула, в котором представления параллельно выполняют
+# независимые запросы чтения (core.concurrency); 0 - по очереди
+# в потоке запроса.
+READ_WORKERS = 4
+
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
+# Время жизни закешированных фрагментов страниц: фрагменты
+# инвалидируются сменой поколения контента (core.cache), поэтому
+# могут жить долго.
+PAGE_CACHE_TIMEOUT = 60 * 5
+# Время жизни карточек постов (posts.cards): ключ содержит версию
+# поста, поэтому карточки не инвалидируются, а истекают.
+POST_CARD_TIMEOUT = 60 * 60 * 24
+
+# Двухуровневый кеш (core.cache_backends.TwoTierCache): L1 в памяти
+# процесса перед общим для всех воркеров кешем "shared". Локально
+# общий кеш хранится в таблице SQLite (manage.py createcachetable),
+# в продакшене задаётся переменными окружения, например:
+# YATUBE_CACHE_BACKEND=django.core.cache.backends.memcached.PyLibMCCache
+# YATUBE_CACHE_LOCATION=127.0.0.1:11211
+# Изменения поколения контента (core:) и чисел постов списков
+# (page-count:) удаляются из L1 всех процессов; карточки постов
+# не рассылаются - их ключи содержат версию поста.
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+        'BACKEND': 'core.cache_backends.TwoTierCache',
+        'OPTIONS': {
+            'SHARED_ALIAS': 'shared',
+            'LOCAL_TIMEOUT': 5,
+            'LOCAL_MAX_ENTRIES': 1000,
+            'BROADCAST_PREFIXES': ('core:', 'page-count:'),
+        },
+    },
+    'shared': {
+        'BACKEND': os.environ.get(
+            'YATUBE_CACHE_BACKEND',
+            'core.cache_backends.DatabaseCache'
+        ),
+        'LOCATION': os.environ.get('YATUBE_CACHE_LOCATION', 'yatube_cache'),
+    },
 }
+
+# Кеш не откатывается вместе с транзакцией теста: каждый тест
+# начинается с пустого кеша (core.test_runner).
+TEST_RUNNER = 'core.test_runner.TestRunner'